@@ -0,0 +1,11 @@
+"""Benchmarks and synthetic datasets for the RDF pipeline."""
+
+import sys
+from pathlib import Path
+
+# Pipeline modules use flat imports; make their folders importable
+ROOT = Path(__file__).resolve().parent.parent
+for _folder in ("config", "src/utils", "src/fetchers", "src/processors", "scripts"):
+    _path = str(ROOT / _folder)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,303 @@
+"""
+@File    : run_benchmarks.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import ROOT
+from benchmarks.synthetic_data import generate_dataset, generate_elements, sample_profiles
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stages in execution order; later stages read the files written by earlier ones
+STAGES = ['write_turtle', 'clean', 'second_pass', 'load_pois', 'topology']
+
+
+def _max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# ============================================================================
+# STAGES (each runs in its own process; returns the number of items handled)
+# ============================================================================
+def stage_write_turtle(work_dir: Path, scale: float, seed: int) -> int:
+    """Turtle writer on synthetic elements (element generation is not timed)."""
+    from config_amenity_types import AMENITY_TYPES
+    from osm_data_fetcher import write_turtle_file
+    import random
+
+    profiles = sample_profiles()
+    rng = random.Random(seed)
+    batches = []
+    next_id = 10_000_000_000
+    for category, _, _, schema_type in AMENITY_TYPES:
+        elements = generate_elements(category, profiles[category], scale, rng, next_id)
+        next_id += len(elements)
+        batches.append((elements, category, schema_type))
+
+    start = time.perf_counter()
+    for elements, category, schema_type in batches:
+        write_turtle_file(elements, work_dir / "bench_write" / f"data_hanoi_{category}.ttl",
+                          category, schema_type)
+    _record_time(start)
+    return sum(len(b[0]) for b in batches)
+
+
+def stage_clean(work_dir: Path, scale: float, seed: int) -> int:
+    """First-pass cleaner on every raw file, with reverse geocoding disabled."""
+    from clean_all_remaining import UniversalDataCleaner
+
+    cleaner = UniversalDataCleaner()
+    cleaner.reverse_geocode = lambda lat, lon: None  # offline: measure local work only
+    start = time.perf_counter()
+    total = 0
+    for category in cleaner.all_categories():
+        input_file = work_dir / "raw" / f"data_hanoi_{category}.ttl"
+        if input_file.exists():
+            output_file = work_dir / "cleaned" / f"data_hanoi_{category}_cleaned.ttl"
+            result = cleaner.process_file(str(input_file), str(output_file))
+            total += result.get('total', 0)
+    _record_time(start)
+    return total
+
+
+def stage_second_pass(work_dir: Path, scale: float, seed: int) -> int:
+    """Second-pass cleaner with Wikidata disabled (offline translation only)."""
+    from second_pass_cleaning import SecondPassCleaner
+
+    os.chdir(work_dir)  # the translation cache is created in the working directory
+    cleaner = SecondPassCleaner()
+    cleaner.translator._wikidata_get = lambda params: {}
+    input_dir = work_dir / "cleaned"
+    if not input_dir.exists():
+        input_dir = work_dir / "raw"
+    start = time.perf_counter()
+    total = 0
+    for input_file in sorted(input_dir.glob("*.ttl")):
+        result = cleaner.process_file(str(input_file),
+                                      str(work_dir / "cleanedv2" / input_file.name))
+        total += result.get('entities', 0)
+    cleaner.translator.close()
+    _record_time(start)
+    return total
+
+
+def stage_load_pois(work_dir: Path, scale: float, seed: int) -> int:
+    """generate_iot_semantics.load_pois_from_ttl on the raw files."""
+    from generate_iot_semantics import load_pois_from_ttl
+
+    start = time.perf_counter()
+    pois = load_pois_from_ttl(str(work_dir / "raw"))
+    _record_time(start)
+    return len(pois['uri'])
+
+
+def stage_topology(work_dir: Path, scale: float, seed: int) -> int:
+    """generate_topology over the raw files."""
+    from generate_topology import generate_topology
+
+    output_file = work_dir / "topology.ttl"
+    start = time.perf_counter()
+    generate_topology(work_dir / "raw", output_file)
+    _record_time(start)
+    return output_file.stat().st_size
+
+
+STAGE_FUNCS: Dict[str, Callable[[Path, float, int], int]] = {
+    'write_turtle': stage_write_turtle,
+    'clean': stage_clean,
+    'second_pass': stage_second_pass,
+    'load_pois': stage_load_pois,
+    'topology': stage_topology,
+}
+
+# Time of the measured section, set by the stage (excludes setup such as imports)
+_measured = {}
+
+
+def _record_time(start: float):
+    _measured['seconds'] = time.perf_counter() - start
+
+
+def _run_stage(stage: str, work_dir: str, scale: float, seed: int, trace: bool) -> Dict[str, Any]:
+    """Run one stage in the current (child) process and measure it."""
+    import logging
+    logging.disable(logging.INFO)
+
+    rss_before = _max_rss_mb()
+    if trace:
+        tracemalloc.start()
+    items = STAGE_FUNCS[stage](Path(work_dir), scale, seed)
+    result = {
+        'seconds': round(_measured['seconds'], 3),
+        'items': items,
+        'max_rss_mb': _max_rss_mb(),
+    }
+    if rss_before is not None:
+        result['max_rss_growth_mb'] = round(result['max_rss_mb'] - rss_before, 1)
+        result['max_rss_mb'] = round(result['max_rss_mb'], 1)
+    if trace:
+        result['python_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    return result
+
+
+def run_stage_isolated(stage: str, work_dir: Path, scale: float, seed: int,
+                       trace: bool) -> Dict[str, Any]:
+    """Run a stage in a fresh process so memory peaks are per stage."""
+    context = get_context('fork' if sys.platform.startswith('linux') else 'spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_run_stage, stage, str(work_dir), scale, seed, trace).result()
+
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float) -> List[str]:
+    """
+    Compare two reports stage by stage.
+
+    Args:
+        baseline: Older report
+        current: Newer report
+        threshold: Ratio of seconds (or memory) above which a stage counts as a regression
+
+    Returns:
+        Regression messages (empty if none)
+    """
+    regressions = []
+    print(f"\n{'Stage':<14} {'Baseline (s)':>13} {'Current (s)':>12} {'Ratio':>7}")
+    print("-" * 50)
+    for stage, result in current['results'].items():
+        old = baseline.get('results', {}).get(stage)
+        if not old or 'seconds' not in old or 'seconds' not in result:
+            continue
+        ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        print(f"{stage:<14} {old['seconds']:>13.3f} {result['seconds']:>12.3f} {ratio:>7.2f}")
+        if ratio > threshold:
+            regressions.append(f"{stage}: {old['seconds']:.3f}s -> {result['seconds']:.3f}s "
+                               f"({ratio:.2f}x)")
+        for key in ('max_rss_growth_mb', 'python_peak_mb'):
+            if old.get(key) and result.get(key) and result[key] / old[key] > threshold:
+                regressions.append(f"{stage}: {key} {old[key]} -> {result[key]}")
+    return regressions
+
+
+def main():
+    """Entry point: python -m benchmarks.run_benchmarks [--scale 10] [--stages ...]."""
+    parser = argparse.ArgumentParser(description="Benchmark the OpenDataFitHou RDF pipeline")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Synthetic dataset size as a multiple of current Hanoi (1, 10, 100)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stages", nargs="*", default=STAGES, choices=STAGES)
+    parser.add_argument("--work-dir", type=Path,
+                        help="Keep generated files here (default: temp dir)")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_report.json"))
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also record Python heap peaks (slower)")
+    parser.add_argument("--compare", type=Path, help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.10,
+                        help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="odfh_bench_") as tmp:
+        work_dir = (args.work_dir or Path(tmp)).resolve()
+        print(f"Generating synthetic dataset (scale {args.scale}x, seed {args.seed}) "
+              f"in {work_dir}/raw ...")
+        counts = generate_dataset(work_dir / "raw", args.scale, args.seed)
+        raw_bytes = sum(f.stat().st_size for f in (work_dir / "raw").glob("*.ttl"))
+
+        report = {
+            'generated_at': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'entities': sum(counts.values()),
+            'raw_bytes': raw_bytes,
+            'counts': counts,
+            'results': {},
+        }
+
+        for stage in STAGES:
+            if stage not in args.stages:
+                continue
+            print(f"\n▶ {stage} ...")
+            try:
+                result = run_stage_isolated(stage, work_dir, args.scale, args.seed,
+                                            args.tracemalloc)
+            except Exception as e:
+                result = {'error': str(e)}
+            report['results'][stage] = result
+            print(f"  {stage}: {result}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for message in regressions:
+                print(f"  ✗ {message}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+@File    : synthetic_data.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks import ROOT
+from config_amenity_types import AMENITY_TYPES
+
+# Hanoi bounding box used by fetch_osm_data
+LAT_MIN, LAT_MAX = 20.9, 21.2
+LON_MIN, LON_MAX = 105.7, 106.0
+
+# Standard deviation (degrees, ~150 m) of the jitter around sampled real POIs
+JITTER_DEG = 0.0014
+
+_SUBJECT_RE = re.compile(r'^<urn:ngsi-ld:PointOfInterest:')
+_NAME_RE = re.compile(r'^\s+schema:name "((?:[^"\\]|\\.)*)"@vi')
+_FIELD_RE = re.compile(r'^\s+(ext:addr_street|ext:addr_district|ext:addr_housenumber|schema:brand) '
+                       r'"((?:[^"\\]|\\.)*)"')
+_WKT_RE = re.compile(r'geo:asWKT "POINT\(([-\d.eE]+) ([-\d.eE]+)\)"')
+_FALLBACK_NAME_RE = re.compile(r'#\d+$')
+
+_FIELD_TAGS = {
+    'ext:addr_street': 'addr:street',
+    'ext:addr_district': 'addr:district',
+    'ext:addr_housenumber': 'addr:housenumber',
+    'schema:brand': 'brand',
+}
+
+
+def _unescape(value: str) -> str:
+    """Reverse osm_data_fetcher.escape_turtle_string."""
+    escapes = {'n': '\n', 'r': '\r', 't': '\t'}
+    return re.sub(r'\\(.)', lambda m: escapes.get(m.group(1), m.group(1)), value)
+
+
+def sample_category_profile(ttl_file: Path) -> Dict[str, Any]:
+    """
+    Collect the value distributions of one raw category file.
+
+    Args:
+        ttl_file: File written by write_turtle_file
+
+    Returns:
+        Profile with the entity count, coordinates and observed tag values
+        (each list keeps duplicates, so sampling from it follows the real
+        frequencies; '' marks entities without the tag)
+    """
+    profile = {'count': 0, 'coords': [], 'name': []}
+    profile.update({tag: [] for tag in _FIELD_TAGS.values()})
+    current: Optional[Dict[str, str]] = None
+
+    def close(entity):
+        if entity is None:
+            return
+        profile['count'] += 1
+        for tag in ['name'] + list(_FIELD_TAGS.values()):
+            profile[tag].append(entity.get(tag, ''))
+
+    with open(ttl_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if _SUBJECT_RE.match(line):
+                close(current)
+                current = {}
+                continue
+            if current is None:
+                continue
+            match = _NAME_RE.match(line)
+            if match:
+                name = _unescape(match.group(1))
+                if not _FALLBACK_NAME_RE.search(name):
+                    current['name'] = name
+                continue
+            match = _FIELD_RE.match(line)
+            if match:
+                current[_FIELD_TAGS[match.group(1)]] = _unescape(match.group(2))
+                continue
+            match = _WKT_RE.search(line)
+            if match:
+                profile['coords'].append((float(match.group(2)), float(match.group(1))))
+    close(current)
+    return profile
+
+
+def sample_profiles(data_dir: Path = ROOT / "datav2") -> Dict[str, Dict[str, Any]]:
+    """
+    Build profiles for every configured category found in data_dir.
+
+    Categories without a raw file get a small uniform fallback profile.
+    """
+    profiles = {}
+    for category, _, _, _ in AMENITY_TYPES:
+        ttl_file = Path(data_dir) / f"data_hanoi_{category}.ttl"
+        if ttl_file.exists():
+            profiles[category] = sample_category_profile(ttl_file)
+        else:
+            profiles[category] = {
+                'count': 100, 'coords': [], 'name': [''],
+                'addr:street': [''], 'addr:district': [''], 'addr:housenumber': [''], 'brand': ['']
+            }
+    return profiles
+
+
+def generate_elements(category: str, profile: Dict[str, Any], scale: float,
+                      rng: random.Random, first_id: int) -> List[Dict[str, Any]]:
+    """
+    Generate synthetic OSM elements for one category.
+
+    Positions are real POIs of the category plus Gaussian jitter, so the
+    clustering of the real data is kept at every scale. Names, addresses and
+    brands are drawn from the observed values.
+
+    Args:
+        category: Category name
+        profile: Profile from sample_category_profile
+        scale: Multiple of the real entity count
+        rng: Random generator
+        first_id: OSM id of the first generated element
+
+    Returns:
+        Elements in the format returned by fetch_osm_data
+    """
+    count = max(1, int(round(profile['count'] * scale)))
+    coords = profile['coords']
+    elements = []
+    for i in range(count):
+        if coords:
+            lat, lon = rng.choice(coords)
+            lat += rng.gauss(0.0, JITTER_DEG)
+            lon += rng.gauss(0.0, JITTER_DEG)
+        else:
+            lat, lon = rng.uniform(LAT_MIN, LAT_MAX), rng.uniform(LON_MIN, LON_MAX)
+
+        tags = {}
+        for tag in ('name', 'addr:street', 'addr:district', 'addr:housenumber', 'brand'):
+            value = rng.choice(profile[tag]) if profile[tag] else ''
+            if value:
+                tags[tag] = value
+
+        elements.append({
+            'id': first_id + i,
+            'type': 'node',
+            'lat': round(lat, 7),
+            'lon': round(lon, 7),
+            'tags': tags,
+        })
+    return elements
+
+
+def generate_dataset(output_dir: Path, scale: float = 1.0, seed: int = 42,
+                     categories: Optional[List[str]] = None,
+                     profiles: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+    """
+    Write a synthetic raw dataset (data_hanoi_<category>.ttl) with write_turtle_file.
+
+    Args:
+        output_dir: Directory for the generated TTL files
+        scale: Multiple of the current Hanoi entity counts (1, 10, 100, ...)
+        seed: Random seed; the same seed and scale give identical files
+        categories: Subset of categories (default: all configured)
+        profiles: Precomputed profiles (sampled from datav2 if omitted)
+
+    Returns:
+        Number of generated entities per category
+    """
+    from osm_data_fetcher import write_turtle_file
+
+    profiles = profiles or sample_profiles()
+    rng = random.Random(seed)
+    counts = {}
+    next_id = 10_000_000_000
+    for category, _, _, schema_type in AMENITY_TYPES:
+        if categories and category not in categories:
+            continue
+        elements = generate_elements(category, profiles[category], scale, rng, next_id)
+        next_id += len(elements)
+        write_turtle_file(elements, Path(output_dir) / f"data_hanoi_{category}.ttl",
+                          category, schema_type)
+        counts[category] = len(elements)
+    return counts
+
+
+def main():
+    """Entry point: python -m benchmarks.synthetic_data OUTPUT_DIR [--scale 10]."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic Hanoi POI dataset")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiple of the current Hanoi size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--categories", nargs="*", help="Only these categories")
+    args = parser.parse_args()
+
+    counts = generate_dataset(args.output_dir, args.scale, args.seed, args.categories)
+    print(f"Generated {sum(counts.values()):,} entities in {len(counts)} files "
+          f"under {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
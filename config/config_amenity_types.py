@@ -76,4 +76,12 @@ BATCH_CONFIG = {
     'delay_between_api_calls': 2,   # Seconds to wait between Overpass API calls
     'max_retries': 3,                # Maximum retries for failed API calls
     'timeout': 120,                  # Request timeout in seconds
+
+    # Pipelined execution (BatchProcessor.process_all)
+    'fetch_workers': 1,              # Concurrent Overpass fetches
+    'enrich_workers': 2,             # Concurrent Wikidata enrichment workers
+    'write_workers': 1,              # Concurrent Turtle writers
+    'queue_size': 2,                 # Categories buffered between two stages
+    'overpass_requests_per_second': 1.0,   # Shared Overpass budget for all fetch workers
+    'wikidata_requests_per_second': 5.0,   # Shared Wikidata budget for all enrich workers
 }
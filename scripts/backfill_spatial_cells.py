@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+@File    : backfill_spatial_cells.py
+@Project : OpenDataFitHou
+@Date    : 2025-12-01
+@Author  : MFitHou Team
+
+Gắn cell ID (geohash nhiều độ phân giải) cho các POI trong các file TTL đã có,
+ví dụ datav2/cleaned, để truy vấn bán kính/bbox lọc trước bằng so khớp chuỗi.
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Sequence
+
+from rdflib import Graph, Literal, Namespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "utils"))
+from graph_snapshot import load_graph
+from poi_loader import find_poi_files
+from spatial_cells import CELL_PRECISIONS, cell_ids, cell_predicate
+
+GEO = Namespace("http://www.opengis.net/ont/geosparql#")
+EXT = Namespace("http://opendatafithou.org/def/extension/")
+SCHEMA = Namespace("http://schema.org/")
+
+
+def add_spatial_cells(graph: Graph, precisions: Sequence[int] = CELL_PRECISIONS) -> int:
+    """
+    Attach ext:geohash_<p> literals to every entity with a WKT point.
+
+    Existing cell IDs at these precisions are replaced, so the backfill can
+    be re-run safely.
+
+    Args:
+        graph: Graph of one category file
+        precisions: Geohash precisions to attach
+
+    Returns:
+        Number of entities updated
+    """
+    updated = 0
+    for subject, wkt in list(graph.subject_objects(GEO.asWKT)):
+        wkt = str(wkt)
+        if "POINT" not in wkt:
+            continue
+        try:
+            lon, lat = map(float, wkt.split("POINT(")[1].split(")")[0].split())
+        except (IndexError, ValueError):
+            continue
+        for precision, cell in cell_ids(lat, lon, precisions).items():
+            graph.set((subject, EXT[cell_predicate(precision)], Literal(cell)))
+        updated += 1
+    return updated
+
+
+def backfill_file(input_file: Path, output_file: Path = None,
+                  precisions: Sequence[int] = CELL_PRECISIONS) -> int:
+    """
+    Add cell IDs to one Turtle file (in place unless output_file is given).
+
+    Returns:
+        Number of entities updated
+    """
+    graph = load_graph(input_file)
+    updated = add_spatial_cells(graph, precisions)
+    graph.bind("ext", EXT)
+    graph.namespace_manager.bind("schema", SCHEMA, override=True, replace=True)
+    graph.serialize(destination=str(output_file or input_file), format="turtle")
+    return updated
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(
+        description="Attach geohash cell IDs to POIs in existing TTL files")
+    parser.add_argument("data_dir", nargs="?",
+                        default=str(Path(__file__).resolve().parent.parent / "datav2" / "cleaned"),
+                        help="Directory with POI .ttl files (default: datav2/cleaned)")
+    parser.add_argument("--precisions", type=int, nargs="+", default=list(CELL_PRECISIONS),
+                        help=f"Geohash precisions (default: {' '.join(map(str, CELL_PRECISIONS))})")
+    args = parser.parse_args()
+
+    files = find_poi_files(args.data_dir)
+    if not files:
+        print(f"⚠️  No POI files found in {args.data_dir}")
+        return
+
+    total = 0
+    for ttl_file in files:
+        updated = backfill_file(ttl_file, precisions=args.precisions)
+        total += updated
+        print(f"  ✓ {ttl_file.name}: {updated} entities")
+    print(f"\n✅ Added cell IDs to {total:,} entities in {len(files)} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,13 +28,18 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 Example queries demonstrating the spatial topology capabilities.
 """
 
-from rdflib import Graph, Namespace
+import sys
 from collections import Counter
+from pathlib import Path
 
-# Load topology graph
+from rdflib import Namespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "utils"))
+from triple_store import SUBJ, TripleStore
+
+# Load topology graph into the compact integer-encoded store
 print("Loading topology graph...")
-g = Graph()
-g.parse("datav2/data_hanoi_topology.ttl", format="turtle")
+g = TripleStore.from_file("datav2/data_hanoi_topology.ttl", format="turtle")
 
 # Define namespaces
 SCHEMA = Namespace("http://schema.org/")
@@ -44,31 +49,27 @@ FIWARE = Namespace("https://smartdatamodels.org/dataModel.PointOfInterest/")
 print(f"✓ Loaded {len(g):,} spatial relationships\n")
 print("=" * 80)
 
+
+def category(entity) -> str:
+    """POI category from its URI (urn:ngsi-ld:PointOfInterest:Hanoi:<category>:<id>)."""
+    return str(entity).split(":")[-2]
+
+
 # ============================================================================
 # QUERY 1: Find all facilities within 50m (contained in place)
 # ============================================================================
 print("\n📍 QUERY 1: Facilities strictly contained within other facilities (≤50m)")
 print("-" * 80)
 
-query1 = """
-PREFIX schema: <http://schema.org/>
-
-SELECT ?source ?target
-WHERE {
-    ?source schema:containedInPlace ?target .
-}
-LIMIT 10
-"""
-
-results = g.query(query1)
-for i, (source, target) in enumerate(results, 1):
-    source_type = str(source).split(":")[-2]
-    target_type = str(target).split(":")[-2]
+contained = g.triples((None, SCHEMA.containedInPlace, None), limit=10)
+for i, (source, _, target) in enumerate(contained, 1):
+    source_type = category(source)
+    target_type = category(target)
     print(f"  {i}. {source_type} → {target_type}")
 
 # Count by type
-contained_pairs = [(str(s).split(":")[-2], str(t).split(":")[-2]) 
-                   for s, t in g.query(query1.replace("LIMIT 10", ""))]
+contained_pairs = [(category(s), category(t))
+                   for s, _, t in g.triples((None, SCHEMA.containedInPlace, None))]
 print(f"\nTotal: {len(contained_pairs)} containment relationships")
 top_pairs = Counter(contained_pairs).most_common(5)
 print("Top pairs:")
@@ -81,30 +82,15 @@ for (src, tgt), count in top_pairs:
 print("\n\n🚌 QUERY 2: Schools accessible by bus (via amenityFeature)")
 print("-" * 80)
 
-query2 = """
-PREFIX schema: <http://schema.org/>
-PREFIX fiware: <https://smartdatamodels.org/dataModel.PointOfInterest/>
-
-SELECT ?bus_stop ?school
-WHERE {
-    ?bus_stop a schema:BusStop ;
-              schema:amenityFeature ?school .
-    ?school a schema:School .
-}
-LIMIT 15
-"""
-
-results = g.query(query2)
-count = 0
-for bus_stop, school in results:
-    count += 1
+# The topology file carries no rdf:type triples; categories come from the URIs
+bus_school = [(s, o) for s, _, o in g.triples((None, SCHEMA.amenityFeature, None))
+              if category(s) == "bus_stop" and category(o) == "school"]
+for count, (bus_stop, school) in enumerate(bus_school[:15], 1):
     bus_id = str(bus_stop).split(":")[-1]
     school_id = str(school).split(":")[-1]
     print(f"  {count}. Bus stop {bus_id} serves school {school_id}")
 
-total_query = query2.replace("LIMIT 15", "")
-total_results = list(g.query(total_query))
-print(f"\nTotal: {len(total_results)} bus-school connections")
+print(f"\nTotal: {len(bus_school)} bus-school connections")
 
 # ============================================================================
 # QUERY 3: Healthcare network (pharmacies near hospitals)
@@ -112,20 +98,9 @@ print(f"\nTotal: {len(total_results)} bus-school connections")
 print("\n\n⚕️ QUERY 3: Pharmacies near hospitals/clinics")
 print("-" * 80)
 
-query3 = """
-PREFIX schema: <http://schema.org/>
-
-SELECT ?pharmacy ?healthcare
-WHERE {
-    ?pharmacy a schema:Pharmacy ;
-              schema:isNextTo ?healthcare .
-    { ?healthcare a schema:Hospital } UNION { ?healthcare a schema:Clinic }
-}
-LIMIT 10
-"""
-
-results = g.query(query3)
-for i, (pharmacy, healthcare) in enumerate(results, 1):
+pharmacy_links = [(s, o) for s, _, o in g.triples((None, SCHEMA.isNextTo, None))
+                  if category(s) == "pharmacy" and category(o) in ("hospital", "clinic")]
+for i, (pharmacy, healthcare) in enumerate(pharmacy_links[:10], 1):
     pharm_id = str(pharmacy).split(":")[-1]
     health_id = str(healthcare).split(":")[-1]
     health_type = "Hospital" if "hospital" in str(healthcare) else "Clinic"
@@ -137,21 +112,9 @@ for i, (pharmacy, healthcare) in enumerate(results, 1):
 print("\n\n🌟 QUERY 4: Most connected amenities (top hubs)")
 print("-" * 80)
 
-query4 = """
-PREFIX schema: <http://schema.org/>
-
-SELECT ?entity (COUNT(?target) as ?connections)
-WHERE {
-    ?entity ?predicate ?target .
-}
-GROUP BY ?entity
-ORDER BY DESC(?connections)
-LIMIT 10
-"""
-
-results = g.query(query4)
-for i, (entity, connections) in enumerate(results, 1):
-    entity_type = str(entity).split(":")[-2]
+hubs = g.group_count(SUBJ)
+for i, (entity, connections) in enumerate(list(hubs.items())[:10], 1):
+    entity_type = category(entity)
     entity_id = str(entity).split(":")[-1]
     print(f"  {i}. {entity_type} {entity_id}: {connections} connections")
 
@@ -161,21 +124,10 @@ for i, (entity, connections) in enumerate(results, 1):
 print("\n\n🚨 QUERY 5: Emergency service network")
 print("-" * 80)
 
-query5 = """
-PREFIX ext: <http://opendatafithou.org/def/extension/>
-PREFIX schema: <http://schema.org/>
-
-SELECT ?source ?target
-WHERE {
-    ?source ext:emergencyService ?target .
-}
-"""
-
-results = g.query(query5)
 emergency_pairs = []
-for source, target in results:
-    src_type = str(source).split(":")[-2].replace("_", " ").title()
-    tgt_type = str(target).split(":")[-2].replace("_", " ").title()
+for source, _, target in g.triples((None, EXT.emergencyService, None)):
+    src_type = category(source).replace("_", " ").title()
+    tgt_type = category(target).replace("_", " ").title()
     emergency_pairs.append((src_type, tgt_type))
 
 if emergency_pairs:
@@ -191,20 +143,10 @@ else:
 print("\n\n🅿️ QUERY 6: Parking facilities with public access")
 print("-" * 80)
 
-query6 = """
-PREFIX schema: <http://schema.org/>
-
-SELECT ?parking ?destination
-WHERE {
-    ?parking schema:publicAccess ?destination .
-}
-LIMIT 10
-"""
-
-results = g.query(query6)
-for i, (parking, destination) in enumerate(results, 1):
+public_access = g.triples((None, SCHEMA.publicAccess, None), limit=10)
+for i, (parking, _, destination) in enumerate(public_access, 1):
     park_id = str(parking).split(":")[-1]
-    dest_type = str(destination).split(":")[-2].replace("_", " ").title()
+    dest_type = category(destination).replace("_", " ").title()
     dest_id = str(destination).split(":")[-1]
     print(f"  {i}. Parking {park_id} serves {dest_type} {dest_id}")
 
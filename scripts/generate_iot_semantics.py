@@ -28,13 +28,19 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 import os
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, RDFS, XSD, OWL
 from geopy.distance import geodesic
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "utils"))
+from geo_index import StationIndex
+from poi_loader import find_poi_files, load_poi_arrays
+
 # ============================================================================
 # NAMESPACES
 # ============================================================================
@@ -323,12 +329,25 @@ def generate_iot_infrastructure(output_path: str = "datav2/iot_infrastructure.tt
 # PART 2: GENERATE IOT COVERAGE (POI-STATION LINKS)
 # ============================================================================
 
-def load_pois_from_ttl(data_dir: str = "datav2/cleaned") -> List[Tuple[URIRef, float, float]]:
+def load_pois_from_ttl(
+    data_dir: str = "datav2/cleaned",
+    categories: Optional[List[str]] = None,
+    workers: Optional[int] = None
+) -> Dict[str, np.ndarray]:
     """
-    Load tất cả POIs từ các file .ttl trong data_dir.
+    Load tất cả POIs từ các file POI .ttl trong data_dir.
+    
+    Files are read by a line scanner (poi_loader.scan_wkt_points) in a process
+    pool instead of being parsed into graphs; topology and IoT outputs in the
+    same directory are skipped.
+    
+    Args:
+        data_dir: Directory with POI TTL files
+        categories: Only load these categories (None loads all)
+        workers: Number of processes (default: CPU count)
     
     Returns:
-        List of tuples: (POI_URI, latitude, longitude)
+        Dictionary of arrays: 'uri', 'lat', 'lon', 'category'
     """
     print("=" * 80)
     print("📥 LOADING POIs FROM TTL FILES")
@@ -337,51 +356,13 @@ def load_pois_from_ttl(data_dir: str = "datav2/cleaned") -> List[Tuple[URIRef, f
     data_path = Path(data_dir)
     if not data_path.exists():
         print(f"❌ Directory not found: {data_dir}")
-        return []
+        return load_poi_arrays(data_path, categories=[])
     
-    ttl_files = list(data_path.glob("*.ttl"))
-    print(f"\n📂 Found {len(ttl_files)} TTL files")
+    print(f"\n📂 Found {len(find_poi_files(data_path, categories))} POI files")
     
-    pois = []
-    
-    for ttl_file in tqdm(ttl_files, desc="Loading POIs"):
-        g = Graph()
-        try:
-            g.parse(str(ttl_file), format="turtle")
-            
-            # Query để lấy POI URIs và coordinates từ WKT format
-            # Format: "POINT(lon lat)"^^geo:wktLiteral
-            query = """
-                PREFIX geo: <http://www.opengis.net/ont/geosparql#>
-                
-                SELECT ?poi ?wkt
-                WHERE {
-                    ?poi geo:asWKT ?wkt .
-                }
-            """
-            
-            results = g.query(query)
-            
-            for row in results:
-                poi_uri = row.poi
-                wkt_str = str(row.wkt)
-                
-                # Parse WKT: "POINT(lon lat)"
-                try:
-                    # Extract coordinates from POINT(lon lat)
-                    coords = wkt_str.replace("POINT(", "").replace(")", "").strip()
-                    lon_str, lat_str = coords.split()
-                    lon = float(lon_str)
-                    lat = float(lat_str)
-                    pois.append((poi_uri, lat, lon))
-                except Exception as e:
-                    # Skip invalid WKT
-                    continue
-        
-        except Exception as e:
-            print(f"   ⚠️  Error parsing {ttl_file.name}: {e}")
+    pois = load_poi_arrays(data_path, categories=categories, workers=workers)
     
-    print(f"\n✅ Loaded {len(pois)} POIs")
+    print(f"\n✅ Loaded {len(pois['uri'])} POIs")
     return pois
 
 
@@ -409,14 +390,26 @@ def find_nearest_station(poi_lat: float, poi_lon: float, stations: List[Dict]) -
 
 
 def generate_iot_coverage(
-    pois: List[Tuple[URIRef, float, float]], 
-    output_path: str = "datav2/iot_coverage.ttl"
+    pois: Dict[str, np.ndarray],
+    output_path: str = "datav2/iot_coverage.ttl",
+    k: int = 1,
+    radius_km: Optional[float] = None
 ):
     """
     Generate iot_coverage.ttl - Linking POIs to nearest monitoring stations.
     
     Concept: POI sosa:isSampledBy Station
     Meaning: Environmental data for this POI is sampled/monitored by that station
+    
+    All POIs are matched in one batched query against a StationIndex (KD-tree
+    on projected coordinates, geodesic distances for the candidates only).
+    
+    Args:
+        pois: POI arrays from load_pois_from_ttl ('uri', 'lat', 'lon')
+        output_path: Output TTL file
+        k: Number of nearest stations linked to each POI
+        radius_km: If set, link every station within this distance instead;
+            POIs with no station in range keep their nearest station
     """
     print("\n" + "=" * 80)
     print("🔗 PART 2: GENERATING IOT COVERAGE LINKS")
@@ -432,26 +425,39 @@ def generate_iot_coverage(
     g.bind("rdf", RDF)
     g.bind("rdfs", RDFS)
     
-    print(f"\n📊 Processing {len(pois)} POIs...")
+    poi_count = len(pois["uri"])
+    print(f"\n📊 Processing {poi_count} POIs...")
     
     # Statistics
     coverage_stats = {station["id"]: 0 for station in STATIONS}
-    total_distance = 0.0
+    
+    # One batched lookup for all POIs
+    index = StationIndex(STATIONS)
+    poi_lat, poi_lon = pois["lat"], pois["lon"]
+    nearest_idx, nearest_km = index.nearest(poi_lat, poi_lon, k=max(1, k))
+    
+    if radius_km is not None:
+        poi_idx, station_idx, _ = index.within(poi_lat, poi_lon, radius_km)
+        covered = np.zeros(poi_count, dtype=bool)
+        covered[poi_idx] = True
+        uncovered = np.nonzero(~covered)[0]
+        poi_idx = np.concatenate([poi_idx, uncovered])
+        station_idx = np.concatenate([station_idx, nearest_idx[uncovered, 0]])
+    else:
+        poi_idx = np.repeat(np.arange(poi_count), nearest_idx.shape[1])
+        station_idx = nearest_idx.ravel()
     
     # Generate links
-    for poi_uri, poi_lat, poi_lon in tqdm(pois, desc="Linking POIs to stations"):
-        nearest_station_uri, distance_km = find_nearest_station(poi_lat, poi_lon, STATIONS)
-        
+    station_uris = [URIRef(station_id) for station_id in index.ids]
+    poi_uris = pois["uri"]
+    for p, s in zip(poi_idx.tolist(), station_idx.tolist()):
         # Generate triple: POI sosa:isSampledBy Station
-        g.add((poi_uri, SOSA.isSampledBy, URIRef(nearest_station_uri)))
-        
-        # Optional: Add distance as annotation
-        # g.add((poi_uri, SCHEMA.distance, Literal(distance_km, datatype=XSD.decimal)))
-        
-        coverage_stats[nearest_station_uri] += 1
-        total_distance += distance_km
+        g.add((URIRef(poi_uris[p]), SOSA.isSampledBy, station_uris[s]))
+        coverage_stats[index.station_id(s)] += 1
     
-    print(f"\n✅ Generated {len(pois)} POI-Station links")
+    total_distance = float(nearest_km[:, 0].sum())
+    
+    print(f"\n✅ Generated {len(poi_idx)} POI-Station links")
     
     # Print coverage statistics
     print(f"\n📊 Coverage Statistics:")
@@ -461,7 +467,7 @@ def generate_iot_coverage(
         count = coverage_stats[station["id"]]
         print(f"{station['name']:<30} {count:<15}")
     
-    avg_distance = total_distance / len(pois) if pois else 0
+    avg_distance = total_distance / poi_count if poi_count else 0
     print(f"\n📏 Average distance POI → Station: {avg_distance:.2f} km")
     
     # Save to file
@@ -475,8 +481,8 @@ def generate_iot_coverage(
     print(f"   - Size: {output_file.stat().st_size / 1024:.2f} KB")
     
     return g
-
-
+    
+    
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
@@ -495,7 +501,7 @@ def main():
     # Part 2: Load POIs and generate coverage
     pois = load_pois_from_ttl()
     
-    if pois:
+    if len(pois["uri"]):
         coverage_graph = generate_iot_coverage(pois)
     else:
         print("\n⚠️  No POIs found. Skipping coverage generation.")
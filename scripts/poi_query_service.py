@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+@File    : poi_query_service.py
+@Project : OpenDataFitHou
+@Date    : 2025-12-01
+@Author  : MFitHou Team
+
+Dịch vụ truy vấn POI theo không gian chạy trong bộ nhớ: tìm trong bán kính,
+trong bbox, k POI gần nhất (lọc theo category) và tìm theo tên (không dấu,
+chịu lỗi chính tả), qua HTTP/JSON hoặc CLI xử lý hàng loạt từ file CSV.
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "utils"))
+from name_index import NameIndex
+from poi_index import POIIndex, load_poi_records
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "datav2" / "cleaned"
+
+
+class QueryError(ValueError):
+    """Invalid query parameters (answered with HTTP 400)."""
+
+
+def _number(params: Dict[str, List[str]], name: str, default: Optional[float] = None) -> float:
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise QueryError(f"missing parameter: {name}")
+        return default
+    try:
+        value = float(values[0])
+    except ValueError:
+        raise QueryError(f"parameter {name} must be a number")
+    if not math.isfinite(value):
+        raise QueryError(f"parameter {name} must be a finite number")
+    return value
+
+
+def _count(params: Dict[str, List[str]], name: str, default: Optional[int] = None) -> Optional[int]:
+    if not params.get(name):
+        return default
+    value = _number(params, name)
+    if value != int(value) or value < 1:
+        raise QueryError(f"parameter {name} must be a positive integer")
+    return int(value)
+
+
+def _coordinate(params: Dict[str, List[str]], name: str, bound: float) -> float:
+    value = _number(params, name)
+    if abs(value) > bound:
+        raise QueryError(f"parameter {name} must be between -{bound:g} and {bound:g}")
+    return value
+
+
+def _categories(params: Dict[str, List[str]]) -> Optional[List[str]]:
+    values = [c.strip() for value in params.get('category', [])
+              for c in value.split(',') if c.strip()]
+    return values or None
+
+
+def run_query(index: POIIndex, endpoint: str, params: Dict[str, List[str]],
+              names: Optional[NameIndex] = None) -> Dict[str, Any]:
+    """
+    Answer one query against the index.
+
+    Args:
+        index: Loaded POIIndex
+        endpoint: 'radius', 'bbox', 'nearest', 'search' or 'health'
+        params: Query string parameters (parse_qs format)
+        names: Name index for /search
+
+    Returns:
+        JSON-serialisable response
+
+    Raises:
+        QueryError: Unknown endpoint or invalid parameters
+    """
+    if endpoint == 'health':
+        return {'pois': len(index), 'categories': index.categories()}
+
+    categories = _categories(params)
+    limit = _count(params, 'limit')
+    started = time.perf_counter()
+    if endpoint == 'radius':
+        radius = _number(params, 'radius', 500.0)
+        if radius < 0:
+            raise QueryError("parameter radius must not be negative")
+        results = index.radius(_coordinate(params, 'lat', 90), _coordinate(params, 'lon', 180),
+                               radius, categories, limit)
+    elif endpoint == 'bbox':
+        results = index.bbox(_coordinate(params, 'min_lat', 90),
+                             _coordinate(params, 'min_lon', 180),
+                             _coordinate(params, 'max_lat', 90),
+                             _coordinate(params, 'max_lon', 180),
+                             categories, limit)
+    elif endpoint == 'nearest':
+        max_distance = _number(params, 'max_distance', -1.0)
+        results = index.nearest(_coordinate(params, 'lat', 90), _coordinate(params, 'lon', 180),
+                                _count(params, 'k', 10),
+                                categories, max_distance if max_distance >= 0 else None)
+    elif endpoint == 'search' and names is not None:
+        query = params.get('q', [''])[0]
+        if not query.strip():
+            raise QueryError("missing parameter: q")
+        near = ((_coordinate(params, 'lat', 90), _coordinate(params, 'lon', 180))
+                if 'lat' in params else None)
+        results = names.search(query, limit or 10, near=near, categories=categories)
+    else:
+        raise QueryError(f"unknown endpoint: /{endpoint}")
+    return {'count': len(results), 'took_ms': round((time.perf_counter() - started) * 1000, 3),
+            'results': results}
+
+
+def make_handler(index: POIIndex, names: Optional[NameIndex] = None):
+    """Request handler class bound to the indexes."""
+
+    class POIQueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                body = run_query(index, url.path.strip('/'), parse_qs(url.query), names)
+                status = 200
+            except QueryError as e:
+                body, status = {'error': str(e)}, 400
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return POIQueryHandler
+
+
+def load_index(data_dir, cache_file: Optional[str] = None) -> Tuple[POIIndex, NameIndex]:
+    """Load the POIs (binary cache or TTL) and build the spatial and name indexes, with timings."""
+    started = time.perf_counter()
+    records = load_poi_records(data_dir, cache_file)
+    index = POIIndex(records)
+    names = NameIndex.from_records(records)
+    print(f"✓ Indexed {len(index):,} POIs in {len(index.categories())} categories "
+          f"({time.perf_counter() - started:.2f}s)")
+    return index, names
+
+
+def batch_queries(index: POIIndex, input_csv: str, output_csv: str, mode: str = 'nearest',
+                  k: int = 5, radius_m: float = 500.0,
+                  categories: Optional[List[str]] = None) -> int:
+    """
+    Run one query per row of a CSV with 'lat' and 'lon' columns (and an optional 'id').
+
+    Args:
+        index: Loaded POIIndex
+        input_csv: Input CSV path
+        output_csv: Output CSV path, one row per result
+        mode: 'nearest' (k results) or 'radius' (all within radius_m)
+        k: Results per point in nearest mode
+        radius_m: Radius in radius mode
+        categories: Only these categories
+
+    Returns:
+        Number of result rows written
+    """
+    columns = ['id', 'query_lat', 'query_lon', 'rank', 'uri', 'category', 'name_vi', 'name_en',
+               'lat', 'lon', 'distance_m']
+    written = 0
+    with open(input_csv, 'r', encoding='utf-8', newline='') as f_in, \
+            open(output_csv, 'w', encoding='utf-8', newline='') as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=columns)
+        writer.writeheader()
+        for row_number, row in enumerate(csv.DictReader(f_in), start=1):
+            lat, lon = float(row['lat']), float(row['lon'])
+            if mode == 'radius':
+                results = index.radius(lat, lon, radius_m, categories)
+            else:
+                results = index.nearest(lat, lon, k, categories)
+            for rank, result in enumerate(results, start=1):
+                writer.writerow({'id': row.get('id', row_number), 'query_lat': lat,
+                                 'query_lon': lon, 'rank': rank, **result})
+                written += 1
+    return written
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="In-memory spatial POI query service")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR),
+                        help="Directory with cleaned POI .ttl files")
+    parser.add_argument("--cache", default=None,
+                        help="Binary POI cache "
+                             "(default: <data-dir>/.poi_index.npz; '' disables it)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve", help="Serve /radius, /bbox, /nearest, /search and /health over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8090)
+
+    batch = commands.add_parser("batch", help="Query every point of a CSV (columns lat, lon[, id])")
+    batch.add_argument("input_csv")
+    batch.add_argument("output_csv")
+    batch.add_argument("--mode", choices=["nearest", "radius"], default="nearest")
+    batch.add_argument("-k", type=int, default=5, help="Results per point (nearest mode)")
+    batch.add_argument("--radius", type=float, default=500.0, help="Radius in meters (radius mode)")
+    batch.add_argument("--category", action="append", help="Restrict to a category (repeatable)")
+    args = parser.parse_args()
+
+    index, names = load_index(args.data_dir, args.cache)
+
+    if args.command == "batch":
+        started = time.perf_counter()
+        written = batch_queries(index, args.input_csv, args.output_csv, args.mode, args.k,
+                                args.radius, args.category)
+        print(f"✅ Wrote {written:,} results to {args.output_csv} "
+              f"({time.perf_counter() - started:.2f}s)")
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(index, names))
+    print(f"🌐 Serving on http://{args.host}:{args.port} "
+          "(/radius?lat=&lon=&radius=  /bbox?min_lat=&min_lon=&max_lat=&max_lon=  "
+          "/nearest?lat=&lon=&k=  /search?q=)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠ Stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
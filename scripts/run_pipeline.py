@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+@File    : run_pipeline.py
+@Project : OpenDataFitHou
+@Date    : 2025-12-01
+@Author  : MFitHou Team
+
+Make-style runner cho toàn bộ pipeline:
+fetch → clean → second pass → topology / duplicates → IoT coverage.
+
+Mỗi category là một target riêng; chỉ những target có input, code hoặc
+tham số thay đổi mới được build lại. Topology dùng cache shard theo từng cặp
+(source, target, predicate), nên thay đổi một category chỉ tính lại các liên
+kết liên quan.
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+for folder in ("config", "src/utils", "src/fetchers", "src/processors", "scripts"):
+    sys.path.insert(0, str(ROOT / folder))
+
+from pipeline_runner import PipelineRunner, Target
+from config_amenity_types import AMENITY_TYPES
+from clean_all_remaining import UniversalDataCleaner
+from generate_topology import LINK_CONFIG
+from topology_adjacency import adjacency_paths
+
+# ============================================================================
+# ARTIFACT LOCATIONS (relative to the repository root)
+# ============================================================================
+RAW_DIR = "datav2"
+CLEANED_DIR = "datav2/cleaned"
+SECOND_PASS_DIR = "datav2/cleanedv2"
+TOPOLOGY_CACHE_DIR = "datav2/topology"
+TOPOLOGY_FILE = "datav2/data_hanoi_topology.ttl"
+DUPLICATES_FILE = "datav2/data_hanoi_duplicates.ttl"
+DUPLICATES_REPORT = "datav2/duplicates_report.json"
+IOT_INFRASTRUCTURE_FILE = "datav2/iot_infrastructure.ttl"
+IOT_COVERAGE_FILE = "datav2/iot_coverage.ttl"
+STATE_FILE = "datav2/.pipeline_state.json"
+
+# Code each stage depends on; editing one of these rebuilds that stage
+FETCH_CODE = ["src/fetchers/osm_data_fetcher.py", "src/utils/brand_matcher.py",
+              "src/utils/spatial_cells.py", "config/brand_knowledge_base.json",
+              "config/config_amenity_types.py"]
+# Every stage that reads Turtle through graph_snapshot.load_graph
+SNAPSHOT_CODE = ["src/utils/graph_snapshot.py", "src/utils/triple_store.py"]
+CLEAN_CODE = ["src/processors/clean_all_remaining.py",
+              "src/processors/entity_table.py"] + SNAPSHOT_CODE
+SECOND_PASS_CODE = ["src/processors/second_pass_cleaning.py", "src/processors/entity_table.py",
+                    "src/utils/smart_translate_lookup.py",
+                    "src/utils/translation_cache.py"] + SNAPSHOT_CODE
+SINGLE_PASS_CODE = ["src/processors/single_pass_naming.py", "src/processors/clean_all_remaining.py",
+                    "src/processors/entity_table.py",
+                    "src/utils/smart_translate_lookup.py"] + SNAPSHOT_CODE
+TOPOLOGY_CODE = ["src/processors/generate_topology.py",
+                 "src/processors/topology_adjacency.py"] + SNAPSHOT_CODE
+DUPLICATES_CODE = ["src/processors/resolve_duplicates.py", "src/utils/name_index.py",
+                   "src/utils/brand_matcher.py", "src/utils/poi_loader.py"] + SNAPSHOT_CODE
+IOT_CODE = ["scripts/generate_iot_semantics.py", "src/utils/geo_index.py",
+            "src/utils/poi_loader.py"]
+
+
+def raw_file(category: str) -> str:
+    return f"{RAW_DIR}/data_hanoi_{category}.ttl"
+
+
+def cleaned_file(category: str) -> str:
+    return f"{CLEANED_DIR}/data_hanoi_{category}_cleaned.ttl"
+
+
+def second_pass_file(category: str) -> str:
+    return f"{SECOND_PASS_DIR}/data_hanoi_{category}_cleanedv2.ttl"
+
+
+# ============================================================================
+# ACTIONS (module-level so they can run in worker processes)
+# ============================================================================
+def fetch_category(category: str, osm_key: str, osm_value: str, schema_type: str):
+    """Fetch one category from Overpass and write its raw Turtle file."""
+    from osm_data_fetcher import process_amenity_data
+    elements = process_amenity_data(category, osm_key, osm_value, schema_type, output_dir=RAW_DIR)
+    if not elements:
+        raise RuntimeError(f"No data found for {osm_key}={osm_value}")
+
+
+def fetch_clean_category(category: str, osm_key: str, osm_value: str, schema_type: str,
+                         output_file: str):
+    """Fetch one category and write its cleaned Turtle file directly (single-pass naming)."""
+    from osm_data_fetcher import process_amenity_data
+    from single_pass_naming import SinglePassNamer
+    with SinglePassNamer(category) as namer:
+        elements = process_amenity_data(category, osm_key, osm_value, schema_type,
+                                        output_file=output_file, namer=namer)
+    if not elements:
+        raise RuntimeError(f"No data found for {osm_key}={osm_value}")
+
+
+def clean_category(input_file: str, output_file: str):
+    """First-pass cleaning of one category."""
+    result = UniversalDataCleaner().process_file(input_file, output_file)
+    if not result.get('success'):
+        raise RuntimeError(result.get('error', 'cleaning failed'))
+
+
+def second_pass_category(input_file: str, output_file: str):
+    """Second-pass translation of one category."""
+    from second_pass_cleaning import SecondPassCleaner
+    cleaner = SecondPassCleaner()
+    try:
+        result = cleaner.process_file(input_file, output_file)
+    finally:
+        cleaner.translator.close()
+    if not result.get('success'):
+        raise RuntimeError(result.get('error', 'second pass failed'))
+
+
+def build_topology(data_dir: str, output_file: str, cache_dir: str):
+    """Regenerate the topology, recomputing only the link shards of changed categories."""
+    from generate_topology import generate_topology
+    generate_topology(Path(data_dir), Path(output_file), cache_dir=Path(cache_dir))
+
+
+def build_duplicates(data_dir: str, output_file: str, report_file: str):
+    """owl:sameAs links and merge suggestions for POIs present in several files."""
+    from resolve_duplicates import detect_duplicates
+    detect_duplicates(data_dir, output_file, report_file)
+
+
+def build_iot_infrastructure(output_file: str):
+    """Stations, sensors and observable properties."""
+    from generate_iot_semantics import generate_iot_infrastructure
+    generate_iot_infrastructure(output_file)
+
+
+def build_iot_coverage(data_dir: str, output_file: str):
+    """POI → nearest station links for every cleaned POI file."""
+    from generate_iot_semantics import generate_iot_coverage, load_pois_from_ttl
+    pois = load_pois_from_ttl(data_dir)
+    if not len(pois["uri"]):
+        raise RuntimeError(f"No POIs found in {data_dir}")
+    generate_iot_coverage(pois, output_file)
+
+
+# ============================================================================
+# DEPENDENCY GRAPH
+# ============================================================================
+def build_targets(single_pass: bool = False) -> List[Target]:
+    """
+    Describe every artifact of the pipeline and how it is produced.
+
+    With single_pass, categories handled by the cleaner are named while they
+    are fetched and written straight to the cleaned directory, so their clean
+    target is left out (run without --single-pass to reprocess existing raw
+    files). The second pass still translates the names missing from the
+    translation cache into the second-pass directory.
+    """
+    targets = []
+    clean_categories = set(UniversalDataCleaner.all_categories())
+
+    for category, osm_key, osm_value, schema_type in AMENITY_TYPES:
+        if single_pass and category in clean_categories:
+            targets.append(Target(
+                f"fetch:{category}", [cleaned_file(category)], fetch_clean_category,
+                args=(category, osm_key, osm_value, schema_type, cleaned_file(category)),
+                code=FETCH_CODE + SINGLE_PASS_CODE, resource="overpass", adopt_existing=True
+            ))
+        else:
+            targets.append(Target(
+                f"fetch:{category}", [raw_file(category)], fetch_category,
+                args=(category, osm_key, osm_value, schema_type),
+                code=FETCH_CODE, resource="overpass", adopt_existing=True
+            ))
+        if category not in clean_categories:
+            continue
+        if not single_pass:
+            targets.append(Target(
+                f"clean:{category}", [cleaned_file(category)], clean_category,
+                args=(raw_file(category), cleaned_file(category)),
+                inputs=[raw_file(category)], code=CLEAN_CODE, resource="nominatim"
+            ))
+        targets.append(Target(
+            f"second_pass:{category}", [second_pass_file(category)], second_pass_category,
+            args=(cleaned_file(category), second_pass_file(category)),
+            inputs=[cleaned_file(category)], code=SECOND_PASS_CODE, resource="wikidata"
+        ))
+
+    # Link shards are cached per (source, target, predicate) in TOPOLOGY_CACHE_DIR
+    topology_datasets = set()
+    for config in LINK_CONFIG:
+        topology_datasets.update(name for name in [config["source"]] + config["targets"]
+                                 if name in clean_categories)
+    targets.append(Target(
+        "topology", [TOPOLOGY_FILE, str(adjacency_paths(TOPOLOGY_FILE)[0])], build_topology,
+        args=(CLEANED_DIR, TOPOLOGY_FILE, TOPOLOGY_CACHE_DIR),
+        inputs=[cleaned_file(name) for name in sorted(topology_datasets)], code=TOPOLOGY_CODE
+    ))
+
+    targets.append(Target(
+        "duplicates", [DUPLICATES_FILE, DUPLICATES_REPORT], build_duplicates,
+        args=(CLEANED_DIR, DUPLICATES_FILE, DUPLICATES_REPORT),
+        inputs=[cleaned_file(category) for category in sorted(clean_categories)],
+        code=DUPLICATES_CODE
+    ))
+
+    targets.append(Target(
+        "iot:infrastructure", [IOT_INFRASTRUCTURE_FILE], build_iot_infrastructure,
+        args=(IOT_INFRASTRUCTURE_FILE,), code=IOT_CODE
+    ))
+    targets.append(Target(
+        "iot:coverage", [IOT_COVERAGE_FILE], build_iot_coverage,
+        args=(CLEANED_DIR, IOT_COVERAGE_FILE),
+        inputs=[cleaned_file(category) for category in sorted(clean_categories)], code=IOT_CODE
+    ))
+    return targets
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Incremental OpenDataFitHou pipeline runner")
+    parser.add_argument("targets", nargs="*",
+                        help="Targets or prefixes to build, e.g. clean:cafe, topology, "
+                             "second_pass: (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 4,
+                        help="Maximum number of targets built in parallel")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Only show what would be rebuilt")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild the selected targets even if up to date")
+    parser.add_argument("--list", action="store_true", help="List all targets")
+    parser.add_argument("--single-pass", action="store_true",
+                        help="Apply the cleaning-stage naming while fetching "
+                             "(no separate clean pass)")
+    args = parser.parse_args()
+
+    # All artifact paths are relative to the repository root
+    os.chdir(ROOT)
+    runner = PipelineRunner(build_targets(args.single_pass), STATE_FILE, max_workers=args.jobs)
+
+    if args.list:
+        for name in runner.select():
+            print(name)
+        return
+
+    if args.dry_run:
+        planned = runner.plan(args.targets, force=args.force)
+        for name, reason in planned:
+            print(f"{name:<40} {reason}")
+        print(f"\n{len(planned)} target(s) would be rebuilt")
+        return
+
+    result = runner.run(args.targets, force=args.force)
+
+    print("\n" + "=" * 80)
+    print("PIPELINE SUMMARY")
+    print("=" * 80)
+    print(f"Built:      {len(result['built'])}")
+    print(f"Up to date: {len(result['skipped'])}")
+    print(f"Failed:     {len(result['failed'])}")
+    print(f"Blocked:    {len(result['blocked'])}")
+    for name in result['failed']:
+        print(f"  ✗ {name}")
+    print("=" * 80)
+
+    if result['failed'] or result['blocked']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -64,6 +64,9 @@ setup(
             "flake8>=5.0.0",
             "mypy>=0.990",
         ],
+        "parquet": [
+            "pyarrow>=12.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
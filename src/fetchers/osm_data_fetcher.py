@@ -29,9 +29,19 @@ Handles retry logic, rate limiting, and robust error handling
 
 import requests
 import json
+import logging
+import sys
 import time
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from pathlib import Path
+from urllib.parse import quote, urlsplit, urlunsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from brand_matcher import BrandMatcher, load_brand_knowledge_base
+from spatial_cells import turtle_cell_lines
+
+logger = logging.getLogger(__name__)
 
 
 class OverpassAPIError(Exception):
@@ -42,164 +52,15 @@ class OverpassAPIError(Exception):
 # ============================================================================
 # BRAND KNOWLEDGE BASE - Auto-enrichment for famous Vietnamese brands
 # ============================================================================
-# This dictionary provides Wikidata IDs, official websites, and legal names
-# for brands that are commonly found in OSM data but lack these tags
-BRAND_KNOWLEDGE_BASE = {
-    # === BANKS (Vietnamese Banking Sector) ===
-    "BIDV": {
-        "wikidata": "Q1003180",
-        "website": "https://www.bidv.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Đầu tư và Phát triển Việt Nam",
-        "legalName_en": "Bank for Investment and Development of Vietnam"
-    },
-    "Agribank": {
-        "wikidata": "Q4693331",
-        "website": "https://www.agribank.com.vn",
-        "legalName_vi": "Ngân hàng Nông nghiệp và Phát triển Nông thôn Việt Nam",
-        "legalName_en": "Vietnam Bank for Agriculture and Rural Development"
-    },
-    "Vietcombank": {
-        "wikidata": "Q1527276",
-        "website": "https://www.vietcombank.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Ngoại thương Việt Nam",
-        "legalName_en": "Joint Stock Commercial Bank for Foreign Trade of Vietnam"
-    },
-    "Techcombank": {
-        "wikidata": "Q7692186",
-        "website": "https://www.techcombank.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Kỹ thương Việt Nam",
-        "legalName_en": "Vietnam Technological and Commercial Joint Stock Bank"
-    },
-    "VietinBank": {
-        "wikidata": "Q1369325",
-        "website": "https://www.vietinbank.vn",
-        "legalName_vi": "Ngân hàng TMCP Công thương Việt Nam",
-        "legalName_en": "Vietnam Joint Stock Commercial Bank for Industry and Trade"
-    },
-    "TPBank": {
-        "wikidata": "Q10822606",
-        "website": "https://tpb.vn",
-        "legalName_vi": "Ngân hàng TMCP Tiên Phong"
-    },
-    "MB": {
-        "wikidata": "Q10795460",
-        "website": "https://mbbank.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Quân đội",
-        "legalName_en": "Military Commercial Joint Stock Bank"
-    },
-    "ACB": {
-        "wikidata": "Q4651228",
-        "website": "https://www.acb.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Á Châu"
-    },
-    "Sacombank": {
-        "wikidata": "Q6099933",
-        "website": "https://www.sacombank.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Sài Gòn Thương Tín"
-    },
-    "VPBank": {
-        "wikidata": "Q7906932",
-        "website": "https://www.vpbank.com.vn",
-        "legalName_vi": "Ngân hàng TMCP Việt Nam Thịnh Vượng"
-    },
-    
-    # === FUEL STATIONS (Petroleum Companies) ===
-    "Petrolimex": {
-        "wikidata": "Q7179041",
-        "website": "https://www.petrolimex.com.vn",
-        "legalName_vi": "Tập đoàn Xăng dầu Việt Nam",
-        "legalName_en": "Vietnam National Petroleum Group",
-        "image": "https://upload.wikimedia.org/wikipedia/commons/2/22/Petrolimex_logo.svg"
-    },
-    "PVOIL": {
-        "wikidata": "Q7120617",
-        "website": "https://www.pvoil.com.vn",
-        "legalName_vi": "Tổng Công ty Dầu Việt Nam",
-        "legalName_en": "PetroVietnam Oil Corporation"
-    },
-    "Shell": {
-        "wikidata": "Q154950",
-        "website": "https://www.shell.com.vn",
-        "legalName_en": "Shell Vietnam"
-    },
-    
-    # === RETAIL & SUPERMARKETS ===
-    "WinMart": {
-        "wikidata": "Q10834617",
-        "website": "https://winmart.vn",
-        "legalName_vi": "Siêu thị WinMart"
-    },
-    "VinMart": {
-        "wikidata": "Q10834617",
-        "website": "https://winmart.vn",
-        "legalName_vi": "Siêu thị VinMart"
-    },
-    "Co.opMart": {
-        "wikidata": "Q5138053",
-        "website": "https://www.co-opmart.com.vn",
-        "legalName_vi": "Siêu thị Co.op Mart"
-    },
-    "BigC": {
-        "wikidata": "Q857695",
-        "website": "https://www.bigc.vn",
-        "legalName_en": "Big C Vietnam"
-    },
-    
-    # === COFFEE & FOOD CHAINS ===
-    "Highlands Coffee": {
-        "wikidata": "Q5759368",
-        "website": "https://www.highlandscoffee.com.vn",
-        "legalName_vi": "Cà phê Highlands"
-    },
-    "Starbucks": {
-        "wikidata": "Q37158",
-        "website": "https://www.starbucks.vn",
-        "legalName_en": "Starbucks Vietnam"
-    },
-    "The Coffee House": {
-        "wikidata": "Q60775742",
-        "website": "https://www.thecoffeehouse.vn",
-        "legalName_vi": "The Coffee House"
-    },
-    "Phở 24": {
-        "wikidata": "Q65088019",
-        "website": "https://www.pho24.com.vn",
-        "legalName_vi": "Phở 24"
-    },
-    "Lotteria": {
-        "wikidata": "Q249525",
-        "website": "https://www.lotteria.vn",
-        "legalName_en": "Lotteria Vietnam"
-    },
-    "KFC": {
-        "wikidata": "Q524757",
-        "website": "https://kfcvietnam.com.vn",
-        "legalName_en": "KFC Vietnam"
-    },
-    
-    # === AUTOMOTIVE ===
-    "VinFast": {
-        "wikidata": "Q56660561",
-        "website": "https://vinfastauto.com",
-        "legalName_vi": "VinFast",
-        "legalName_en": "VinFast"
-    },
-    
-    # === ELECTRONICS & RETAIL ===
-    "Thế Giới Di Động": {
-        "wikidata": "Q61739190",
-        "website": "https://www.thegioididong.com",
-        "legalName_vi": "Công ty Cổ phần Đầu tư Thế Giới Di Động"
-    },
-    "FPT Shop": {
-        "wikidata": "Q5423418",
-        "website": "https://fptshop.com.vn",
-        "legalName_vi": "FPT Shop"
-    }
-}
+# Wikidata IDs, official websites, and legal names for brands that are commonly
+# found in OSM data but lack these tags. The entries live in
+# config/brand_knowledge_base.json so the list can grow without code changes.
+BRAND_KNOWLEDGE_BASE = load_brand_knowledge_base()
+BRAND_MATCHER = BrandMatcher(BRAND_KNOWLEDGE_BASE)
 
 
-def fetch_osm_data(osm_key: str, osm_value: str, area_name: str = "Hanoi") -> List[Dict[str, Any]]:
+def fetch_osm_data(osm_key: str, osm_value: str, area_name: str = "Hanoi",
+                   rate_limiter: Optional[Any] = None) -> List[Dict[str, Any]]:
     """
     Fetch OSM data from Overpass API with retry mechanism
     Uses bounding box approach instead of named area search
@@ -208,6 +69,9 @@ def fetch_osm_data(osm_key: str, osm_value: str, area_name: str = "Hanoi") -> Li
         osm_key: OSM key (e.g., "amenity")
         osm_value: OSM value (e.g., "atm")
         area_name: Area name to search in (default: "Hanoi")
+        rate_limiter: Optional shared limiter with an ``acquire()`` method
+            (e.g. rate_limiter.TokenBucket); replaces the fixed 1s delay
+            between bounding boxes
     
     Returns:
         List of OSM elements (nodes, ways, relations)
@@ -270,6 +134,8 @@ out center;
                     print(f"  Bbox {bbox_idx}/{len(bboxes)}: Retry {attempt + 1}/{max_retries}")
                 
                 # Make the API request
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
                 response = requests.post(
                     overpass_url,
                     data={'data': overpass_query},
@@ -332,19 +198,21 @@ out center;
                     break
         
         # Small delay between bboxes to avoid rate limiting
-        if bbox_idx < len(bboxes):
+        if rate_limiter is None and bbox_idx < len(bboxes):
             time.sleep(1)
     
     print(f"✓ Successfully fetched {len(all_elements)} unique elements for {osm_key}={osm_value}")
     return all_elements
 
 
-def enrich_with_wikidata(elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def enrich_with_wikidata(elements: List[Dict[str, Any]],
+                         rate_limiter: Optional[Any] = None) -> List[Dict[str, Any]]:
     """
     Enrich OSM elements with Wikidata information (labels and descriptions)
     
     Args:
         elements: List of OSM elements
+        rate_limiter: Optional shared limiter with an ``acquire()`` method
     
     Returns:
         Enriched elements with multilingual_labels and multilingual_descriptions
@@ -361,6 +229,8 @@ def enrich_with_wikidata(elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]
             try:
                 # Fetch Wikidata entity
                 wikidata_url = f"https://www.wikidata.org/wiki/Special:EntityData/{wikidata_id}.json"
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
                 response = requests.get(wikidata_url, timeout=10)
                 
                 if response.status_code == 200:
@@ -395,7 +265,9 @@ def process_amenity_data(
     osm_value: str,
     schema_type: str,
     output_dir: str = "datav2",
-    area_name: str = "Hanoi"
+    area_name: str = "Hanoi",
+    output_file: Optional[str] = None,
+    namer: Optional[Callable[..., Tuple[str, str]]] = None
 ) -> List[Dict[str, Any]]:
     """
     Complete pipeline: fetch, enrich, and save OSM data as RDF/Turtle
@@ -407,6 +279,8 @@ def process_amenity_data(
         schema_type: Schema.org type (e.g., "schema:FinancialService")
         output_dir: Output directory for Turtle files
         area_name: Area name to search in
+        output_file: Explicit output path (overrides output_dir)
+        namer: Name post-processor passed to write_turtle_file (single-pass cleaning)
     
     Returns:
         List of enriched elements
@@ -423,8 +297,9 @@ def process_amenity_data(
     enriched_elements = enrich_with_wikidata(elements)
     
     # Step 3: Convert to RDF/Turtle
-    output_path = Path(output_dir) / f"data_{area_name.lower()}_{category_name}.ttl"
-    write_turtle_file(enriched_elements, output_path, category_name, schema_type)
+    output_path = Path(output_file) if output_file else \
+        Path(output_dir) / f"data_{area_name.lower()}_{category_name}.ttl"
+    write_turtle_file(enriched_elements, output_path, category_name, schema_type, namer)
     
     return enriched_elements
 
@@ -507,32 +382,23 @@ def enrich_from_brand_knowledge(tags: Dict[str, Any]) -> Dict[str, Any]:
     if not brand:
         return enrichment
     
-    # Check if brand exists in knowledge base
-    # Try exact match first
-    if brand in BRAND_KNOWLEDGE_BASE:
-        kb_entry = BRAND_KNOWLEDGE_BASE[brand]
-        enrichment['wikidata'] = kb_entry.get('wikidata')
-        enrichment['website'] = kb_entry.get('website')
-        enrichment['legalName_vi'] = kb_entry.get('legalName_vi')
-        enrichment['legalName_en'] = kb_entry.get('legalName_en')
-        enrichment['image'] = kb_entry.get('image')
-        
-        print(f"    [ENRICHMENT] Brand '{brand}' found in Knowledge Base!")
+    # Indexed lookup: normalized exact match, then substring containment
+    # in either direction (first knowledge-base entry wins)
+    match = BRAND_MATCHER.match(brand)
+    if match is None:
         return enrichment
     
-    # Try case-insensitive partial match
-    brand_lower = brand.lower()
-    for kb_brand, kb_entry in BRAND_KNOWLEDGE_BASE.items():
-        if kb_brand.lower() in brand_lower or brand_lower in kb_brand.lower():
-            enrichment['wikidata'] = kb_entry.get('wikidata')
-            enrichment['website'] = kb_entry.get('website')
-            enrichment['legalName_vi'] = kb_entry.get('legalName_vi')
-            enrichment['legalName_en'] = kb_entry.get('legalName_en')
-            enrichment['image'] = kb_entry.get('image')
-            
-            print(f"    [ENRICHMENT] Brand '{brand}' matched with '{kb_brand}' in Knowledge Base!")
-            return enrichment
+    kb_brand, kb_entry = match
+    enrichment['wikidata'] = kb_entry.get('wikidata')
+    enrichment['website'] = kb_entry.get('website')
+    enrichment['legalName_vi'] = kb_entry.get('legalName_vi')
+    enrichment['legalName_en'] = kb_entry.get('legalName_en')
+    enrichment['image'] = kb_entry.get('image')
     
+    if kb_brand == brand:
+        logger.debug(f"[ENRICHMENT] Brand '{brand}' found in Knowledge Base")
+    else:
+        logger.debug(f"[ENRICHMENT] Brand '{brand}' matched with '{kb_brand}' in Knowledge Base")
     return enrichment
 
 
@@ -648,35 +514,56 @@ def generate_bilingual_names(tags: Dict[str, Any], category_name: str) -> tuple:
     return (name_vi, name_en)
 
 
+# Number of buffered string pieces collected before they are written to disk
+WRITE_CHUNK_PARTS = 8192
+
+TURTLE_PREFIXES = (
+    "@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .\n"
+    "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n"
+    "@prefix schema: <http://schema.org/> .\n"
+    "@prefix geo: <http://www.opengis.net/ont/geosparql#> .\n"
+    "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n"
+    "@prefix ext: <http://opendatafithou.org/def/extension/> .\n"
+    "@prefix fiware: <https://smartdatamodels.org/dataModel.PointOfInterest/> .\n"
+    "\n"
+)
+
+
 def write_turtle_file(
     elements: List[Dict[str, Any]],
     output_path: Path,
     category_name: str,
-    schema_type: str
-):
+    schema_type: str,
+    namer: Optional[Callable[..., Tuple[str, str]]] = None
+) -> Dict[str, int]:
     """
     Write OSM elements to Turtle/RDF file with bilingual support and proper syntax
     
+    Each entity block is appended to an in-memory list and the list is written
+    in large chunks. Per-entity diagnostics go to the module logger at DEBUG
+    level; enrichment counters are printed once per file.
+    
     Args:
         elements: List of OSM elements
         output_path: Path to output Turtle file
         category_name: Category name for URI generation
         schema_type: Schema.org type
+        namer: Optional callable (subject, tags, name_vi, name_en, lat, lon) ->
+            (name_vi, name_en) applied to the generated names before writing,
+            e.g. SinglePassNamer to produce cleaned output directly
+    
+    Returns:
+        Enrichment counters for this file
     """
     
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
+    counters = Counter()
+    debug = logger.isEnabledFor(logging.DEBUG)
+    buf: List[str] = [TURTLE_PREFIXES]
+    w = buf.append
+    
     with open(output_path, 'w', encoding='utf-8') as f:
-        # Write prefixes with correct namespace
-        f.write("@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .\n")
-        f.write("@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n")
-        f.write("@prefix schema: <http://schema.org/> .\n")
-        f.write("@prefix geo: <http://www.opengis.net/ont/geosparql#> .\n")
-        f.write("@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n")
-        f.write("@prefix ext: <http://opendatafithou.org/def/extension/> .\n")
-        f.write("@prefix fiware: <https://smartdatamodels.org/dataModel.PointOfInterest/> .\n")
-        f.write("\n")
-        
         # Write each element
         for element in elements:
             osm_id = element.get('id')
@@ -700,22 +587,25 @@ def write_turtle_file(
             tags['_osm_id'] = osm_id
             
             # CRITICAL: Subject URI with angle brackets
-            subject_uri = f"<urn:ngsi-ld:PointOfInterest:Hanoi:{category_name}:{osm_id}>"
-            
-            f.write(f"{subject_uri}\n")
             # Dual typing: FIWARE + Schema.org for maximum interoperability
-            f.write(f"    a fiware:PointOfInterest, {schema_type} ;\n")
-            f.write(f"    ext:osm_id \"{osm_id}\"^^xsd:integer ;\n")
-            f.write(f"    ext:osm_type \"{osm_type}\" ;\n")
+            subject = f"urn:ngsi-ld:PointOfInterest:Hanoi:{category_name}:{osm_id}"
+            w(f"<{subject}>\n"
+              f"    a fiware:PointOfInterest, {schema_type} ;\n"
+              f"    ext:osm_id \"{osm_id}\"^^xsd:integer ;\n"
+              f"    ext:osm_type \"{osm_type}\" ;\n")
             
             # Generate bilingual names using smart naming algorithm
             name_vi, name_en = generate_bilingual_names(tags, category_name)
-            f.write(f"    schema:name \"{escape_turtle_string(name_vi)}\"@vi ,\n")
-            f.write(f"                \"{escape_turtle_string(name_en)}\"@en ;\n")
+            if namer is not None:
+                name_vi, name_en = namer(subject, tags, name_vi, name_en, lat, lon)
+            w(f"    schema:name \"{escape_turtle_string(name_vi)}\"@vi ,\n"
+              f"                \"{escape_turtle_string(name_en)}\"@en ;\n")
             
             # === BRAND-BASED ENRICHMENT (Auto-fill from Knowledge Base) ===
             # Enrich data using Brand Knowledge Base for famous Vietnamese brands
             brand_enrichment = enrich_from_brand_knowledge(tags)
+            if any(brand_enrichment.values()):
+                counters['brand_match'] += 1
             
             # === OFFICIAL/LEGAL NAMES (Priority: OSM tags > Brand KB) ===
             # Map official_name to schema:legalName with language tags
@@ -723,25 +613,25 @@ def write_turtle_file(
             if not off_name and brand_enrichment['legalName_vi']:
                 # Use Brand KB if OSM tag is missing
                 off_name = brand_enrichment['legalName_vi']
-                print(f"    [ENRICHMENT] Using legal name (VI) from Brand KB")
+                counters['legalName_vi'] += 1
             
             if off_name:
-                f.write(f"    schema:legalName \"{escape_turtle_string(off_name)}\"@vi ;\n")
+                w(f"    schema:legalName \"{escape_turtle_string(off_name)}\"@vi ;\n")
             
             off_name_en = tags.get('official_name:en', '').strip()
             if not off_name_en and brand_enrichment['legalName_en']:
                 # Use Brand KB if OSM tag is missing
                 off_name_en = brand_enrichment['legalName_en']
-                print(f"    [ENRICHMENT] Using legal name (EN) from Brand KB")
+                counters['legalName_en'] += 1
             
             if off_name_en:
-                f.write(f"    schema:legalName \"{escape_turtle_string(off_name_en)}\"@en ;\n")
+                w(f"    schema:legalName \"{escape_turtle_string(off_name_en)}\"@en ;\n")
             
             # === BRAND & OPERATOR (Use standard schema.org properties) ===
             if 'brand' in tags:
-                f.write(f"    schema:brand \"{escape_turtle_string(tags['brand'])}\" ;\n")
+                w(f"    schema:brand \"{escape_turtle_string(tags['brand'])}\" ;\n")
             if 'operator' in tags:
-                f.write(f"    schema:operator \"{escape_turtle_string(tags['operator'])}\" ;\n")
+                w(f"    schema:operator \"{escape_turtle_string(tags['operator'])}\" ;\n")
             
             # === ADDRESS (Structured address information) ===
             addr_housenumber = tags.get('addr:housenumber', '').strip()
@@ -751,30 +641,30 @@ def write_turtle_file(
             addr_postcode = tags.get('addr:postcode', '').strip()
             
             if addr_housenumber:
-                f.write(f"    ext:addr_housenumber \"{escape_turtle_string(addr_housenumber)}\" ;\n")
+                w(f"    ext:addr_housenumber \"{escape_turtle_string(addr_housenumber)}\" ;\n")
             if addr_street:
-                f.write(f"    ext:addr_street \"{escape_turtle_string(addr_street)}\" ;\n")
+                w(f"    ext:addr_street \"{escape_turtle_string(addr_street)}\" ;\n")
             if addr_district:
-                f.write(f"    ext:addr_district \"{escape_turtle_string(addr_district)}\" ;\n")
+                w(f"    ext:addr_district \"{escape_turtle_string(addr_district)}\" ;\n")
             if addr_city:
-                f.write(f"    ext:addr_city \"{escape_turtle_string(addr_city)}\" ;\n")
+                w(f"    ext:addr_city \"{escape_turtle_string(addr_city)}\" ;\n")
             if addr_postcode:
-                f.write(f"    ext:addr_postcode \"{escape_turtle_string(addr_postcode)}\" ;\n")
+                w(f"    ext:addr_postcode \"{escape_turtle_string(addr_postcode)}\" ;\n")
             
             # === CONTACT INFORMATION ===
             # Phone/Contact
             phone = tags.get('phone', '').strip() or tags.get('contact:phone', '').strip()
             if phone:
-                f.write(f"    schema:telephone \"{escape_turtle_string(phone)}\" ;\n")
+                w(f"    schema:telephone \"{escape_turtle_string(phone)}\" ;\n")
             
             # Email
             email = tags.get('email', '').strip() or tags.get('contact:email', '').strip()
             if email:
-                f.write(f"    schema:email \"{escape_turtle_string(email)}\" ;\n")
+                w(f"    schema:email \"{escape_turtle_string(email)}\" ;\n")
             
             # Opening hours
             if 'opening_hours' in tags:
-                f.write(f"    schema:openingHours \"{escape_turtle_string(tags['opening_hours'])}\" ;\n")
+                w(f"    schema:openingHours \"{escape_turtle_string(tags['opening_hours'])}\" ;\n")
             
             # --- LINKED DATA & EXTERNAL LINKS ---
             # Critical section for establishing connections to external knowledge bases
@@ -788,19 +678,16 @@ def write_turtle_file(
             # If no Wikidata in OSM tags, try Brand Knowledge Base
             if not wikidata_id and brand_enrichment['wikidata']:
                 wikidata_id = brand_enrichment['wikidata']
-                print(f"    [ENRICHMENT] Using Wikidata ID from Brand KB: {wikidata_id}")
+                counters['wikidata'] += 1
             
             if wikidata_id:
-                # DEBUG: Track Wikidata links
-                print(f"    [DEBUG] Found Wikidata ID for OSM {osm_type}/{osm_id}: {wikidata_id}")
                 # Construct full Wikidata URI (e.g., Q1003180 -> http://www.wikidata.org/entity/Q1003180)
-                wikidata_uri = f"http://www.wikidata.org/entity/{wikidata_id}"
-                f.write(f"    schema:sameAs <{wikidata_uri}> ;\n")
-                print(f"    [DEBUG] ✓ Written schema:sameAs <{wikidata_uri}>")
+                w(f"    schema:sameAs <http://www.wikidata.org/entity/{wikidata_id}> ;\n")
+                counters['sameAs_links'] += 1
+                if debug:
+                    logger.debug(f"Wikidata ID for OSM {osm_type}/{osm_id}: {wikidata_id}")
             else:
-                # DEBUG: Track missing Wikidata
-                if osm_id % 10 == 0:  # Sample 10% to avoid spam
-                    print(f"    [DEBUG] ⚠ No Wikidata ID for OSM {osm_type}/{osm_id}")
+                counters['missing_wikidata'] += 1
             
             # 2. WEBSITE / OFFICIAL URL (Priority: OSM tags > Brand KB > Social media)
             # Check multiple possible OSM tags in order of preference
@@ -814,7 +701,7 @@ def write_turtle_file(
             # If no website in OSM tags, try Brand Knowledge Base
             if not website and brand_enrichment['website']:
                 website = brand_enrichment['website']
-                print(f"    [ENRICHMENT] Using website from Brand KB: {website}")
+                counters['website'] += 1
             
             # Fallback to social media (Facebook, etc.)
             if not website:
@@ -828,9 +715,11 @@ def write_turtle_file(
                 # Ensure URL is properly formatted with protocol
                 if not website.startswith(('http://', 'https://', 'ftp://')):
                     website = 'http://' + website
-                f.write(f"    schema:url <{website}> ;\n")
-                if 'facebook.com' in website:
-                    print(f"    [ENRICHMENT] Using Facebook URL as fallback: {website}")
+                website_iri = encode_iri(website)
+                if website_iri:
+                    w(f"    schema:url <{website_iri}> ;\n")
+                    if 'facebook.com' in website:
+                        counters['facebook_url'] += 1
             
             # 3. WIKIPEDIA ARTICLE (Human-Readable Reference)
             # Links to Wikipedia article for additional context
@@ -840,9 +729,12 @@ def write_turtle_file(
                 # Format: "language:Article_Title" (e.g., "vi:Ngân_hàng_Ngoại_thương")
                 if ':' in wikipedia:
                     lang, article = wikipedia.split(':', 1)
-                    # Construct Wikipedia URL
-                    wiki_url = f"https://{lang}.wikipedia.org/wiki/{article}"
-                    f.write(f"    rdfs:seeAlso <{wiki_url}> ;\n")
+                    # Construct Wikipedia URL (titles use underscores, the rest is percent-encoded)
+                    title = article.strip().replace(' ', '_')
+                    wiki_url = encode_iri(f"https://{lang.strip()}.wikipedia.org/wiki/{title}")
+                    # Malformed tags such as "[[vi:Hồ Gươm]]" give no usable host; skip them
+                    if wiki_url:
+                        w(f"    rdfs:seeAlso <{wiki_url}> ;\n")
             
             # 4. IMAGE / PHOTO (Priority: OSM tags > Brand KB)
             # Links to image resources (photos, logos, etc.)
@@ -854,32 +746,46 @@ def write_turtle_file(
             # If no image in OSM tags, try Brand Knowledge Base
             if not image and brand_enrichment['image']:
                 image = brand_enrichment['image']
-                print(f"    [ENRICHMENT] Using image from Brand KB: {image}")
+                counters['image'] += 1
             
             if image:
-                if image.startswith(('http://', 'https://')):
+                image_iri = encode_iri(image) if image.startswith(('http://', 'https://')) else None
+                if image_iri:
                     # Full URL - use as URI
-                    f.write(f"    schema:image <{image}> ;\n")
+                    w(f"    schema:image <{image_iri}> ;\n")
                 else:
-                    # Relative path or filename - use as literal
-                    f.write(f"    schema:image \"{escape_turtle_string(image)}\" ;\n")
+                    # Relative path, filename or unusable URL - use as literal
+                    w(f"    schema:image \"{escape_turtle_string(image)}\" ;\n")
             
             # Multilingual labels (from Wikidata enrichment)
             if 'multilingual_labels' in element:
                 for lang, label in element['multilingual_labels'].items():
-                    f.write(f"    rdfs:label \"{escape_turtle_string(label)}\"@{lang} ;\n")
+                    w(f"    rdfs:label \"{escape_turtle_string(label)}\"@{lang} ;\n")
             
             # Multilingual descriptions (from Wikidata enrichment)
             if 'multilingual_descriptions' in element:
                 for lang, desc in element['multilingual_descriptions'].items():
-                    f.write(f"    schema:description \"{escape_turtle_string(desc)}\"@{lang} ;\n")
+                    w(f"    schema:description \"{escape_turtle_string(desc)}\"@{lang} ;\n")
+            
+            # Precomputed geohash cells (spatial prefilter for radius/bbox queries)
+            w(turtle_cell_lines(lat, lon))
             
             # Geometry (WKT format)
-            wkt = f"POINT({lon} {lat})"
-            f.write(f"    geo:asWKT \"{wkt}\"^^geo:wktLiteral .\n")
-            f.write("\n")
+            w(f"    geo:asWKT \"POINT({lon} {lat})\"^^geo:wktLiteral .\n\n")
+            
+            # Write in large chunks instead of once per line
+            if len(buf) >= WRITE_CHUNK_PARTS:
+                f.write(''.join(buf))
+                buf.clear()
+        
+        f.write(''.join(buf))
     
     print(f"✓ Saved {len(elements)} elements to {output_path}")
+    if counters:
+        summary = ', '.join(f"{key}={count}" for key, count in sorted(counters.items()))
+        print(f"  Enrichment: {summary}")
+    
+    return dict(counters)
 
 
 def escape_turtle_string(s: str) -> str:
@@ -905,6 +811,46 @@ def escape_turtle_string(s: str) -> str:
     return s
 
 
+# Characters left as-is when percent-encoding IRI components (existing %XX escapes are kept)
+IRI_PATH_SAFE = "/%:@!$&'()*+,;=-._~"
+IRI_QUERY_SAFE = IRI_PATH_SAFE + "?"
+# Characters Turtle forbids inside <...> (besides controls and space)
+IRI_FORBIDDEN = set('<>"{}|^`\\')
+
+
+def encode_iri(url: str) -> Optional[str]:
+    """
+    Percent-encode a URL so it is a valid Turtle IRIREF
+    
+    Spaces, non-ASCII characters (e.g. Vietnamese Wikipedia titles) and
+    characters forbidden inside <...> are encoded in the path, query and
+    fragment; already-encoded sequences are left untouched. The host is
+    not encoded: URLs whose host cannot be parsed or contains forbidden
+    characters are rejected.
+    
+    Args:
+        url: Absolute URL
+    
+    Returns:
+        Encoded URL, or None if the URL cannot be written as an IRI
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        # e.g. an unbalanced '[' taken for an IPv6 host
+        return None
+    netloc = parts.netloc
+    if not netloc or any(ch in IRI_FORBIDDEN or ord(ch) <= 0x20 for ch in netloc):
+        return None
+    return urlunsplit((
+        parts.scheme,
+        netloc,
+        quote(parts.path, safe=IRI_PATH_SAFE),
+        quote(parts.query, safe=IRI_QUERY_SAFE),
+        quote(parts.fragment, safe=IRI_QUERY_SAFE),
+    ))
+
+
 # Example usage
 if __name__ == "__main__":
     # Test fetch
@@ -30,15 +30,25 @@ Handles only progress tracking, error handling, and batch coordination
 """
 
 import json
+import queue
+import threading
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
 # CRITICAL: Import the centralized processing function
 # This is the ONLY function that should handle data fetching and writing
-from osm_data_fetcher import process_amenity_data
+from osm_data_fetcher import (process_amenity_data, fetch_osm_data, enrich_with_wikidata,
+                              write_turtle_file)
 from config_amenity_types import AMENITY_TYPES, BATCH_CONFIG
+from rate_limiter import TokenBucket
+
+# Pipeline stages, in order
+STAGES = ('fetch', 'enrich', 'write')
+
+# Queue marker telling a stage worker to stop
+_STOP = None
 
 
 class BatchProcessor:
@@ -62,10 +72,18 @@ class BatchProcessor:
         self.output_dir.mkdir(exist_ok=True)
         
         self.progress_file = self.output_dir / "processing_progress.json"
+        self.stage_dir = self.output_dir / ".stages"
         self.error_log_file = self.output_dir / "processing_errors.log"
         self.summary_file = self.output_dir / "processing_summary.json"
         
         self.progress = self._load_progress()
+        self._lock = threading.RLock()
+        
+        # Shared API budgets for all workers of a stage
+        self.overpass_limiter = TokenBucket(
+            rate=BATCH_CONFIG.get('overpass_requests_per_second', 1.0))
+        self.wikidata_limiter = TokenBucket(
+            rate=BATCH_CONFIG.get('wikidata_requests_per_second', 5.0))
         self.summary = {
             'start_time': datetime.now().isoformat(),
             'total_categories': len(AMENITY_TYPES),
@@ -81,22 +99,32 @@ class BatchProcessor:
     
     def _load_progress(self) -> Dict[str, Any]:
         """Load processing progress from file"""
+        progress = {'completed': [], 'failed': [], 'last_processed': None}
         if self.progress_file.exists():
             try:
                 with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    progress.update(json.load(f))
             except Exception as e:
                 print(f"Warning: Could not load progress file: {e}")
         
-        return {'completed': [], 'failed': [], 'last_processed': None}
+        # Per-stage progress (older progress files only have 'completed')
+        stages = progress.setdefault('stages', {})
+        for stage in STAGES:
+            stages.setdefault(stage, [])
+        for category_name in progress['completed']:
+            for stage in STAGES:
+                if category_name not in stages[stage]:
+                    stages[stage].append(category_name)
+        return progress
     
     def _save_progress(self):
         """Save current progress to file"""
-        try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(self.progress, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Warning: Could not save progress: {e}")
+        with self._lock:
+            try:
+                with open(self.progress_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.progress, f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                print(f"Warning: Could not save progress: {e}")
     
     def _log_error(self, category_name: str, error: str):
         """Log error to file"""
@@ -240,7 +268,7 @@ class BatchProcessor:
     
     def process_all(self, start_from: str = None, max_categories: int = None):
         """
-        Process all amenity types
+        Process all amenity types through the fetch → enrich → write pipeline
         
         Args:
             start_from: Category name to start from (useful for resuming)
@@ -269,23 +297,16 @@ class BatchProcessor:
             test_cases = test_cases[:max_categories]
             print(f"Processing limited to first {max_categories} categories\n")
         
-        # Process each category
-        for idx, (category_name, osm_key, osm_value, schema_type) in enumerate(test_cases, 1):
-            print(f"\n[{idx}/{len(test_cases)}] Current: {category_name}")
-            
-            # Check if already processed
-            if not self.should_process(category_name):
+        # Skip categories that are already completed
+        pending = []
+        for test_case in test_cases:
+            if not self.should_process(test_case[0]):
                 self.summary['skipped'] += 1
                 continue
-            
-            # Process the category
-            success = self.process_category(category_name, osm_key, osm_value, schema_type)
-            
-            # Wait between categories (except for the last one)
-            if idx < len(test_cases):
-                delay = BATCH_CONFIG['delay_between_categories']
-                print(f"\nWaiting {delay}s before next category...")
-                time.sleep(delay)
+            pending.append(test_case)
+        
+        # Fetch, enrich and write run as overlapping stages
+        self.run_pipeline(pending)
         
         # Save final summary
         self._save_summary()
@@ -307,7 +328,7 @@ class BatchProcessor:
         print(f"{'#'*60}\n")
     
     def retry_failed(self):
-        """Retry all failed categories"""
+        """Retry all failed categories, resuming each one at the stage that failed"""
         failed = self.progress.get('failed', [])
         
         if not failed:
@@ -321,16 +342,245 @@ class BatchProcessor:
         self._save_progress()
         
         # Find and process failed categories
-        for category_name in failed:
-            test_case = next(
-                ((name, key, val, schema) for name, key, val, schema in AMENITY_TYPES if name == category_name),
-                None
-            )
+        test_cases = [
+            (name, key, val, schema) for name, key, val, schema in AMENITY_TYPES if name in failed
+        ]
+        self.run_pipeline(test_cases)
+    
+    # ------------------------------------------------------------------
+    # Pipelined execution
+    # ------------------------------------------------------------------
+    
+    def _stage_cache_path(self, stage: str, category_name: str) -> Path:
+        """Path of the elements saved after a stage, used to resume later stages"""
+        return self.stage_dir / f"{category_name}.{stage}.json"
+    
+    def _save_stage_cache(self, stage: str, category_name: str, elements: List[Dict[str, Any]]):
+        """Persist the output of a stage"""
+        self.stage_dir.mkdir(exist_ok=True)
+        cache_path = self._stage_cache_path(stage, category_name)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(elements, f, ensure_ascii=False)
+        tmp_path.replace(cache_path)
+    
+    def _load_stage_cache(self, stage: str, category_name: str) -> Optional[List[Dict[str, Any]]]:
+        """Load the output of a stage, or None if it is missing or unreadable"""
+        cache_path = self._stage_cache_path(stage, category_name)
+        if not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load stage cache {cache_path}: {e}")
+            return None
+    
+    def _clear_stage_caches(self, category_name: str):
+        """Remove intermediate stage outputs once a category is written"""
+        for stage in STAGES:
+            self._stage_cache_path(stage, category_name).unlink(missing_ok=True)
+    
+    def _mark_stage_done(self, stage: str, category_name: str):
+        """Record a finished stage in processing_progress.json"""
+        with self._lock:
+            done = self.progress['stages'][stage]
+            if category_name not in done:
+                done.append(category_name)
+            self._save_progress()
+    
+    def _resume_stage(self, category_name: str) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+        """
+        Find the first stage a category still needs, with the cached input for it
+        
+        Returns:
+            (stage name, elements produced by the previous stage or None)
+        """
+        stages_done = self.progress['stages']
+        for previous, stage in (('enrich', 'write'), ('fetch', 'enrich')):
+            if category_name in stages_done[previous]:
+                elements = self._load_stage_cache(previous, category_name)
+                if elements is not None:
+                    return stage, elements
+        return 'fetch', None
+    
+    def _fetch_stage(self, job: Dict[str, Any]):
+        """Stage 1: Overpass API download"""
+        job['elements'] = fetch_osm_data(
+            job['osm_key'], job['osm_value'], "Hanoi", rate_limiter=self.overpass_limiter
+        )
+        self._save_stage_cache('fetch', job['category'], job['elements'])
+    
+    def _enrich_stage(self, job: Dict[str, Any]):
+        """Stage 2: Wikidata labels and descriptions"""
+        job['elements'] = enrich_with_wikidata(job['elements'], rate_limiter=self.wikidata_limiter)
+        self._save_stage_cache('enrich', job['category'], job['elements'])
+    
+    def _write_stage(self, job: Dict[str, Any]):
+        """Stage 3: RDF/Turtle generation"""
+        elements = job['elements']
+        if not elements:
+            print(f"No data found for {job['osm_key']}={job['osm_value']}")
+        else:
+            output_path = self.output_dir / f"data_hanoi_{job['category']}.ttl"
+            write_turtle_file(elements, output_path, job['category'], job['schema_type'])
+        self._record_success(job)
+        self._clear_stage_caches(job['category'])
+    
+    def _record_success(self, job: Dict[str, Any]):
+        """Record a fully written category in progress and summary"""
+        elements = job['elements']
+        elapsed_time = time.time() - job['start_time']
+        
+        # Count elements with Wikidata enrichment
+        enriched_count = len([e for e in elements
+                             if e.get('multilingual_labels') or e.get('multilingual_descriptions')])
+        
+        # Count elements with Wikidata links (from original tags)
+        wikidata_count = len([e for e in elements
+                             if e.get('tags', {}).get('wikidata')])
+        
+        result = {
+            'category': job['category'],
+            'status': 'success',
+            'elements_count': len(elements),
+            'enriched_count': enriched_count,
+            'wikidata_links': wikidata_count,
+            'processing_time': round(elapsed_time, 2),
+            'stage_times': {stage: round(t, 2) for stage, t in job['stage_times'].items()},
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        with self._lock:
+            self.progress['completed'].append(job['category'])
+            self.progress['last_processed'] = job['category']
+            self._save_progress()
             
-            if test_case:
-                self.process_category(*test_case)
-                time.sleep(BATCH_CONFIG['delay_between_categories'])
-
+            self.summary['processed'] += 1
+            self.summary['successful'] += 1
+            self.summary['details'].append(result)
+        
+        print(f"\n[BatchProcessor] ✓ SUCCESS: {job['category']} "
+              f"({len(elements)} elements, {enriched_count} Wikidata-enriched, "
+              f"{elapsed_time:.2f}s)")
+    
+    def _record_failure(self, job: Dict[str, Any], stage: str, error: Exception):
+        """Record a category that failed in a stage; earlier stages stay resumable"""
+        error_msg = str(error)
+        elapsed_time = time.time() - job['start_time']
+        
+        print(f"\n[BatchProcessor] ✗ FAILED: {job['category']} ({stage} stage)")
+        print(f"  - Error: {error_msg}")
+        
+        self._log_error(job['category'], f"[{stage}] {error_msg}")
+        
+        result = {
+            'category': job['category'],
+            'status': 'failed',
+            'stage': stage,
+            'error': error_msg,
+            'processing_time': round(elapsed_time, 2),
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        with self._lock:
+            self.progress['failed'].append(job['category'])
+            self._save_progress()
+            
+            self.summary['processed'] += 1
+            self.summary['failed'] += 1
+            self.summary['details'].append(result)
+    
+    def _stage_worker(self, stage: str, func: Callable[[Dict[str, Any]], None],
+                      in_queue: queue.Queue, out_queue: Optional[queue.Queue]):
+        """Take jobs from in_queue, run one stage on them and pass them on"""
+        while True:
+            job = in_queue.get()
+            if job is _STOP:
+                return
+            
+            stage_start = time.time()
+            try:
+                func(job)
+            except Exception as e:
+                self._record_failure(job, stage, e)
+                continue
+            job['stage_times'][stage] = time.time() - stage_start
+            self._mark_stage_done(stage, job['category'])
+            
+            if out_queue is not None:
+                out_queue.put(job)
+    
+    def run_pipeline(self, test_cases: List[Tuple[str, str, str, str]]):
+        """
+        Run categories through fetch → enrich → write stages connected by bounded queues
+        
+        While one category is being enriched or written, the next one is already
+        being fetched. Each stage has its own worker count; API stages share one
+        token bucket per service. Categories resume at the first stage that has
+        not completed in processing_progress.json.
+        
+        Args:
+            test_cases: (category_name, osm_key, osm_value, schema_type) tuples
+        """
+        queue_size = BATCH_CONFIG.get('queue_size', 2)
+        workers = {
+            'fetch': BATCH_CONFIG.get('fetch_workers', 1),
+            'enrich': BATCH_CONFIG.get('enrich_workers', 2),
+            'write': BATCH_CONFIG.get('write_workers', 1),
+        }
+        queues = {
+            'fetch': queue.Queue(),
+            'enrich': queue.Queue(maxsize=queue_size),
+            'write': queue.Queue(maxsize=queue_size),
+        }
+        funcs = {
+            'fetch': self._fetch_stage,
+            'enrich': self._enrich_stage,
+            'write': self._write_stage,
+        }
+        
+        threads = {}
+        for position, stage in enumerate(STAGES):
+            out_queue = queues[STAGES[position + 1]] if position + 1 < len(STAGES) else None
+            threads[stage] = [
+                threading.Thread(
+                    target=self._stage_worker,
+                    args=(stage, funcs[stage], queues[stage], out_queue),
+                    name=f"{stage}-{i}",
+                    daemon=True
+                )
+                for i in range(max(1, workers[stage]))
+            ]
+            for thread in threads[stage]:
+                thread.start()
+        
+        print(f"[BatchProcessor] Pipeline: {len(test_cases)} categories, "
+              f"workers fetch={workers['fetch']} enrich={workers['enrich']} "
+              f"write={workers['write']}")
+        
+        # Route each category to the first stage it still needs
+        for category_name, osm_key, osm_value, schema_type in test_cases:
+            stage, elements = self._resume_stage(category_name)
+            if stage != 'fetch':
+                print(f"[BatchProcessor] Resuming {category_name} at {stage} stage")
+            queues[stage].put({
+                'category': category_name,
+                'osm_key': osm_key,
+                'osm_value': osm_value,
+                'schema_type': schema_type,
+                'elements': elements,
+                'start_time': time.time(),
+                'stage_times': {}
+            })
+        
+        # Shut the stages down in order once their upstream has drained
+        for stage in STAGES:
+            for _ in threads[stage]:
+                queues[stage].put(_STOP)
+            for thread in threads[stage]:
+                thread.join()
+    
 
 def main():
     """Main entry point"""
@@ -24,14 +24,25 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 import os
 import re
+import sys
 import unicodedata
 import time
 import requests
+from pathlib import Path
 from urllib.parse import quote
-from rdflib import Graph, Literal, Namespace, URIRef
-from rdflib.namespace import RDF, RDFS, XSD, GEO
+from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDFS
 import logging
-from typing import Tuple, Dict, List, Optional
+from typing import Any, Tuple, Dict, List, Optional
+from entity_table import EntityTable
+from cleaning_manifest import (CleaningManifest, code_version, load_previous_output,
+                               reusable_subjects, reuse_previous_names)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from graph_snapshot import load_graph
+
+# Source files whose changes invalidate the names recorded in the incremental manifest
+NAMING_CODE = [__file__, str(Path(__file__).resolve().parent / "entity_table.py")]
 
 # Configure logging
 logging.basicConfig(
@@ -323,6 +334,21 @@ class UniversalDataCleaner:
             subject: Subject URI
             category: Category of the entity
             
+        Returns:
+            Tuple of (vietnamese_name, english_name) or (None, None)
+        """
+        row = EntityTable.from_subject(graph, subject).row(0)
+        return self.get_location_based_name_for_row(row, category)
+    
+    def get_location_based_name_for_row(self, row: Dict[str, Any],
+                                        category: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Generate location-based name from an entity table row (Logic B).
+        
+        Args:
+            row: Entity row (see EntityTable.row)
+            category: Category of the entity
+            
         Returns:
             Tuple of (vietnamese_name, english_name) or (None, None)
         """
@@ -334,29 +360,10 @@ class UniversalDataCleaner:
         generic_en = self.GENERIC_NAMES[category]["en"]
         
         # Get address components
-        street = None
-        for obj in graph.objects(subject=subject, predicate=self.EXT.addr_street):
-            if isinstance(obj, Literal):
-                street = str(obj)
-                break
-        
-        district = None
-        for obj in graph.objects(subject=subject, predicate=self.EXT.addr_district):
-            if isinstance(obj, Literal):
-                district = str(obj)
-                break
-        
-        city = None
-        for obj in graph.objects(subject=subject, predicate=self.EXT.addr_city):
-            if isinstance(obj, Literal):
-                city = str(obj)
-                break
-        
-        housenumber = None
-        for obj in graph.objects(subject=subject, predicate=self.EXT.addr_housenumber):
-            if isinstance(obj, Literal):
-                housenumber = str(obj)
-                break
+        street = row['addr_street']
+        district = row['addr_district']
+        city = row['addr_city']
+        housenumber = row['addr_housenumber']
         
         # Priority 1: Street with optional house number
         if street:
@@ -393,11 +400,7 @@ class UniversalDataCleaner:
         
         # Priority 5: Use reverse geocoding from coordinates (instead of ID)
         # Get WKT geometry to extract coordinates
-        coords_text = None
-        for obj in graph.objects(subject=subject, predicate=self.GEO.asWKT):
-            if isinstance(obj, Literal):
-                coords_text = str(obj)
-                break
+        coords_text = row['wkt']
         
         if coords_text:
             # Extract lat/lon from "POINT(lon lat)"
@@ -416,7 +419,7 @@ class UniversalDataCleaner:
                     return (vi_name, en_name)
         
         # Absolute last resort: Use ID from URI (if no coordinates available)
-        uri_str = str(subject)
+        uri_str = str(row['subject'])
         match = re.search(r':(\d+)>?$', uri_str)
         if match:
             entity_id = match.group(1)
@@ -457,6 +460,19 @@ class UniversalDataCleaner:
         
         return False
     
+    @classmethod
+    def all_categories(cls) -> List[str]:
+        """Get every category handled by this cleaner (all 28, including atm, bank and clinic)."""
+        return (
+            ['atm', 'bank', 'clinic']
+            + cls.MEDICAL_EMERGENCY
+            + cls.EDUCATION
+            + cls.INFRASTRUCTURE
+            + cls.COMMUNITY_LEISURE
+            + cls.COMMERCE
+            + cls.TRANSPORT
+        )
+    
     def determine_category(self, filename: str) -> str:
         """
         Determine which category a file belongs to.
@@ -500,7 +516,11 @@ class UniversalDataCleaner:
     
     def fix_invalid_uris(self, graph: Graph) -> int:
         """
-        Fix invalid URIs in the graph (e.g., Wikipedia links with spaces).
+        Fix invalid Wikipedia links (e.g., titles with spaces or Vietnamese characters).
+        
+        Only rdfs:seeAlso objects are inspected, so the cost is proportional to
+        the number of links. Files written by the current fetcher already carry
+        encoded IRIs; this repairs data produced by older runs.
         
         Args:
             graph: RDF graph
@@ -510,24 +530,23 @@ class UniversalDataCleaner:
         """
         fixed_count = 0
         
-        # Find all Wikipedia URIs that need fixing
-        for s, p, o in list(graph):
-            if isinstance(o, URIRef):
-                uri_str = str(o)
-                # Check if it's a Wikipedia URI with spaces or special characters
-                if 'wikipedia.org/wiki/' in uri_str and (' ' in uri_str or 'Đ' in uri_str or 'ả' in uri_str or 'ô' in uri_str):
-                    # Split into base and path
-                    if '/wiki/' in uri_str:
-                        base, path = uri_str.rsplit('/wiki/', 1)
-                        # URL encode the path part only
-                        encoded_path = quote(path, safe='')
-                        new_uri = f"{base}/wiki/{encoded_path}"
-                        new_uri_ref = URIRef(new_uri)
-                        
-                        # Replace in graph
-                        graph.remove((s, p, o))
-                        graph.add((s, p, new_uri_ref))
-                        fixed_count += 1
+        # Collect the links to repair first; the graph cannot change while it is iterated
+        to_fix = []
+        for s, o in graph.subject_objects(RDFS.seeAlso):
+            if not isinstance(o, URIRef):
+                continue
+            uri_str = str(o)
+            if '/wiki/' not in uri_str or 'wikipedia.org' not in uri_str:
+                continue
+            base, path = uri_str.rsplit('/wiki/', 1)
+            # Check for spaces or any non-ASCII character in the article title
+            if any(ch == ' ' or ord(ch) > 127 for ch in path):
+                to_fix.append((s, o, f"{base}/wiki/{quote(path, safe='%')}"))
+        
+        for s, o, new_uri in to_fix:
+            graph.remove((s, RDFS.seeAlso, o))
+            graph.add((s, RDFS.seeAlso, URIRef(new_uri)))
+            fixed_count += 1
         
         return fixed_count
     
@@ -540,6 +559,26 @@ class UniversalDataCleaner:
             subject: Subject URI
             category: Category of the entity
             
+        Returns:
+            Dictionary with processing stats
+        """
+        table = EntityTable.from_subject(graph, subject)
+        stats = self.process_row(table, 0, category)
+        table.apply_changes(graph)
+        return stats
+    
+    def process_row(self, table: EntityTable, index: int, category: str) -> Dict[str, any]:
+        """
+        Apply category-specific naming to one entity table row.
+        
+        Name changes are recorded in the table; call ``table.apply_changes``
+        to write them back to the graph.
+        
+        Args:
+            table: Entity table of the file
+            index: Row number
+            category: Category of the entity
+            
         Returns:
             Dictionary with processing stats
         """
@@ -551,22 +590,15 @@ class UniversalDataCleaner:
             'unchanged': False
         }
         
+        row = table.row(index)
+        subject = row['subject']
+        
         # Get naming strategy for this category
         strategy = self.get_naming_strategy(category)
         
-        # Get existing Vietnamese name
-        vi_name = None
-        en_name = None
-        
-        for obj in graph.objects(subject=subject, predicate=self.SCHEMA.name):
-            if isinstance(obj, Literal):
-                if obj.language == 'vi':
-                    vi_name = str(obj)
-                elif obj.language == 'en':
-                    en_name = str(obj)
-        
-        # Determine if we need to process
-        needs_processing = False
+        # Get existing names
+        vi_name = row['name_vi']
+        en_name = row['name_en']
         
         if strategy == 'semantic':
             # Logic A: Semantic Translation with Location Fallback
@@ -582,9 +614,7 @@ class UniversalDataCleaner:
                 
                 # Update English name if translation improved it
                 if new_en_name and new_en_name != en_name and not self.is_generic_or_unknown(new_en_name):
-                    if en_name:
-                        graph.remove((subject, self.SCHEMA.name, Literal(en_name, lang='en')))
-                    graph.add((subject, self.SCHEMA.name, Literal(new_en_name, lang='en')))
+                    table.update_name(index, 'en', new_en_name)
                     stats['processed'] = True
                     stats['used_semantic'] = True
                 else:
@@ -592,7 +622,7 @@ class UniversalDataCleaner:
             else:
                 # Vietnamese name is generic/missing, try location-based improvement
                 logging.debug(f"Vietnamese name is generic/missing, trying location-based for: {subject}")
-                vi_fallback, en_fallback = self.get_location_based_name(graph, subject, category)
+                vi_fallback, en_fallback = self.get_location_based_name_for_row(row, category)
                 logging.debug(f"Location-based result: {vi_fallback} / {en_fallback}")
                 
                 if vi_fallback and en_fallback:
@@ -614,14 +644,8 @@ class UniversalDataCleaner:
                             should_replace = True
                     
                     if should_replace:
-                        # Remove old names
-                        if vi_name:
-                            graph.remove((subject, self.SCHEMA.name, Literal(vi_name, lang='vi')))
-                        if en_name:
-                            graph.remove((subject, self.SCHEMA.name, Literal(en_name, lang='en')))
-                        # Add new names
-                        graph.add((subject, self.SCHEMA.name, Literal(vi_fallback, lang='vi')))
-                        graph.add((subject, self.SCHEMA.name, Literal(en_fallback, lang='en')))
+                        table.update_name(index, 'vi', vi_fallback)
+                        table.update_name(index, 'en', en_fallback)
                         stats['processed'] = True
                         stats['used_location'] = True
                     else:
@@ -645,7 +669,7 @@ class UniversalDataCleaner:
                 stats['unchanged'] = True
             else:
                 # At least one name is missing or generic, try to improve
-                vi_fallback, en_fallback = self.get_location_based_name(graph, subject, category)
+                vi_fallback, en_fallback = self.get_location_based_name_for_row(row, category)
                 
                 if vi_fallback and en_fallback:
                     # Check if generated names are better than what we have
@@ -669,16 +693,12 @@ class UniversalDataCleaner:
                     
                     # Apply replacements
                     if should_replace_vi:
-                        if vi_name:
-                            graph.remove((subject, self.SCHEMA.name, Literal(vi_name, lang='vi')))
-                        graph.add((subject, self.SCHEMA.name, Literal(vi_fallback, lang='vi')))
+                        table.update_name(index, 'vi', vi_fallback)
                         stats['processed'] = True
                         stats['used_location'] = True
                     
                     if should_replace_en:
-                        if en_name:
-                            graph.remove((subject, self.SCHEMA.name, Literal(en_name, lang='en')))
-                        graph.add((subject, self.SCHEMA.name, Literal(en_fallback, lang='en')))
+                        table.update_name(index, 'en', en_fallback)
                         stats['processed'] = True
                         stats['used_location'] = True
                     
@@ -690,13 +710,16 @@ class UniversalDataCleaner:
         
         return stats
     
-    def process_file(self, input_file: str, output_file: str) -> Dict[str, any]:
+    def process_file(self, input_file: str, output_file: str,
+                     manifest: Optional[CleaningManifest] = None) -> Dict[str, any]:
         """
         Process a single TTL file.
         
         Args:
             input_file: Path to input TTL file
             output_file: Path to output TTL file
+            manifest: Content hashes of the previous run; when given, entities
+                whose hash is unchanged reuse their names from output_file
             
         Returns:
             Dictionary with processing statistics
@@ -716,10 +739,9 @@ class UniversalDataCleaner:
             logger.info(f"Strategy: {strategy.upper()}")
             logger.info("="*70)
             
-            # Load the graph
+            # Load the graph (from its pre-parsed snapshot when the file is unchanged)
             logger.info("Loading RDF graph...")
-            g = Graph()
-            g.parse(input_file, format='turtle')
+            g = load_graph(input_file)
             
             # Fix namespace bindings
             logger.info("Fixing namespace bindings...")
@@ -735,12 +757,24 @@ class UniversalDataCleaner:
             if fixed_uris > 0:
                 logger.info(f"  Fixed {fixed_uris} invalid URIs")
             
-            # Get all entities
-            entities = list(g.subjects(predicate=RDF.type, 
-                                      object=self.FIWARE.PointOfInterest))
+            # Build the per-file entity table in one pass over the triples
+            table = EntityTable.from_graph(g)
+            entities = [index for index, _ in table.rows(poi_only=True)]
             
             logger.info(f"Found {len(entities)} entities to process")
             
+            # Hash the input fields of each entity before any name is changed
+            file_key = os.path.basename(input_file)
+            hashes = {str(table.subjects[index]): table.content_hash(index) for index in entities}
+            reused = set()
+            previous_graph = None
+            if manifest is not None:
+                previous_graph = load_previous_output(output_file)
+                reused = reusable_subjects(hashes, manifest.previous_hashes(file_key),
+                                           previous_graph)
+                logger.info(f"Incremental: {len(reused)} unchanged entities reused, "
+                            f"{len(entities) - len(reused)} to process")
+            
             # Process statistics
             total_processed = 0
             total_unchanged = 0
@@ -748,11 +782,14 @@ class UniversalDataCleaner:
             total_location = 0
             
             # Process each entity
-            for i, subject in enumerate(entities, 1):
+            for i, index in enumerate(entities, 1):
                 if i % 100 == 0:
                     logger.info(f"  Processing entity {i}/{len(entities)}...")
                 
-                stats = self.process_entity(g, subject, category)
+                if str(table.subjects[index]) in reused:
+                    continue
+                
+                stats = self.process_row(table, index, category)
                 
                 if stats['processed']:
                     total_processed += 1
@@ -763,6 +800,14 @@ class UniversalDataCleaner:
                 elif stats['unchanged']:
                     total_unchanged += 1
             
+            # Write only the changed names back to the graph
+            changed_names = table.apply_changes(g)
+            logger.info(f"Applied {changed_names} name changes")
+            
+            # Copy the cleaned names of unchanged entities from the previous output
+            if reused:
+                reuse_previous_names(g, previous_graph, reused)
+            
             # Create output directory if needed
             output_dir = os.path.dirname(output_file)
             if output_dir and not os.path.exists(output_dir):
@@ -779,8 +824,13 @@ class UniversalDataCleaner:
             logger.info(f"    - Semantic translations: {total_semantic}")
             logger.info(f"    - Location-based names: {total_location}")
             logger.info(f"  Unchanged: {total_unchanged}")
+            if manifest is not None:
+                logger.info(f"  Reused from previous run: {len(reused)}")
             logger.info(f"✓ Successfully saved to: {output_file}")
             
+            if manifest is not None:
+                manifest.update(file_key, hashes)
+            
             return {
                 'success': True,
                 'total': len(entities),
@@ -788,6 +838,7 @@ class UniversalDataCleaner:
                 'semantic': total_semantic,
                 'location': total_location,
                 'unchanged': total_unchanged,
+                'reused': len(reused),
                 'category': category,
                 'strategy': strategy
             }
@@ -797,27 +848,21 @@ class UniversalDataCleaner:
             return {'success': False, 'error': str(e)}
     
     def process_all_files(self, input_dir: str = 'datav2', 
-                         output_dir: str = 'datav2/cleaned') -> Dict[str, any]:
+                          output_dir: str = 'datav2/cleaned',
+                          incremental: bool = False) -> Dict[str, any]:
         """
         Process all remaining files in the directory.
         
         Args:
             input_dir: Directory containing input TTL files
             output_dir: Directory for output TTL files
+            incremental: Only reprocess entities that are new or changed since
+                the last run (tracked in output_dir/cleaning_manifest.json)
             
         Returns:
             Dictionary with overall statistics
         """
-        # Files to process (ALL 28 categories including atm, bank, clinic)
-        categories_to_process = (
-            ['atm', 'bank', 'clinic'] +
-            self.MEDICAL_EMERGENCY +
-            self.EDUCATION +
-            self.INFRASTRUCTURE +
-            self.COMMUNITY_LEISURE +
-            self.COMMERCE +
-            self.TRANSPORT
-        )
+        categories_to_process = self.all_categories()
         
         logger.info("="*70)
         logger.info("MASTER CLEANING PROCESS - ALL REMAINING FILES")
@@ -825,8 +870,14 @@ class UniversalDataCleaner:
         logger.info(f"Input directory: {input_dir}")
         logger.info(f"Output directory: {output_dir}")
         logger.info(f"Categories to process: {len(categories_to_process)}")
+        logger.info(f"Incremental mode: {'ON' if incremental else 'OFF'}")
         logger.info("")
         
+        manifest = None
+        if incremental:
+            manifest = CleaningManifest(os.path.join(output_dir, 'cleaning_manifest.json'),
+                                        code_version=code_version(NAMING_CODE))
+        
         overall_stats = {
             'total_files': 0,
             'successful': 0,
@@ -847,10 +898,12 @@ class UniversalDataCleaner:
             overall_stats['total_files'] += 1
             
             # Process the file
-            result = self.process_file(input_file, output_file)
+            result = self.process_file(input_file, output_file, manifest=manifest)
             
             if result.get('success'):
                 overall_stats['successful'] += 1
+                if manifest is not None:
+                    manifest.save()
             else:
                 overall_stats['failed'] += 1
             
@@ -898,12 +951,16 @@ class UniversalDataCleaner:
 
 def main():
     """Main entry point."""
+    # Usage: python clean_all_remaining.py [incremental]
+    incremental = 'incremental' in sys.argv[1:]
+    
     cleaner = UniversalDataCleaner()
     
     # Process all files
     results = cleaner.process_all_files(
         input_dir='datav2',
-        output_dir='datav2/cleaned'
+        output_dir='datav2/cleaned',
+        incremental=incremental
     )
     
     # Exit with appropriate code
@@ -0,0 +1,185 @@
+"""
+@File    : cleaning_manifest.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from rdflib import Graph, Namespace, URIRef
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from graph_snapshot import load_graph
+
+SCHEMA = Namespace("http://schema.org/")
+
+logger = logging.getLogger(__name__)
+
+
+class CleaningManifest:
+    """
+    Per-entity content hashes recorded by the previous cleaning run.
+
+    The manifest is a JSON file next to the cleaned outputs::
+
+        {"code_version": "<sha1>",
+         "files": {"data_hanoi_cafe.ttl": {"<subject>": "<sha1>", ...}, ...}}
+
+    An entity whose hash is unchanged since the last run can reuse its
+    cleaned names from the previous output instead of being renamed again.
+    Hashes recorded by a different version of the cleaner are discarded.
+    """
+
+    def __init__(self, manifest_path: str, code_version: str = ''):
+        """
+        Load the manifest (an empty one if the file does not exist).
+
+        Args:
+            manifest_path: Path to the manifest JSON file
+            code_version: Version of the naming code (see code_version());
+                a manifest written by another version starts empty
+        """
+        self.manifest_path = manifest_path
+        self.code_version = code_version
+        self.files: Dict[str, Dict[str, str]] = {}
+
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load cleaning manifest {manifest_path}: {e}")
+                return
+            if data.get('code_version', '') != code_version:
+                logger.info(f"Cleaning code changed since {manifest_path} was written, "
+                            f"reprocessing all entities")
+                return
+            self.files = data.get('files', {})
+
+    def previous_hashes(self, file_key: str) -> Dict[str, str]:
+        """Get the subject → hash map recorded for a file."""
+        return self.files.get(file_key, {})
+
+    def update(self, file_key: str, hashes: Dict[str, str]):
+        """Replace the recorded hashes of a file."""
+        self.files[file_key] = hashes
+
+    def save(self):
+        """Write the manifest to disk."""
+        manifest_dir = os.path.dirname(self.manifest_path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'code_version': self.code_version, 'files': self.files}, f,
+                      ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def code_version(paths: Iterable[str]) -> str:
+    """
+    Hash the source files that decide how entities are named.
+
+    Args:
+        paths: Source files of the cleaner
+
+    Returns:
+        Hex digest over the file contents (missing files are skipped)
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_previous_output(output_file: str) -> Optional[Graph]:
+    """
+    Parse the output of the previous run, if there is one.
+
+    Args:
+        output_file: Path of the cleaned file written by the last run
+
+    Returns:
+        Parsed graph or None
+    """
+    if not os.path.exists(output_file):
+        return None
+    try:
+        return load_graph(output_file)
+    except Exception as e:
+        logger.warning(f"Could not reuse previous output {output_file}: {e}")
+        return None
+
+
+def reusable_subjects(current_hashes: Dict[str, str], previous_hashes: Dict[str, str],
+                      previous_graph: Optional[Graph]) -> Set[str]:
+    """
+    Find subjects whose content is unchanged and whose cleaned triples exist.
+
+    Args:
+        current_hashes: subject → hash of the current input
+        previous_hashes: subject → hash recorded by the last run
+        previous_graph: Output of the last run
+
+    Returns:
+        Set of subject strings that can be copied from the previous output
+    """
+    if previous_graph is None:
+        return set()
+    return {
+        subject for subject, digest in current_hashes.items()
+        if previous_hashes.get(subject) == digest
+        and (URIRef(subject), None, None) in previous_graph
+    }
+
+
+def reuse_previous_names(graph: Graph, previous_graph: Graph, subjects: Iterable[str]) -> int:
+    """
+    Replace the schema:name triples of the given subjects with their previously cleaned names.
+
+    Only names are copied: the content hash covers just the fields the
+    naming logic reads, so every other triple (contact details, opening
+    hours, brand, links, cell IDs, ...) is kept from the current input.
+
+    Args:
+        graph: Graph being cleaned
+        previous_graph: Output of the last run
+        subjects: Subjects to copy over
+
+    Returns:
+        Number of name triples copied
+    """
+    copied = 0
+    for subject in subjects:
+        subject_ref = URIRef(subject)
+        graph.remove((subject_ref, SCHEMA.name, None))
+        for name in previous_graph.objects(subject_ref, SCHEMA.name):
+            graph.add((subject_ref, SCHEMA.name, name))
+            copied += 1
+    return copied
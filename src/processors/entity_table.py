@@ -0,0 +1,248 @@
+"""
+@File    : entity_table.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF
+
+SCHEMA = Namespace("http://schema.org/")
+EXT = Namespace("http://opendatafithou.org/def/extension/")
+GEO = Namespace("http://www.opengis.net/ont/geosparql#")
+FIWARE = Namespace("https://smartdatamodels.org/dataModel.PointOfInterest/")
+
+# Predicate -> column for the single-valued literal fields used by the cleaners
+FIELD_PREDICATES = {
+    EXT.addr_street: 'addr_street',
+    EXT.addr_district: 'addr_district',
+    EXT.addr_city: 'addr_city',
+    EXT.addr_housenumber: 'addr_housenumber',
+    GEO.asWKT: 'wkt',
+}
+
+COLUMNS = ['name_vi', 'name_en'] + list(FIELD_PREDICATES.values())
+
+
+class EntityTable:
+    """
+    Columnar view of the POI fields the cleaners need, built in one pass over a graph.
+
+    Each column is a list indexed by row number; ``subjects[i]`` is the entity of
+    row i. Naming logic reads rows instead of calling ``graph.objects`` once per
+    field per entity, records name changes with :meth:`update_name`, and
+    :meth:`apply_changes` writes only those changes back as a graph diff.
+    """
+
+    def __init__(self):
+        self.subjects: List[URIRef] = []
+        self.index: Dict[URIRef, int] = {}
+        self.columns: Dict[str, List[Optional[str]]] = {name: [] for name in COLUMNS}
+        self.is_poi: List[bool] = []
+        self.has_name: List[bool] = []
+        self._changes: List[Tuple[int, str, Optional[str], str]] = []
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'EntityTable':
+        """
+        Build the table with a single scan over all triples of the graph.
+
+        Args:
+            graph: RDF graph of one category file
+
+        Returns:
+            Populated EntityTable
+        """
+        table = cls()
+        for s, p, o in graph:
+            if p == RDF.type:
+                if o == FIWARE.PointOfInterest:
+                    table.is_poi[table._row_for(s)] = True
+            elif p == SCHEMA.name:
+                if isinstance(o, Literal):
+                    row = table._row_for(s)
+                    table.has_name[row] = True
+                    if o.language in ('vi', 'en'):
+                        column = table.columns[f'name_{o.language}']
+                        if column[row] is None:
+                            column[row] = str(o)
+            elif p in FIELD_PREDICATES:
+                if isinstance(o, Literal):
+                    column = table.columns[FIELD_PREDICATES[p]]
+                    row = table._row_for(s)
+                    if column[row] is None:
+                        column[row] = str(o)
+        return table
+
+    @classmethod
+    def from_subject(cls, graph: Graph, subject: URIRef) -> 'EntityTable':
+        """
+        Build a one-row table for a single entity.
+
+        Args:
+            graph: RDF graph
+            subject: Entity URI
+
+        Returns:
+            EntityTable containing only this subject
+        """
+        table = cls()
+        row = table._row_for(subject)
+        for p, o in graph.predicate_objects(subject):
+            if p == RDF.type and o == FIWARE.PointOfInterest:
+                table.is_poi[row] = True
+            elif p == SCHEMA.name and isinstance(o, Literal):
+                table.has_name[row] = True
+                if o.language in ('vi', 'en') and table.columns[f'name_{o.language}'][row] is None:
+                    table.columns[f'name_{o.language}'][row] = str(o)
+            elif p in FIELD_PREDICATES and isinstance(o, Literal):
+                column = table.columns[FIELD_PREDICATES[p]]
+                if column[row] is None:
+                    column[row] = str(o)
+        return table
+
+    @classmethod
+    def from_values(cls, subject: URIRef, values: Dict[str, Optional[str]],
+                    is_poi: bool = True) -> 'EntityTable':
+        """
+        Build a one-row table from field values instead of a graph.
+
+        Used when names are resolved while the Turtle is being written, before
+        any graph exists.
+
+        Args:
+            subject: Entity URI
+            values: Column name -> value (see COLUMNS); missing columns stay None
+            is_poi: Whether the entity is a fiware:PointOfInterest
+
+        Returns:
+            EntityTable containing only this subject
+        """
+        table = cls()
+        row = table._row_for(subject)
+        for name, value in values.items():
+            table.columns[name][row] = value or None
+        table.is_poi[row] = is_poi
+        table.has_name[row] = bool(values.get('name_vi') or values.get('name_en'))
+        return table
+
+    def _row_for(self, subject: URIRef) -> int:
+        row = self.index.get(subject)
+        if row is None:
+            row = len(self.subjects)
+            self.index[subject] = row
+            self.subjects.append(subject)
+            for column in self.columns.values():
+                column.append(None)
+            self.is_poi.append(False)
+            self.has_name.append(False)
+        return row
+
+    def __len__(self) -> int:
+        return len(self.subjects)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """
+        Get one row as a dictionary.
+
+        Args:
+            index: Row number
+
+        Returns:
+            Dictionary with 'subject' and every column value
+        """
+        values = {name: column[index] for name, column in self.columns.items()}
+        values['subject'] = self.subjects[index]
+        return values
+
+    def rows(self, poi_only: bool = False,
+             named_only: bool = False) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Iterate over (row number, row) pairs.
+
+        Args:
+            poi_only: Only rows typed fiware:PointOfInterest
+            named_only: Only rows with at least one schema:name literal
+        """
+        for index in range(len(self.subjects)):
+            if poi_only and not self.is_poi[index]:
+                continue
+            if named_only and not self.has_name[index]:
+                continue
+            yield index, self.row(index)
+
+    def content_hash(self, index: int) -> str:
+        """
+        Hash the name, address and WKT values of a row.
+
+        Two runs produce the same hash for an entity only if none of the
+        fields the cleaners read have changed.
+
+        Args:
+            index: Row number
+
+        Returns:
+            Hex digest
+        """
+        values = [column[index] or '' for column in self.columns.values()]
+        return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+    def update_name(self, index: int, lang: str, new_name: Optional[str]) -> bool:
+        """
+        Record a new name for a row; unchanged or empty names are ignored.
+
+        Args:
+            index: Row number
+            lang: 'vi' or 'en'
+            new_name: New name value
+
+        Returns:
+            True if a change was recorded
+        """
+        column = self.columns[f'name_{lang}']
+        old_name = column[index]
+        if not new_name or new_name == old_name:
+            return False
+        self._changes.append((index, lang, old_name, new_name))
+        column[index] = new_name
+        return True
+
+    def apply_changes(self, graph: Graph) -> int:
+        """
+        Write recorded name changes back to the graph.
+
+        Args:
+            graph: Graph the table was built from
+
+        Returns:
+            Number of names replaced or added
+        """
+        for index, lang, old_name, new_name in self._changes:
+            subject = self.subjects[index]
+            if old_name:
+                graph.remove((subject, SCHEMA.name, Literal(old_name, lang=lang)))
+            graph.add((subject, SCHEMA.name, Literal(new_name, lang=lang)))
+        applied = len(self._changes)
+        self._changes = []
+        return applied
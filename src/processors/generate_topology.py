@@ -25,16 +25,30 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 
-
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import shared_memory
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
-from math import radians, cos, sin, asin, sqrt
+from typing import Any, Dict, List, Tuple, Set
+from math import radians, cos, sin, asin, sqrt, degrees
 
+import numpy as np
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, RDFS, GEO
 from tqdm import tqdm
 
+from topology_adjacency import TopologyAdjacency, adjacency_paths
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from graph_snapshot import load_graph
+
 # ============================================================================
 # NAMESPACE DEFINITIONS
 # ============================================================================
@@ -47,6 +61,8 @@ NGSILD = Namespace("https://uri.etsi.org/ngsi-ld/")
 # ============================================================================
 # RELATIONSHIP CONFIGURATION MATRIX
 # ============================================================================
+# Optional per-entry "max_links": keep only the k nearest targets (within
+# max_dist) per source and target category, bounding dense configs.
 LINK_CONFIG = [
     # --- TRANSPORT (Bus Connects to Everything) ---
     {
@@ -242,6 +258,89 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     
     return c * r
 
+
+EARTH_RADIUS_M = 6371000
+
+# Sources handled per distance block in compute_links
+LINK_BLOCK_SIZE = 512
+
+
+def haversine_distances(lat1: np.ndarray, lon1: np.ndarray,
+                        lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized haversine_distance; arguments broadcast like NumPy arrays.
+    
+    Returns:
+        Distances in meters
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS_M
+
+
+def category_points(coords: Dict[str, Tuple[float, float]]) -> Dict[str, Any]:
+    """
+    Turn an extract_coordinates() dictionary into parallel arrays.
+    
+    Returns:
+        Dictionary with 'uris', 'lat' and 'lon' arrays
+    """
+    values = np.array(list(coords.values()), dtype=np.float64).reshape(-1, 2)
+    return {"uris": np.array(list(coords), dtype=str), "lat": values[:, 0], "lon": values[:, 1]}
+
+
+def compute_links(source: Dict[str, Any], target: Dict[str, Any], max_dist: float,
+                  block_size: int = LINK_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every (source, target) pair within max_dist meters.
+    
+    Both sides are sorted by latitude, so each block of sources is only
+    compared with the targets inside its latitude band (± max_dist).
+    
+    Args:
+        source: category_points() of the source category
+        target: category_points() of the target category
+        max_dist: Maximum distance in meters
+        block_size: Sources per distance block
+    
+    Returns:
+        (source indices, target indices, distances in meters), ordered by source then target
+    """
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+    if len(source["lat"]) == 0 or len(target["lat"]) == 0:
+        return empty
+    
+    band = degrees(max_dist / EARTH_RADIUS_M) * 1.001 + 1e-9
+    s_order = np.argsort(source["lat"], kind="stable")
+    t_order = np.argsort(target["lat"], kind="stable")
+    t_lat = target["lat"][t_order]
+    t_lon = target["lon"][t_order]
+    
+    found_s, found_t, found_d = [], [], []
+    for start in range(0, len(s_order), block_size):
+        block = s_order[start:start + block_size]
+        s_lat = source["lat"][block]
+        lo = np.searchsorted(t_lat, s_lat[0] - band, "left")
+        hi = np.searchsorted(t_lat, s_lat[-1] + band, "right")
+        if lo >= hi:
+            continue
+        d = haversine_distances(s_lat[:, None], source["lon"][block][:, None],
+                                t_lat[None, lo:hi], t_lon[None, lo:hi])
+        rows, cols = np.nonzero(d <= max_dist)
+        found_s.append(block[rows])
+        found_t.append(t_order[lo + cols])
+        found_d.append(d[rows, cols])
+    
+    if not found_s:
+        return empty
+    src = np.concatenate(found_s)
+    tgt = np.concatenate(found_t)
+    dist = np.concatenate(found_d)
+    order = np.lexsort((tgt, src))
+    return src[order], tgt[order], dist[order]
+
+
 # ============================================================================
 # COORDINATE EXTRACTION
 # ============================================================================
@@ -335,21 +434,223 @@ def get_predicate_for_distance(distance_m: float, base_predicate: str) -> URIRef
         else:
             return URIRef(base_predicate)
 
+
 # ============================================================================
 # MAIN TOPOLOGY GENERATION
 # ============================================================================
-def generate_topology(data_dir: Path, output_file: Path):
+def dataset_file(data_dir: Path, dataset_name: str) -> Path:
+    """Input file of a dataset: cleaned version first, then original."""
+    file_path = data_dir / f"data_hanoi_{dataset_name}_cleaned.ttl"
+    if not file_path.exists():
+        file_path = data_dir / f"data_hanoi_{dataset_name}.ttl"
+    return file_path
+
+
+def load_dataset_coordinates(file_path: str) -> Dict[str, Tuple[float, float]]:
+    """Load one dataset file (snapshot or parse) and extract its coordinates (runs in workers)."""
+    return extract_coordinates(load_graph(file_path))
+
+
+def tier_predicates_for(base_predicate: str) -> List[URIRef]:
+    """Predicate per distance tier (<= 50m, 50-200m, > 200m) for a config."""
+    return [
+        get_predicate_for_distance(50, base_predicate),
+        get_predicate_for_distance(200, base_predicate),
+        get_predicate_for_distance(float("inf"), base_predicate),
+    ]
+
+
+def link_work_units(link_config: List[Dict], available) -> List[Tuple]:
     """
-    Generate spatial topology relationships between all configured amenity types.
+    Flatten the link configuration into work units.
+    
+    A unit is (unit id, source, target, max_dist, predicate, max_links), with
+    max_links None unless the config bounds its links per source.
+    
+    Units are numbered in the order the serial generator visits them, so
+    shard outputs concatenated by unit id match that order.
+    """
+    units = []
+    for config in link_config:
+        if config["source"] not in available:
+            continue
+        for target_name in config["targets"]:
+            if target_name in available:
+                units.append((len(units), config["source"], target_name,
+                              config["max_dist"], config["predicate"], config.get("max_links")))
+    return units
+
+
+def plan_link_pairs(units: List[Tuple]) -> List[Dict[str, Any]]:
+    """
+    Group work units by unordered category pair.
+    
+    Mirrored configs (bank→atm at 100m, atm→bank at 150m) and repeated
+    source/target combinations share one distance table, computed once at
+    the largest radius any of their units needs.
+    
+    Returns:
+        List of {'pair': (a, b), 'max_dist': meters, 'units': [...]}, with a <= b,
+        in order of first appearance
+    """
+    groups = {}
+    for unit in units:
+        _, source_name, target_name, max_dist, _, _ = unit
+        pair = tuple(sorted((source_name, target_name)))
+        group = groups.setdefault(pair, {"pair": pair, "max_dist": 0, "units": []})
+        group["max_dist"] = max(group["max_dist"], max_dist)
+        group["units"].append(unit)
+    return list(groups.values())
+
+
+def pair_distance_table(points: Dict[str, Dict[str, Any]],
+                        group: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """All (a, b) pairs of a planned pair group within its max radius (see compute_links)."""
+    a, b = group["pair"]
+    return compute_links(points[a], points[b], group["max_dist"])
+
+
+def nearest_per_source(src_idx: np.ndarray, tgt_idx: np.ndarray, distances: np.ndarray,
+                       k: int) -> np.ndarray:
+    """
+    Positions of the k nearest targets of every source.
+    
+    Candidates are ranked by distance within each source (ties: lower target
+    index first) and cut at rank k in one vectorized pass.
+    
+    Returns:
+        Sorted positions into the candidate arrays
+    """
+    order = np.lexsort((tgt_idx, distances, src_idx))
+    ranked_src = src_idx[order]
+    rank = np.arange(len(order)) - np.searchsorted(ranked_src, ranked_src, "left")
+    return np.sort(order[rank < k])
+
+
+def unit_links(table: Tuple[np.ndarray, np.ndarray, np.ndarray], pair: Tuple[str, str],
+               unit: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Derive the links of one work unit from its pair's distance table.
     
     Args:
-        data_dir: Directory containing input TTL files
-        output_file: Path to output topology file
+        table: pair_distance_table() of the unit's pair group
+        pair: Canonical (a, b) category pair of the table
+        unit: (unit id, source, target, max_dist, predicate, max_links)
+    
+    Returns:
+        (source indices, target indices, distances, tiers 0/1/2, candidates),
+        ordered by source then target; candidates is the number of links within
+        max_dist before the max_links cut
     """
-    print("=" * 80)
-    print("SPATIAL TOPOLOGY GENERATOR")
-    print("=" * 80)
+    _, source_name, target_name, max_dist, _, max_links = unit
+    src_idx, tgt_idx, distances = table
+    keep = distances <= max_dist
+    
+    # Skip self-links
+    if source_name == target_name:
+        keep &= src_idx != tgt_idx
+    src_idx, tgt_idx, distances = src_idx[keep], tgt_idx[keep], distances[keep]
+    
+    # Reverse direction of a mirrored pair: swap columns and restore the order
+    if source_name != pair[0]:
+        order = np.lexsort((src_idx, tgt_idx))
+        src_idx, tgt_idx, distances = tgt_idx[order], src_idx[order], distances[order]
+    
+    candidates = len(src_idx)
+    if max_links is not None:
+        nearest = nearest_per_source(src_idx, tgt_idx, distances, max_links)
+        src_idx, tgt_idx, distances = src_idx[nearest], tgt_idx[nearest], distances[nearest]
     
+    tiers = np.where(distances <= 50, 0, np.where(distances <= 200, 1, 2))
+    return src_idx, tgt_idx, distances, tiers, candidates
+
+
+def turtle_predicate(predicate: URIRef) -> str:
+    """Predicate as written in link shards (schema:/ext: prefixed names)."""
+    for prefix, namespace in (("schema", SCHEMA), ("ext", EXT)):
+        if str(predicate).startswith(str(namespace)):
+            return f"{prefix}:{str(predicate)[len(str(namespace)):]}"
+    return f"<{predicate}>"
+
+
+def _load_datasets(data_dir: Path, dataset_names: Set[str],
+                   workers: int) -> Dict[str, Dict[str, Tuple[float, float]]]:
+    """Load the coordinates of every dataset, parsing files in parallel when workers > 1."""
+    names = sorted(dataset_names)
+    files = {name: dataset_file(data_dir, name) for name in names}
+    existing = [name for name in names if files[name].exists()]
+    
+    results = {}
+    if workers > 1 and len(existing) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(existing))) as pool:
+            futures = {name: pool.submit(load_dataset_coordinates, str(files[name]))
+                       for name in existing}
+            for name in existing:
+                try:
+                    results[name] = futures[name].result()
+                except Exception as e:
+                    results[name] = e
+    
+    coords = {}
+    for dataset_name in tqdm(names, desc="Loading datasets"):
+        if not files[dataset_name].exists():
+            print(f"  ⚠ {dataset_name}: File not found")
+            continue
+        try:
+            result = results.get(dataset_name)
+            if result is None:
+                result = load_dataset_coordinates(str(files[dataset_name]))
+            if isinstance(result, Exception):
+                raise result
+            
+            # Extract coordinates for fast lookup
+            coords[dataset_name] = result
+            
+            print(f"  ✓ {dataset_name}: {len(coords[dataset_name])} entities")
+        except Exception as e:
+            print(f"  ✗ {dataset_name}: Error loading - {e}")
+    return coords
+
+
+def config_link_counts(units: List[Tuple],
+                       unit_counts: Dict[int, Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate per-unit link counts by link configuration.
+    
+    Returns:
+        One {'source', 'predicate', 'max_dist', 'max_links', 'links', 'candidates'}
+        dictionary per configuration, in configuration order
+    """
+    configs = {}
+    for unit_id, source_name, _, max_dist, base_predicate, max_links in units:
+        key = (source_name, base_predicate, max_dist, max_links)
+        entry = configs.setdefault(key, {"source": source_name, "predicate": base_predicate,
+                                         "max_dist": max_dist, "max_links": max_links,
+                                         "links": 0, "candidates": 0})
+        links, candidates = unit_counts.get(unit_id, (0, 0))
+        entry["links"] += links
+        entry["candidates"] += candidates
+    return list(configs.values())
+
+
+def _new_stats() -> Dict[str, int]:
+    return {
+        "containedInPlace": 0,  # <= 50m
+        "isNextTo": 0,           # 50-200m
+        "other": 0               # > 200m
+    }
+
+
+def _add_tier_counts(stats: Dict[str, int], counts) -> int:
+    stats["containedInPlace"] += int(counts[0])
+    stats["isNextTo"] += int(counts[1])
+    stats["other"] += int(counts[2])
+    return int(sum(counts))
+
+
+def _generate_links_serial(points: Dict[str, Dict[str, Any]], units: List[Tuple],
+                           output_file: Path):
+    """Compute all work units in this process and write the topology with rdflib."""
     # Initialize output graph
     topology_graph = Graph()
     # Explicit namespace binding to avoid schema1: prefix issue
@@ -362,102 +663,35 @@ def generate_topology(data_dir: Path, output_file: Path):
     topology_graph.bind("rdf", RDF)
     topology_graph.bind("rdfs", RDFS)
     
-    # Step 1: Collect all unique dataset names from config
-    dataset_names = set()
-    for config in LINK_CONFIG:
-        dataset_names.add(config["source"])
-        dataset_names.update(config["targets"])
-    
-    print(f"\n📊 Found {len(dataset_names)} unique dataset types in configuration")
-    print(f"📁 Data directory: {data_dir}")
-    
-    # Step 2: Load all graphs into memory
-    print("\n⏳ Loading graphs into memory...")
-    graphs = {}
-    coords = {}
-    
-    for dataset_name in tqdm(sorted(dataset_names), desc="Loading datasets"):
-        # Try cleaned version first, then original
-        file_path = data_dir / f"data_hanoi_{dataset_name}_cleaned.ttl"
-        if not file_path.exists():
-            file_path = data_dir / f"data_hanoi_{dataset_name}.ttl"
-        
-        if file_path.exists():
-            try:
-                g = Graph()
-                g.parse(str(file_path), format="turtle")
-                graphs[dataset_name] = g
-                
-                # Extract coordinates for fast lookup
-                coords[dataset_name] = extract_coordinates(g)
-                
-                print(f"  ✓ {dataset_name}: {len(coords[dataset_name])} entities")
-            except Exception as e:
-                print(f"  ✗ {dataset_name}: Error loading - {e}")
-        else:
-            print(f"  ⚠ {dataset_name}: File not found")
-    
-    print(f"\n✓ Loaded {len(graphs)} datasets successfully")
-    
-    # Step 3: Generate topology relationships
-    print("\n🔗 Generating spatial topology relationships...")
     total_links = 0
-    stats = {
-        "containedInPlace": 0,  # <= 50m
-        "isNextTo": 0,           # 50-200m
-        "other": 0               # > 200m
-    }
+    stats = _new_stats()
+    unit_counts = {}
+    edges = {}
     
-    for config in tqdm(LINK_CONFIG, desc="Processing link configurations"):
-        source_name = config["source"]
-        target_names = config["targets"]
-        base_predicate = config["predicate"]
-        max_dist = config["max_dist"]
-        
-        # Skip if source doesn't exist
-        if source_name not in graphs or source_name not in coords:
-            continue
-        
-        source_coords = coords[source_name]
-        
-        # Process each target
-        for target_name in target_names:
-            if target_name not in graphs or target_name not in coords:
-                continue
+    for group in tqdm(plan_link_pairs(units), desc="Processing category pairs"):
+        table = pair_distance_table(points, group)
+        for unit in group["units"]:
+            unit_id, source_name, target_name, _, base_predicate, _ = unit
+            source = points[source_name]
+            target = points[target_name]
+            tier_predicates = tier_predicates_for(base_predicate)
+            
+            # Links of this direction and radius, cut from the shared distance table
+            src_idx, tgt_idx, distances, tiers, candidates = unit_links(table, group["pair"], unit)
+            source_uris = source["uris"][src_idx]
+            target_uris = target["uris"][tgt_idx]
             
-            target_coords = coords[target_name]
+            # Add triples to topology graph
+            for source_uri, target_uri, tier in zip(source_uris.tolist(), target_uris.tolist(),
+                                                    tiers.tolist()):
+                topology_graph.add((URIRef(source_uri), tier_predicates[tier], URIRef(target_uri)))
             
-            # Calculate distances between all source-target pairs
-            for source_uri, (s_lat, s_lon) in source_coords.items():
-                for target_uri, (t_lat, t_lon) in target_coords.items():
-                    # Skip self-links
-                    if source_uri == target_uri:
-                        continue
-                    
-                    # Calculate distance in meters
-                    distance_m = haversine_distance(s_lat, s_lon, t_lat, t_lon)
-                    
-                    # Check if within max distance
-                    if distance_m <= max_dist:
-                        # Get appropriate predicate based on distance tier
-                        # Critical: Use distance_m consistently
-                        predicate = get_predicate_for_distance(distance_m, base_predicate)
-                        
-                        # Add triple to topology graph
-                        topology_graph.add((
-                            URIRef(source_uri),
-                            predicate,
-                            URIRef(target_uri)
-                        ))
-                        
-                        # Update statistics - verify distance tiers match predicate logic
-                        total_links += 1
-                        if distance_m <= 50:
-                            stats["containedInPlace"] += 1
-                        elif 50 < distance_m <= 200:
-                            stats["isNextTo"] += 1
-                        else:
-                            stats["other"] += 1
+            # Update statistics - verify distance tiers match predicate logic
+            total_links += _add_tier_counts(stats, np.bincount(tiers, minlength=3))
+            unit_counts[unit_id] = (len(tiers), candidates)
+            predicate_names = np.array([str(p) for p in tier_predicates], dtype=str)
+            edges[unit_id] = (source_uris, target_uris, predicate_names[tiers], distances)
+    edges = [edges[unit[0]] for unit in units]
     
     # Step 4: Write output
     print(f"\n💾 Writing topology to {output_file}...")
@@ -473,6 +707,357 @@ def generate_topology(data_dir: Path, output_file: Path):
     topology_graph.namespace_manager.bind("schema", SCHEMA, override=True, replace=True)
     
     topology_graph.serialize(destination=str(output_file), format="turtle")
+    return total_links, stats, edges, unit_counts
+
+
+# Per-process state of link workers (set by _init_link_worker)
+_WORKER = {}
+
+
+def _init_link_worker(shm_name: str, n_points: int, offsets: Dict[str, Tuple[int, int]],
+                      uris: Dict[str, np.ndarray], shard_dir: str):
+    """Attach a worker to the shared coordinate block."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER.update(
+        shm=shm,
+        coords=np.ndarray((2, n_points), dtype=np.float64, buffer=shm.buf),
+        offsets=offsets,
+        uris=uris,
+        shard_dir=Path(shard_dir),
+    )
+
+
+def _shared_points(dataset_name: str) -> Dict[str, Any]:
+    start, end = _WORKER["offsets"][dataset_name]
+    coords = _WORKER["coords"]
+    return {"uris": _WORKER["uris"][dataset_name],
+            "lat": coords[0, start:end], "lon": coords[1, start:end]}
+
+
+# Link shards hold Turtle statements using the schema:/ext: prefixed names declared
+# in the topology file's header, so they are fragments rather than standalone files
+LINK_SHARD_SUFFIX = ".ttl.part"
+
+
+def shard_name(unit: Tuple[int, str, str, float, str]) -> str:
+    """File stem of a work unit's link shard: <source>__<target>__<predicate> (':' → '-')."""
+    _, source_name, target_name, _, base_predicate, _ = unit
+    return f"{source_name}__{target_name}__{base_predicate.replace(':', '-')}"
+
+
+def write_pair_shards(points: Dict[str, Dict[str, Any]], group: Dict[str, Any],
+                      shard_dir: Path) -> List[str]:
+    """
+    Compute one pair group and write each of its work units to shard files.
+    
+    Every unit gets <shard>.ttl.part (Turtle statements, one link per line) and
+    <shard>.npz (source/target URIs, tiers and distances for the adjacency
+    export, plus the candidate count for statistics).
+    
+    Returns:
+        Names of the shards written
+    """
+    table = pair_distance_table(points, group)
+    
+    written = []
+    for unit in group["units"]:
+        _, source_name, target_name, _, base_predicate, _ = unit
+        src_idx, tgt_idx, distances, tiers, candidates = unit_links(table, group["pair"], unit)
+        
+        predicates = [turtle_predicate(p) for p in tier_predicates_for(base_predicate)]
+        source_uris = points[source_name]["uris"][src_idx]
+        target_uris = points[target_name]["uris"][tgt_idx]
+        name = shard_name(unit)
+        with open(shard_dir / f"{name}{LINK_SHARD_SUFFIX}", "w", encoding="utf-8") as f:
+            subjects, objects = source_uris.tolist(), target_uris.tolist()
+            tier_list = tiers.tolist()
+            for start in range(0, len(subjects), 8192):
+                f.write("".join(
+                    f"<{s}> {predicates[t]} <{o}> .\n"
+                    for s, t, o in zip(subjects[start:start + 8192], tier_list[start:start + 8192],
+                                       objects[start:start + 8192])
+                ))
+        np.savez(shard_dir / f"{name}.npz", source=source_uris, target=target_uris,
+                 tier=tiers.astype(np.int8), distance=distances, candidates=candidates)
+        written.append(name)
+    return written
+
+
+def _link_worker(group: Dict[str, Any]) -> List[str]:
+    """Pool task: write_pair_shards() over the shared coordinates."""
+    a, b = group["pair"]
+    points = {a: _shared_points(a), b: _shared_points(b)}
+    return write_pair_shards(points, group, _WORKER["shard_dir"])
+
+
+def _compute_shards_parallel(points: Dict[str, Dict[str, Any]], groups: List[Dict[str, Any]],
+                             shard_dir: Path, workers: int):
+    """
+    Write the shards of all pair groups from a process pool.
+    
+    All coordinates are copied once into a shared memory block that every
+    worker maps read-only; only the URI arrays are pickled per worker.
+    """
+    names = sorted(points)
+    offsets, start = {}, 0
+    for name in names:
+        offsets[name] = (start, start + len(points[name]["lat"]))
+        start += len(points[name]["lat"])
+    n_points = max(start, 1)
+    
+    shm = shared_memory.SharedMemory(create=True, size=2 * n_points * 8)
+    try:
+        coords = np.ndarray((2, n_points), dtype=np.float64, buffer=shm.buf)
+        for name in names:
+            a, b = offsets[name]
+            coords[0, a:b] = points[name]["lat"]
+            coords[1, a:b] = points[name]["lon"]
+        del coords
+        uris = {name: points[name]["uris"] for name in names}
+        
+        init_args = (shm.name, n_points, offsets, uris, str(shard_dir))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_link_worker,
+                                 initargs=init_args) as pool:
+            for _ in tqdm(pool.map(_link_worker, groups), total=len(groups),
+                          desc="Processing category pairs"):
+                pass
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def assemble_shards(units: List[Tuple], shard_dir: Path, output_file: Path):
+    """
+    Concatenate link shards in unit order into the topology file.
+    
+    The output is valid Turtle with one statement per line (rather than
+    rdflib's grouped layout). Tier statistics are reduced from the shards.
+    
+    Returns:
+        (total links, tier statistics, per-unit edge arrays for the adjacency export,
+         {unit id: (links, candidates)})
+    """
+    print(f"\n💾 Writing topology to {output_file}...")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    total_links = 0
+    stats = _new_stats()
+    unit_counts = {}
+    edges = []
+    with open(output_file, "w", encoding="utf-8") as out:
+        out.write(f"@prefix ext: <{EXT}> .\n@prefix schema: <{SCHEMA}> .\n\n")
+        for unit in units:
+            shard = shard_dir / shard_name(unit)
+            with open(f"{shard}{LINK_SHARD_SUFFIX}", "r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, out)
+            with np.load(f"{shard}.npz") as data:
+                tiers = data["tier"]
+                total_links += _add_tier_counts(stats, np.bincount(tiers, minlength=3))
+                unit_counts[unit[0]] = (len(tiers), int(data["candidates"]))
+                predicates = np.array([str(p) for p in tier_predicates_for(unit[4])], dtype=str)
+                edges.append((data["source"], data["target"], predicates[tiers], data["distance"]))
+    return total_links, stats, edges, unit_counts
+
+
+# ============================================================================
+# INCREMENTAL SHARD CACHE
+# ============================================================================
+SHARD_MANIFEST = "manifest.json"
+
+
+def file_digest(path: Path) -> str:
+    """SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_shard_manifest(cache_dir: Path) -> Dict[str, Any]:
+    """
+    Read the shard cache manifest.
+    
+    Returns:
+        {'code': digest of this module, 'categories': {name: input digest},
+         'shards': {shard name: {'max_dist', 'max_links', 'inputs': {category: digest}}}};
+        empty if the cache is new or unreadable
+    """
+    try:
+        with open(cache_dir / SHARD_MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("code", None)
+    manifest.setdefault("categories", {})
+    manifest.setdefault("shards", {})
+    return manifest
+
+
+def stale_units(units: List[Tuple], manifest: Dict[str, Any], category_hashes: Dict[str, str],
+                code_hash: str, cache_dir: Path) -> List[Tuple]:
+    """
+    Work units whose cached shard cannot be reused.
+    
+    A shard is stale when it is missing, its radius or link bound changed, or the input
+    file of its source or target category (or this module) changed.
+    """
+    stale = []
+    for unit in units:
+        _, source_name, target_name, max_dist, _, max_links = unit
+        name = shard_name(unit)
+        entry = manifest["shards"].get(name)
+        if (
+            entry is None
+            or manifest["code"] != code_hash
+            or entry.get("max_dist") != max_dist
+            or entry.get("max_links") != max_links
+            or entry.get("inputs") != {source_name: category_hashes[source_name],
+                                       target_name: category_hashes[target_name]}
+            or not (cache_dir / f"{name}{LINK_SHARD_SUFFIX}").exists()
+            or not (cache_dir / f"{name}.npz").exists()
+        ):
+            stale.append(unit)
+    return stale
+
+
+def save_shard_manifest(cache_dir: Path, units: List[Tuple], category_hashes: Dict[str, str],
+                        code_hash: str, previous: Dict[str, Any]):
+    """Record the shards of this run and delete shards no longer configured."""
+    shards = {}
+    for unit in units:
+        _, source_name, target_name, max_dist, _, max_links = unit
+        shards[shard_name(unit)] = {
+            "max_dist": max_dist,
+            "max_links": max_links,
+            "inputs": {source_name: category_hashes[source_name],
+                       target_name: category_hashes[target_name]},
+        }
+    for name in set(previous["shards"]) - set(shards):
+        for suffix in (LINK_SHARD_SUFFIX, ".npz"):
+            (cache_dir / f"{name}{suffix}").unlink(missing_ok=True)
+    # Shards written before they were renamed from the misleading .nt suffix
+    for legacy in cache_dir.glob("*.nt"):
+        legacy.unlink()
+    
+    manifest = {"code": code_hash, "categories": category_hashes, "shards": shards}
+    with open(cache_dir / SHARD_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def generate_topology(data_dir: Path, output_file: Path, link_config: List[Dict] = None,
+                      export_adjacency: bool = True, workers: int = 1, cache_dir: Path = None):
+    """
+    Generate spatial topology relationships between all configured amenity types.
+    
+    Besides the Turtle file, the links (with their distances) are written as a
+    CSR adjacency .npz and, if pyarrow is installed, a Parquet edge list next
+    to output_file (see topology_adjacency.adjacency_paths).
+    
+    With cache_dir, every (source, target, predicate) link set is kept as a
+    shard next to a manifest of input hashes; only shards whose source or
+    target file changed are recomputed, and only the categories those shards
+    need are parsed.
+    
+    Args:
+        data_dir: Directory containing input TTL files
+        output_file: Path to output topology file
+        link_config: Subset of LINK_CONFIG to generate (default: all entries)
+        export_adjacency: Also write the .npz/.parquet adjacency files
+        workers: Processes for loading and linking; above 1 the (source, target)
+            work units run in a pool over shared-memory coordinates
+        cache_dir: Directory of the incremental shard cache (default: no cache)
+    
+    Returns:
+        {'total_links', 'tiers': counts per distance tier, 'configs': config_link_counts()}
+    """
+    if link_config is None:
+        link_config = LINK_CONFIG
+    
+    print("=" * 80)
+    print("SPATIAL TOPOLOGY GENERATOR")
+    print("=" * 80)
+    
+    # Step 1: Collect all unique dataset names from config
+    dataset_names = set()
+    for config in link_config:
+        dataset_names.add(config["source"])
+        dataset_names.update(config["targets"])
+    
+    print(f"\n📊 Found {len(dataset_names)} unique dataset types in configuration")
+    print(f"📁 Data directory: {data_dir}")
+    
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        code_hash = file_digest(Path(__file__))
+        category_hashes = {}
+        for dataset_name in sorted(dataset_names):
+            file_path = dataset_file(data_dir, dataset_name)
+            if file_path.exists():
+                category_hashes[dataset_name] = file_digest(file_path)
+            else:
+                print(f"  ⚠ {dataset_name}: File not found")
+        manifest = load_shard_manifest(cache_dir)
+        units = link_work_units(link_config, category_hashes)
+        pending = stale_units(units, manifest, category_hashes, code_hash, cache_dir)
+        print(f"♻️  Reusing {len(units) - len(pending)} cached link shards, "
+              f"recomputing {len(pending)}")
+        dataset_names = {name for unit in pending for name in unit[1:3]}
+    
+    # Step 2: Load all datasets
+    print("\n⏳ Loading graphs into memory...")
+    coords = _load_datasets(data_dir, dataset_names, workers)
+    
+    print(f"\n✓ Loaded {len(coords)} datasets successfully")
+    
+    # Step 3: Generate topology relationships
+    print("\n🔗 Generating spatial topology relationships...")
+    points = {name: category_points(coords[name]) for name in coords}
+    if cache_dir is None:
+        units = pending = link_work_units(link_config, points)
+    else:
+        # Datasets that failed to load are dropped like missing files
+        failed = dataset_names - set(points)
+        units = [unit for unit in units if unit[1] not in failed and unit[2] not in failed]
+        pending = [unit for unit in pending if unit[1] not in failed and unit[2] not in failed]
+    groups = plan_link_pairs(pending)
+    print(f"   {len(pending)} link units share {len(groups)} distance tables")
+    
+    if cache_dir is None and (workers <= 1 or not units):
+        total_links, stats, edges, unit_counts = _generate_links_serial(points, units, output_file)
+    else:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if cache_dir is None:
+            shard_context = tempfile.TemporaryDirectory(prefix="topology_shards_",
+                                                        dir=str(output_file.parent))
+        else:
+            shard_context = nullcontext(str(cache_dir))
+        with shard_context as shard_dir:
+            if workers > 1 and len(groups) > 1:
+                _compute_shards_parallel(points, groups, Path(shard_dir), workers)
+            else:
+                for group in tqdm(groups, desc="Processing category pairs"):
+                    write_pair_shards(points, group, Path(shard_dir))
+            total_links, stats, edges, unit_counts = assemble_shards(units, Path(shard_dir),
+                                                                     output_file)
+        if cache_dir is not None:
+            save_shard_manifest(cache_dir, units, category_hashes, code_hash, manifest)
+    
+    if export_adjacency:
+        adjacency = TopologyAdjacency.from_edges(
+            np.concatenate([e[0] for e in edges]) if edges else [],
+            np.concatenate([e[1] for e in edges]) if edges else [],
+            np.concatenate([e[2] for e in edges]) if edges else [],
+            np.concatenate([e[3] for e in edges]) if edges else [],
+        )
+        npz_file, parquet_file = adjacency_paths(output_file)
+        adjacency.save(npz_file)
+        print(f"💾 Adjacency (CSR): {npz_file}")
+        if adjacency.to_parquet(parquet_file):
+            print(f"💾 Edge list (Parquet): {parquet_file}")
+        else:
+            print("   (pyarrow not installed - Parquet edge list skipped)")
     
     # Step 5: Report statistics
     print("\n" + "=" * 80)
@@ -491,14 +1076,37 @@ def generate_topology(data_dir: Path, output_file: Path):
         print("  • All amenities are beyond configured max distances")
         print("  • Input files are empty or improperly formatted")
     
+    config_counts = config_link_counts(units, unit_counts)
+    if config_counts:
+        print("\nLinks per Config:")
+        for entry in config_counts:
+            label = f"{entry['source']} → {entry['predicate']} (≤{entry['max_dist']}m"
+            if entry["max_links"] is None:
+                label += ")"
+                print(f"  • {label:<52} {entry['links']:>8,}")
+            else:
+                label += f", k={entry['max_links']})"
+                kept = entry["links"] / entry["candidates"] * 100 if entry["candidates"] else 100.0
+                print(f"  • {label:<52} {entry['links']:>8,} of {entry['candidates']:,} "
+                      f"in range ({kept:.1f}%)")
+    
     print(f"\n✅ Output saved to: {output_file}")
     print("=" * 80)
+    return {"total_links": total_links, "tiers": stats, "configs": config_counts}
 
 # ============================================================================
 # ENTRY POINT
 # ============================================================================
 def main():
     """Main entry point for the topology generator."""
+    parser = argparse.ArgumentParser(description="Generate spatial topology relationships")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Processes for loading and linking (default: 1; 0 = all cores)")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Keep link shards here and only recompute those whose inputs changed")
+    args = parser.parse_args()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
     # Determine paths
     script_dir = Path(__file__).parent
     data_dir = script_dir / "datav2" / "cleaned"
@@ -511,7 +1119,7 @@ def main():
     
     # Generate topology
     try:
-        generate_topology(data_dir, output_file)
+        generate_topology(data_dir, output_file, workers=workers, cache_dir=args.cache_dir)
     except KeyboardInterrupt:
         print("\n\n⚠ Topology generation interrupted by user")
     except Exception as e:
@@ -0,0 +1,394 @@
+"""
+@File    : resolve_duplicates.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+from rdflib import Literal, Namespace
+from rdflib.namespace import GEO, OWL
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from brand_matcher import normalize_brand
+from graph_snapshot import load_graph
+from name_index import normalize_name, trigrams
+from poi_index import EARTH_RADIUS_M, haversine_m
+from poi_loader import find_poi_files, poi_file_category
+
+SCHEMA = Namespace("http://schema.org/")
+EXT = Namespace("http://opendatafithou.org/def/extension/")
+
+# Two POIs are only compared when they are at most this far apart
+BLOCK_RADIUS_M = 30.0
+
+# Scores at or above SAME_AS_THRESHOLD become owl:sameAs links, scores
+# between SUGGEST_THRESHOLD and SAME_AS_THRESHOLD are reported for review
+SAME_AS_THRESHOLD = 0.9
+SUGGEST_THRESHOLD = 0.6
+
+# Categories whose entities often share a name with a neighbour without being
+# the same place (stops on both sides of a road named after a nearby school,
+# a row of ATMs of one bank); without a matching address such pairs only yield
+# a suggestion, unless a brand links two different categories (atm and bank)
+REPEATED_NAME_CATEGORIES = {'bus_stop', 'atm', 'charging_station', 'parking'}
+REPEATED_NAME_MAX_SCORE = 0.8
+
+# Names generated for unnamed POIs ("Ngân hàng #1705965309", "Quán cà phê tại
+# Phố Hàng Vải" / "Cafe at ...") are shared by unrelated places and carry no identity
+GENERATED_NAME_RE = re.compile(r'#\d+\s*$| tại | at ')
+
+ENTITY_FIELDS = ('uri', 'category', 'osm_type', 'osm_id', 'name_vi', 'name_en',
+                 'brand', 'housenumber', 'street')
+
+SINGLE_VALUED = {
+    EXT.osm_type: 'osm_type',
+    EXT.osm_id: 'osm_id',
+    SCHEMA.brand: 'brand',
+    EXT.addr_housenumber: 'housenumber',
+    EXT.addr_street: 'street',
+}
+
+
+def parse_entities(ttl_file) -> Dict[str, List]:
+    """
+    Identity-relevant fields of every entity with a WKT point in one file.
+
+    Args:
+        ttl_file: Turtle file path
+
+    Returns:
+        Dictionary of lists keyed by ENTITY_FIELDS plus 'lat' and 'lon'
+        (category is filled by the caller)
+    """
+    g = load_graph(ttl_file)
+    entities = {field: [] for field in ENTITY_FIELDS + ('lat', 'lon') if field != 'category'}
+    for subject, wkt in g.subject_objects(GEO.asWKT):
+        try:
+            lon, lat = map(float, str(wkt).split("POINT(")[1].split(")")[0].split())
+        except (IndexError, ValueError):
+            continue
+        values = {field: '' for field in SINGLE_VALUED.values()}
+        values.update(name_vi='', name_en='')
+        for p, o in g.predicate_objects(subject):
+            if not isinstance(o, Literal):
+                continue
+            if p == SCHEMA.name and o.language in ('vi', 'en'):
+                field = f'name_{o.language}'
+            else:
+                field = SINGLE_VALUED.get(p)
+            if field and not values[field]:
+                values[field] = str(o)
+        entities['uri'].append(str(subject))
+        for field, value in values.items():
+            entities[field].append(value)
+        entities['lat'].append(lat)
+        entities['lon'].append(lon)
+    return entities
+
+
+def load_entities(data_dir, workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Load the entities of every POI file in a directory.
+
+    Args:
+        data_dir: Directory with POI .ttl files (e.g. datav2/cleaned)
+        workers: Processes used for parsing (default: CPU count)
+
+    Returns:
+        Dictionary of arrays keyed by ENTITY_FIELDS plus 'lat' and 'lon'
+    """
+    files = find_poi_files(data_dir)
+    workers = min(len(files), workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_entities, files))
+    else:
+        results = [parse_entities(path) for path in files]
+
+    columns = {field: [] for field in ENTITY_FIELDS + ('lat', 'lon')}
+    for path, result in zip(files, results):
+        for field, values in result.items():
+            columns[field].extend(values)
+        columns['category'].extend([poi_file_category(path)] * len(result['uri']))
+    entities = {field: np.array(columns[field], dtype=str) for field in ENTITY_FIELDS}
+    entities['lat'] = np.array(columns['lat'], dtype=np.float64)
+    entities['lon'] = np.array(columns['lon'], dtype=np.float64)
+    return entities
+
+
+def block_pairs(lat: np.ndarray, lon: np.ndarray, radius_m: float = BLOCK_RADIUS_M) -> np.ndarray:
+    """
+    Candidate pairs from a spatial grid with cells of radius_m.
+
+    Points are projected to meters around the mean latitude and bucketed by
+    grid cell; a point is paired with the points of its own cell and of the
+    neighbouring cells, so every pair closer than radius_m is produced while
+    far-apart pairs are never generated.
+
+    Args:
+        lat: Latitudes in degrees
+        lon: Longitudes in degrees
+        radius_m: Cell size in meters
+
+    Returns:
+        (n, 2) int array of index pairs (i < j), without distance filtering
+    """
+    if len(lat) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    scale = np.radians(1.0) * EARTH_RADIUS_M
+    x = lon * scale * np.cos(np.radians(lat.mean()))
+    y = lat * scale
+    cell_x = np.floor(x / radius_m).astype(np.int64)
+    cell_y = np.floor(y / radius_m).astype(np.int64)
+
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    for index, cell in enumerate(zip(cell_x.tolist(), cell_y.tolist())):
+        cells.setdefault(cell, []).append(index)
+
+    pairs = []
+    # Own cell plus the half of the neighbourhood "after" it, so each pair of cells is visited once
+    for (cx, cy), members in cells.items():
+        pairs.extend(combinations(members, 2))
+        for dx, dy in ((1, -1), (1, 0), (1, 1), (0, 1)):
+            neighbours = cells.get((cx + dx, cy + dy))
+            if neighbours:
+                pairs.extend((a, b) for a in members for b in neighbours)
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.array(pairs, dtype=np.int64), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def name_grams(entities: Dict[str, np.ndarray], index: int) -> List[FrozenSet[str]]:
+    """Trigram sets of the real (non-generated) names of an entity."""
+    grams = []
+    for field in ('name_vi', 'name_en'):
+        name = str(entities[field][index])
+        if name and not GENERATED_NAME_RE.search(name):
+            normalized = normalize_name(name)
+            if normalized:
+                grams.append(frozenset(trigrams(normalized)))
+    return grams
+
+
+def name_similarity(grams_a: List[FrozenSet[str]], grams_b: List[FrozenSet[str]]) -> float:
+    """Best trigram Jaccard similarity between any name of a and any name of b."""
+    best = 0.0
+    for a in grams_a:
+        for b in grams_b:
+            best = max(best, len(a & b) / len(a | b))
+    return best
+
+
+def compare_entities(entities: Dict[str, np.ndarray], i: int, j: int,
+                     grams: Dict[int, List[FrozenSet[str]]]) -> Optional[Dict[str, Any]]:
+    """
+    Score whether two nearby entities describe the same place.
+
+    The same OSM element in two category files is always a match. Otherwise
+    the score is the name similarity, raised when the brands agree and when
+    the house number and street agree; conflicting brands, house numbers or
+    streets rule the pair out.
+
+    Args:
+        entities: Loaded entities
+        i: Index of the first entity
+        j: Index of the second entity
+        grams: Memoized name trigram sets per entity index
+
+    Returns:
+        Dictionary with 'score' and 'evidence', or None if the pair cannot match
+    """
+    a = {name: str(entities[name][i]) for name in ENTITY_FIELDS}
+    b = {name: str(entities[name][j]) for name in ENTITY_FIELDS}
+    if a['osm_id'] and a['osm_id'] == b['osm_id'] and a['osm_type'] == b['osm_type']:
+        return {'score': 1.0, 'evidence': ['same_osm_element']}
+
+    house_i, house_j = normalize_brand(a['housenumber']), normalize_brand(b['housenumber'])
+    street_i, street_j = normalize_brand(a['street']), normalize_brand(b['street'])
+    if house_i and house_j and house_i != house_j:
+        return None
+    if street_i and street_j and street_i != street_j:
+        return None
+    brand_i, brand_j = normalize_brand(a['brand']), normalize_brand(b['brand'])
+    if brand_i and brand_j and brand_i != brand_j:
+        return None
+
+    for k in (i, j):
+        if k not in grams:
+            grams[k] = name_grams(entities, k)
+    similarity = name_similarity(grams[i], grams[j])
+    score = similarity
+    evidence = [f'name={similarity:.2f}']
+
+    if brand_i and brand_i == brand_j:
+        score = max(score, 0.6) + 0.1
+        evidence.append('brand')
+    if house_i and house_i == house_j and (not street_i or street_i == street_j):
+        score += 0.15
+        evidence.append('address')
+    if REPEATED_NAME_CATEGORIES & {a['category'], b['category']} and 'address' not in evidence \
+            and (a['category'] == b['category'] or 'brand' not in evidence):
+        score = min(score, REPEATED_NAME_MAX_SCORE)
+    return {'score': min(score, 1.0), 'evidence': evidence}
+
+
+def resolve_duplicates(entities: Dict[str, np.ndarray], radius_m: float = BLOCK_RADIUS_M,
+                       same_as_threshold: float = SAME_AS_THRESHOLD,
+                       suggest_threshold: float = SUGGEST_THRESHOLD) -> Dict[str, Any]:
+    """
+    Find entities that describe the same physical place.
+
+    Args:
+        entities: Output of load_entities
+        radius_m: Blocking radius in meters
+        same_as_threshold: Minimum score for an owl:sameAs link
+        suggest_threshold: Minimum score for a merge suggestion
+
+    Returns:
+        Dictionary with 'same_as' and 'suggestions' (lists of match dictionaries)
+        and 'stats' (entity and pair counts)
+    """
+    pairs = block_pairs(entities['lat'], entities['lon'], radius_m)
+    distances = haversine_m(entities['lat'][pairs[:, 0]], entities['lon'][pairs[:, 0]],
+                            entities['lat'][pairs[:, 1]], entities['lon'][pairs[:, 1]])
+    near = distances <= radius_m
+    near &= entities['uri'][pairs[:, 0]] != entities['uri'][pairs[:, 1]]
+
+    grams: Dict[int, List[FrozenSet[str]]] = {}
+    same_as, suggestions = [], []
+    for (i, j), distance in zip(pairs[near].tolist(), distances[near].tolist()):
+        result = compare_entities(entities, i, j, grams)
+        if result is None or result['score'] < suggest_threshold:
+            continue
+        a, b = sorted((i, j), key=lambda k: entities['uri'][k])
+        match = {
+            'source': str(entities['uri'][a]),
+            'target': str(entities['uri'][b]),
+            'categories': [str(entities['category'][a]), str(entities['category'][b])],
+            'names': [str(entities['name_vi'][a]), str(entities['name_vi'][b])],
+            'distance_m': round(distance, 1),
+            'score': round(result['score'], 3),
+            'evidence': result['evidence'],
+        }
+        (same_as if result['score'] >= same_as_threshold else suggestions).append(match)
+
+    n = len(entities['uri'])
+    stats = {
+        'entities': n,
+        'possible_pairs': n * (n - 1) // 2,
+        'block_pairs': int(len(pairs)),
+        'evaluated_pairs': int(near.sum()),
+        'same_as': len(same_as),
+        'suggestions': len(suggestions),
+    }
+    key = itemgetter('source', 'target')
+    return {
+        'same_as': sorted(same_as, key=key),
+        'suggestions': sorted(suggestions, key=key),
+        'stats': stats,
+    }
+
+
+def write_same_as(matches: List[Dict[str, Any]], output_file) -> int:
+    """
+    Write owl:sameAs links as Turtle.
+
+    Returns:
+        Number of links written
+    """
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(f"@prefix owl: <{OWL}> .\n\n")
+        for match in matches:
+            f.write(f"<{match['source']}> owl:sameAs <{match['target']}> .\n")
+    return len(matches)
+
+
+def write_report(result: Dict[str, Any], report_file):
+    """Write the statistics and every match (links and suggestions) as JSON."""
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def detect_duplicates(data_dir, output_file, report_file, radius_m: float = BLOCK_RADIUS_M,
+                      workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run entity resolution over a POI directory and write its outputs.
+
+    Args:
+        data_dir: Directory with POI .ttl files
+        output_file: Turtle file for owl:sameAs links
+        report_file: JSON report with statistics, links and merge suggestions
+        radius_m: Blocking radius in meters
+        workers: Processes for parsing
+
+    Returns:
+        Output of resolve_duplicates
+    """
+    print("🔎 Loading entities...")
+    entities = load_entities(data_dir, workers)
+    result = resolve_duplicates(entities, radius_m)
+    stats = result['stats']
+
+    write_same_as(result['same_as'], output_file)
+    write_report(result, report_file)
+
+    print(f"📊 Entities: {stats['entities']:,}")
+    print(f"   Possible pairs:  {stats['possible_pairs']:>14,}")
+    print(f"   Grid candidates: {stats['block_pairs']:>14,}")
+    print(f"   Evaluated (≤ {radius_m:g}m): {stats['evaluated_pairs']:>9,} "
+          f"({stats['evaluated_pairs'] / max(stats['possible_pairs'], 1):.6%} of possible)")
+    print(f"✅ owl:sameAs links: {stats['same_as']:,} → {output_file}")
+    print(f"📝 Merge suggestions: {stats['suggestions']:,} → {report_file}")
+    return result
+
+
+def main():
+    """Detect duplicate POIs across category files."""
+    root = Path(__file__).resolve().parents[2]
+    parser = argparse.ArgumentParser(description="Detect POIs that describe the same place")
+    parser.add_argument("data_dir", nargs="?", default=str(root / "datav2" / "cleaned"),
+                        help="Directory with POI .ttl files")
+    parser.add_argument("--output", default=str(root / "datav2" / "data_hanoi_duplicates.ttl"),
+                        help="Turtle file for owl:sameAs links")
+    parser.add_argument("--report", default=str(root / "datav2" / "duplicates_report.json"),
+                        help="JSON report with statistics and merge suggestions")
+    parser.add_argument("--radius", type=float, default=BLOCK_RADIUS_M,
+                        help="Blocking radius in meters")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Processes for parsing")
+    args = parser.parse_args()
+    detect_duplicates(args.data_dir, args.output, args.report, args.radius, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,16 @@ import logging
 from rdflib import Graph, Literal, Namespace, URIRef
 from rdflib.namespace import RDF, RDFS, XSD
 from smart_translate_lookup import SmartTranslator
-from typing import Dict
+from graph_snapshot import load_graph
+from entity_table import EntityTable
+from cleaning_manifest import (CleaningManifest, code_version, load_previous_output,
+                               reusable_subjects, reuse_previous_names)
+from typing import Dict, List, Optional
+
+# Source files whose changes invalidate the names recorded in the incremental manifest
+_PROCESSORS_DIR = os.path.dirname(os.path.abspath(__file__))
+NAMING_CODE = [__file__, os.path.join(_PROCESSORS_DIR, 'entity_table.py'),
+               os.path.join(_PROCESSORS_DIR, '..', 'utils', 'smart_translate_lookup.py')]
 
 # Setup logging
 logging.basicConfig(
@@ -43,10 +52,23 @@ class SecondPassCleaner:
     Second-pass cleaner to improve translations using Wikidata.
     """
     
-    def __init__(self):
-        """Initialize the second-pass cleaner."""
+    def __init__(self, max_workers: int = 4, requests_per_second: float = 4.0):
+        """
+        Initialize the second-pass cleaner.
+        
+        Args:
+            max_workers: Concurrent Wikidata search workers for batch translation
+            requests_per_second: Wikidata request budget shared by all workers
+        """
         # Initialize smart translator
-        self.translator = SmartTranslator(cache_file="translation_cache.json")
+        self.translator = SmartTranslator(
+            cache_file="translation_cache.json",
+            requests_per_second=requests_per_second
+        )
+        self.max_workers = max_workers
+        
+        # Results of the latest batch translation, keyed by Vietnamese name
+        self.prefetched = {}
         
         # Define namespaces
         self.SCHEMA = Namespace("http://schema.org/")
@@ -81,32 +103,42 @@ class SecondPassCleaner:
         Returns:
             True if translation was improved, False otherwise
         """
-        # Get current names
-        vi_name = None
-        en_name = None
+        table = EntityTable.from_subject(graph, subject)
+        improved = self.improve_row_name(table, 0)
+        table.apply_changes(graph)
+        return improved
+    
+    def improve_row_name(self, table: EntityTable, index: int) -> bool:
+        """
+        Improve the English name of one entity table row.
         
-        for obj in graph.objects(subject, self.SCHEMA.name):
-            if isinstance(obj, Literal):
-                if obj.language == 'vi':
-                    vi_name = str(obj)
-                elif obj.language == 'en':
-                    en_name = str(obj)
+        The new name is recorded in the table; ``table.apply_changes`` writes it
+        back to the graph.
+        
+        Args:
+            table: Entity table of the file
+            index: Row number
+            
+        Returns:
+            True if translation was improved, False otherwise
+        """
+        # Get current names
+        vi_name = table.columns['name_vi'][index]
+        en_name = table.columns['name_en'][index]
         
         # If no Vietnamese name, skip
         if not vi_name:
             return False
         
-        # Get improved English translation
-        new_en_name, source = self.translator.get_official_english_name(vi_name)
+        # Get improved English translation (prefetched by the batch API when available)
+        if vi_name.strip() in self.prefetched:
+            new_en_name, source = self.prefetched[vi_name.strip()]
+        else:
+            new_en_name, source = self.translator.get_official_english_name(vi_name)
         
         # Check if translation improved
         if new_en_name and new_en_name != en_name:
-            # Remove old English name
-            if en_name:
-                graph.remove((subject, self.SCHEMA.name, Literal(en_name, lang='en')))
-            
-            # Add improved English name
-            graph.add((subject, self.SCHEMA.name, Literal(new_en_name, lang='en')))
+            table.update_name(index, 'en', new_en_name)
             
             # Update statistics
             self.stats['translations_improved'] += 1
@@ -118,13 +150,44 @@ class SecondPassCleaner:
             self.stats['translations_unchanged'] += 1
             return False
     
-    def process_file(self, input_file: str, output_file: str) -> Dict:
+    def collect_vietnamese_names(self, graph: Graph) -> List[str]:
+        """
+        Collect all Vietnamese names in a graph.
+        
+        Args:
+            graph: RDF graph
+            
+        Returns:
+            List of Vietnamese names (may contain duplicates)
+        """
+        return [
+            str(obj) for obj in graph.objects(None, self.SCHEMA.name)
+            if isinstance(obj, Literal) and obj.language == 'vi'
+        ]
+    
+    def prefetch_translations(self, vi_names: List[str]):
+        """
+        Translate all names up front through the batch translation API.
+        
+        Args:
+            vi_names: Vietnamese names to translate
+        """
+        results = self.translator.translate_batch(vi_names, max_workers=self.max_workers)
+        self.prefetched.update(results)
+        logger.info(f"Prefetched {len(results)} distinct translations")
+    
+    def process_file(self, input_file: str, output_file: str, graph: Optional[Graph] = None,
+                     prefetch: bool = True, manifest: Optional[CleaningManifest] = None) -> Dict:
         """
         Process a single TTL file to improve translations.
         
         Args:
             input_file: Input TTL file path
             output_file: Output TTL file path
+            graph: Already parsed graph of input_file (parsed here if omitted)
+            prefetch: Batch-translate all names of this file before processing
+            manifest: Content hashes of the previous run; when given, entities
+                whose hash is unchanged reuse their names from output_file
             
         Returns:
             Processing statistics
@@ -135,9 +198,11 @@ class SecondPassCleaner:
         
         try:
             # Load RDF graph
-            logger.info("Loading RDF graph...")
-            g = Graph()
-            g.parse(input_file, format='turtle')
+            if graph is None:
+                logger.info("Loading RDF graph...")
+                g = load_graph(input_file)
+            else:
+                g = graph
             
             # Bind namespaces
             g.bind('schema', self.SCHEMA)
@@ -145,22 +210,48 @@ class SecondPassCleaner:
             g.bind('ext', self.EXT)
             g.bind('geo', self.GEO)
             
-            # Find all entities (subjects with schema:name)
-            entities = set(g.subjects(self.SCHEMA.name, None))
+            # Find all entities (subjects with schema:name) in one pass over the triples
+            table = EntityTable.from_graph(g)
+            entities = [index for index, _ in table.rows(named_only=True)]
             entity_count = len(entities)
             logger.info(f"Found {entity_count} entities to process")
             
             self.stats['total_entities'] += entity_count
             
+            # Hash the input fields of each entity before any name is changed
+            file_key = os.path.basename(input_file)
+            hashes = {str(table.subjects[index]): table.content_hash(index) for index in entities}
+            reused = set()
+            previous_graph = None
+            if manifest is not None:
+                previous_graph = load_previous_output(output_file)
+                reused = reusable_subjects(hashes, manifest.previous_hashes(file_key),
+                                           previous_graph)
+                logger.info(f"Incremental: {len(reused)} unchanged entities reused, "
+                            f"{entity_count - len(reused)} to process")
+            pending = [index for index in entities if str(table.subjects[index]) not in reused]
+            
+            # Resolve all uncached names of this file in one batch
+            if prefetch:
+                names = [table.columns['name_vi'][index] for index in pending]
+                self.prefetch_translations([name for name in names if name])
+            
             # Process each entity
             improved_count = 0
-            for idx, subject in enumerate(entities, 1):
+            for idx, index in enumerate(pending, 1):
                 if idx % 50 == 0:
-                    logger.info(f"  Processing entity {idx}/{entity_count}...")
+                    logger.info(f"  Processing entity {idx}/{len(pending)}...")
                 
-                if self.improve_entity_name(g, subject):
+                if self.improve_row_name(table, index):
                     improved_count += 1
             
+            # Write only the changed names back to the graph
+            table.apply_changes(g)
+            
+            # Copy the improved names of unchanged entities from the previous output
+            if reused:
+                reuse_previous_names(g, previous_graph, reused)
+            
             # Save improved graph
             logger.info(f"Saving improved data to: {output_file}")
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
@@ -172,13 +263,19 @@ class SecondPassCleaner:
             logger.info(f"  Total entities: {entity_count}")
             logger.info(f"  Translations improved: {improved_count}")
             logger.info(f"  Translations unchanged: {entity_count - improved_count}")
+            if manifest is not None:
+                logger.info(f"  Reused from previous run: {len(reused)}")
             logger.info(f"✓ Successfully saved to: {output_file}")
             
+            if manifest is not None:
+                manifest.update(file_key, hashes)
+            
             return {
                 'success': True,
                 'entities': entity_count,
                 'improved': improved_count,
-                'unchanged': entity_count - improved_count
+                'unchanged': entity_count - improved_count,
+                'reused': len(reused)
             }
             
         except Exception as e:
@@ -186,17 +283,25 @@ class SecondPassCleaner:
             return {'success': False, 'error': str(e)}
     
     def process_all_files(self, input_dir: str = 'datav2/cleaned',
-                         output_dir: str = 'datav2/cleanedv2') -> Dict:
+                          output_dir: str = 'datav2/cleanedv2',
+                          batch_scope: str = 'file', incremental: bool = False) -> Dict:
         """
         Process all TTL files in the cleaned directory.
         
         Args:
             input_dir: Input directory with cleaned files
             output_dir: Output directory for improved files
+            batch_scope: 'file' to batch-translate per file, 'corpus' to
+                translate the names of all files in a single batch first
+            incremental: Only reprocess entities that are new or changed since
+                the last run (tracked in output_dir/cleaning_manifest.json)
             
         Returns:
             Overall statistics
         """
+        # The cache is closed at the end of every run; reopen it for this one
+        self.translator.open()
+        
         logger.info("="*70)
         logger.info("SECOND-PASS CLEANING - SMART TRANSLATION")
         logger.info("="*70)
@@ -211,13 +316,37 @@ class SecondPassCleaner:
         logger.info(f"Found {len(input_files)} files to process")
         logger.info("")
         
+        manifest = None
+        if incremental:
+            manifest = CleaningManifest(os.path.join(output_dir, 'cleaning_manifest.json'),
+                                        code_version=code_version(NAMING_CODE))
+        
+        # Corpus mode: parse everything first and translate all names at once
+        graphs = {}
+        if batch_scope == 'corpus':
+            logger.info("Loading all graphs for corpus-wide batch translation...")
+            all_names = []
+            for input_filename in sorted(input_files):
+                g = load_graph(os.path.join(input_dir, input_filename))
+                graphs[input_filename] = g
+                all_names.extend(self.collect_vietnamese_names(g))
+            self.prefetch_translations(all_names)
+            logger.info("")
+        
         # Process each file
         for input_filename in sorted(input_files):
             input_path = os.path.join(input_dir, input_filename)
             output_filename = input_filename.replace('_cleaned.ttl', '_cleanedv2.ttl')
             output_path = os.path.join(output_dir, output_filename)
             
-            result = self.process_file(input_path, output_path)
+            result = self.process_file(
+                input_path, output_path,
+                graph=graphs.pop(input_filename, None),
+                prefetch=(batch_scope != 'corpus'),
+                manifest=manifest
+            )
+            if manifest is not None and result.get('success'):
+                manifest.save()
             logger.info("")
         
         # Print overall summary
@@ -235,6 +364,9 @@ class SecondPassCleaner:
                 logger.info(f"  {source}: {count}")
         logger.info("")
         
+        # Commit and compact the translation cache before reporting
+        self.translator.close()
+        
         # Translation statistics
         translator_stats = self.translator.get_stats()
         logger.info("Translation engine statistics:")
@@ -249,10 +381,18 @@ class SecondPassCleaner:
 
 def main():
     """Main execution function."""
+    import sys
+    
+    # Usage: python second_pass_cleaning.py [corpus] [incremental]
+    batch_scope = 'corpus' if 'corpus' in sys.argv[1:] else 'file'
+    incremental = 'incremental' in sys.argv[1:]
+    
     cleaner = SecondPassCleaner()
     results = cleaner.process_all_files(
         input_dir='datav2/cleaned',
-        output_dir='datav2/cleanedv2'
+        output_dir='datav2/cleanedv2',
+        batch_scope=batch_scope,
+        incremental=incremental
     )
 
 
@@ -0,0 +1,120 @@
+"""
+@File    : single_pass_naming.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from typing import Any, Dict, Optional, Tuple
+
+from rdflib import URIRef
+
+from clean_all_remaining import UniversalDataCleaner
+from entity_table import EntityTable
+from smart_translate_lookup import SmartTranslator
+
+# OSM address tag -> entity table column read by the naming strategies
+ADDRESS_TAGS = {
+    'addr:street': 'addr_street',
+    'addr:district': 'addr_district',
+    'addr:city': 'addr_city',
+    'addr:housenumber': 'addr_housenumber',
+}
+
+
+class SinglePassNamer:
+    """
+    Apply the cleaning-stage naming while the fetcher writes a Turtle file.
+
+    Passed as ``namer`` to ``write_turtle_file`` / ``process_amenity_data``, it
+    takes the names produced by ``generate_bilingual_names`` and runs the same
+    category strategy as ``UniversalDataCleaner.process_row`` (semantic
+    translation or location-based fallback) on a one-row entity table, then
+    replaces the English name with a SmartTranslator special case or cached
+    translation when there is one. The file written by the fetch is then the
+    cleaned output, without parsing and re-serializing it in the cleaning
+    passes; those remain for reprocessing files written before.
+
+    Names missing from the translation cache are not looked up on Wikidata
+    here; the second pass still resolves them.
+    """
+
+    def __init__(self, category: str, cleaner: Optional[UniversalDataCleaner] = None,
+                 translator: Optional[SmartTranslator] = None):
+        """
+        Initialize the namer.
+
+        Args:
+            category: Category of the file being written (e.g. 'cafe')
+            cleaner: First-pass cleaner providing the naming strategies
+            translator: Translator whose cache is consulted (opened on
+                translation_cache.json, as in the second pass, if omitted)
+        """
+        self.category = category
+        self.cleaner = cleaner or UniversalDataCleaner()
+        self._owns_translator = translator is None
+        self.translator = translator or SmartTranslator(cache_file="translation_cache.json")
+        self.stats = {'semantic': 0, 'location': 0, 'translated': 0}
+
+    def __call__(self, subject: str, tags: Dict[str, Any], name_vi: str, name_en: str,
+                 lat: float, lon: float) -> Tuple[str, str]:
+        """
+        Final names of one entity.
+
+        Args:
+            subject: Entity URI
+            tags: OSM tags of the element
+            name_vi: Vietnamese name from generate_bilingual_names
+            name_en: English name from generate_bilingual_names
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            Tuple of (name_vi, name_en)
+        """
+        values = {column: str(tags.get(tag, '')).strip() for tag, column in ADDRESS_TAGS.items()}
+        values.update(name_vi=name_vi, name_en=name_en, wkt=f"POINT({lon} {lat})")
+        table = EntityTable.from_values(URIRef(subject), values)
+
+        stats = self.cleaner.process_row(table, 0, self.category)
+        if stats['used_semantic']:
+            self.stats['semantic'] += 1
+        if stats['used_location']:
+            self.stats['location'] += 1
+        name_vi = table.columns['name_vi'][0] or name_vi
+        name_en = table.columns['name_en'][0] or name_en
+
+        known = self.translator.lookup_known(name_vi)
+        if known is not None and known[0] and known[0] != name_en:
+            name_en = known[0]
+            self.stats['translated'] += 1
+        return name_vi, name_en
+
+    def close(self):
+        """Close the translator if this namer opened it."""
+        if self._owns_translator:
+            self.translator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
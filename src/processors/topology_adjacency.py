@@ -0,0 +1,213 @@
+"""
+@File    : topology_adjacency.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Arrays stored in the .npz file
+ADJACENCY_KEYS = ('nodes', 'node_category', 'categories', 'indptr', 'indices',
+                  'predicate', 'predicates', 'distance_m')
+
+
+def uri_category(uri: str) -> str:
+    """Category part of urn:ngsi-ld:PointOfInterest:Hanoi:<category>:<id>."""
+    parts = uri.split(":")
+    return parts[-2] if len(parts) >= 2 else ""
+
+
+def adjacency_paths(output_file) -> Tuple[Path, Path]:
+    """(.npz, .parquet) paths written next to a topology TTL file."""
+    output_file = Path(output_file)
+    return (output_file.with_name(f"{output_file.stem}_adjacency.npz"),
+            output_file.with_name(f"{output_file.stem}_edges.parquet"))
+
+
+class TopologyAdjacency:
+    """
+    Spatial topology as a compressed sparse row (CSR) adjacency structure.
+
+    Nodes are the POI URIs that take part in at least one link, sorted, with a
+    category code each. The outgoing links of node i are the slice
+    ``indptr[i]:indptr[i + 1]`` of ``indices`` (target node), ``predicate``
+    (code into ``predicates``) and ``distance_m``, sorted by target.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.nodes = arrays['nodes']
+        self.node_category = arrays['node_category']
+        self.categories = arrays['categories']
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+        self.predicate = arrays['predicate']
+        self.predicates = arrays['predicates']
+        self.distance_m = arrays['distance_m']
+
+    @classmethod
+    def from_edges(cls, source: Sequence[str], target: Sequence[str],
+                   predicate: Sequence[str], distance_m: Sequence[float]) -> 'TopologyAdjacency':
+        """
+        Build the CSR arrays from a flat edge list.
+
+        Duplicate (source, predicate, target) edges are kept once, like
+        triples in a graph.
+
+        Args:
+            source: Source URIs
+            target: Target URIs
+            predicate: Predicate IRIs
+            distance_m: Distances in metres
+
+        Returns:
+            TopologyAdjacency
+        """
+        source = np.asarray(source, dtype=str)
+        target = np.asarray(target, dtype=str)
+        predicate = np.asarray(predicate, dtype=str)
+        distance_m = np.asarray(distance_m, dtype=np.float32)
+
+        nodes, node_ids = np.unique(np.concatenate([source, target]), return_inverse=True)
+        src, tgt = node_ids[:len(source)], node_ids[len(source):]
+        predicates, pred = np.unique(predicate, return_inverse=True)
+
+        if len(src):
+            order = np.lexsort((pred, tgt, src))
+            src, tgt, pred, distance_m = src[order], tgt[order], pred[order], distance_m[order]
+            keep = np.ones(len(src), dtype=bool)
+            keep[1:] = (src[1:] != src[:-1]) | (tgt[1:] != tgt[:-1]) | (pred[1:] != pred[:-1])
+            src, tgt, pred, distance_m = src[keep], tgt[keep], pred[keep], distance_m[keep]
+
+        node_categories = [uri_category(uri) for uri in nodes.tolist()]
+        categories, node_category = np.unique(np.array(node_categories, dtype=str),
+                                              return_inverse=True)
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(nodes)), out=indptr[1:])
+
+        return cls({
+            'nodes': nodes,
+            'node_category': node_category.astype(np.int16),
+            'categories': categories,
+            'indptr': indptr,
+            'indices': tgt.astype(np.int32),
+            'predicate': pred.astype(np.int16),
+            'predicates': predicates,
+            'distance_m': distance_m.astype(np.float32),
+        })
+
+    @classmethod
+    def load(cls, path) -> 'TopologyAdjacency':
+        """Load an adjacency .npz file (no pickled objects)."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in ADJACENCY_KEYS})
+
+    def save(self, path):
+        """Write the arrays as a compressed .npz file."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **{key: self.arrays[key] for key in ADJACENCY_KEYS})
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def node_index(self, uri: str) -> Optional[int]:
+        """Row of a node, or None if it has no links."""
+        i = int(np.searchsorted(self.nodes, uri))
+        if i < len(self.nodes) and self.nodes[i] == uri:
+            return i
+        return None
+
+    def neighbours(self, uri: str, predicate: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """
+        Outgoing links of a POI.
+
+        Args:
+            uri: Source POI URI
+            predicate: Only links with this predicate IRI
+
+        Returns:
+            List of (target URI, predicate IRI, distance in metres)
+        """
+        i = self.node_index(uri)
+        if i is None:
+            return []
+        start, end = self.indptr[i], self.indptr[i + 1]
+        targets = self.indices[start:end]
+        preds = self.predicate[start:end]
+        distances = self.distance_m[start:end]
+        if predicate is not None:
+            code = np.nonzero(self.predicates == predicate)[0]
+            if len(code) == 0:
+                return []
+            mask = preds == code[0]
+            targets, preds, distances = targets[mask], preds[mask], distances[mask]
+        return [(str(self.nodes[t]), str(self.predicates[p]), float(d))
+                for t, p, d in zip(targets, preds, distances)]
+
+    def out_degree(self) -> np.ndarray:
+        """Number of outgoing links per node."""
+        return np.diff(self.indptr)
+
+    def top_hubs(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Nodes with the most outgoing links."""
+        degree = self.out_degree()
+        order = np.argsort(-degree, kind='stable')[:n]
+        return [(str(self.nodes[i]), int(degree[i])) for i in order]
+
+    def edges(self) -> Dict[str, np.ndarray]:
+        """Flat edge list (source, target, categories, predicate, distance_m)."""
+        src = np.repeat(np.arange(len(self.nodes)), self.out_degree())
+        return {
+            'source': self.nodes[src],
+            'target': self.nodes[self.indices],
+            'source_category': self.categories[self.node_category[src]],
+            'target_category': self.categories[self.node_category[self.indices]],
+            'predicate': self.predicates[self.predicate],
+            'distance_m': self.distance_m,
+        }
+
+    def to_parquet(self, path) -> bool:
+        """
+        Write the edge list as Parquet.
+
+        pyarrow is optional; without it nothing is written.
+
+        Returns:
+            True if the file was written
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return False
+        edges = self.edges()
+        table = pa.table({
+            name: pa.array(values.tolist() if values.dtype.kind == 'U' else values)
+            for name, values in edges.items()
+        })
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, str(path), compression='zstd')
+        return True
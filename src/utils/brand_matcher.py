@@ -0,0 +1,188 @@
+"""
+@File    : brand_matcher.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Default location of the brand knowledge base (config/brand_knowledge_base.json)
+DEFAULT_KB_PATH = Path(__file__).resolve().parents[2] / "config" / "brand_knowledge_base.json"
+
+
+def normalize_brand(text: str) -> str:
+    """
+    Normalize a brand string for matching: lowercase, accent-stripped, single spaces.
+
+    Args:
+        text: Brand or operator string
+
+    Returns:
+        Normalized key
+    """
+    text = text.replace('Đ', 'D').replace('đ', 'd')
+    decomposed = unicodedata.normalize('NFD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.lower().split())
+
+
+def load_brand_knowledge_base(path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the brand knowledge base from a JSON file.
+
+    Args:
+        path: JSON file mapping brand name -> enrichment fields
+            (defaults to config/brand_knowledge_base.json)
+
+    Returns:
+        Knowledge base dictionary, in file order
+    """
+    with open(path or DEFAULT_KB_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class BrandMatcher:
+    """
+    Indexed brand lookup over the knowledge base.
+
+    A brand matches a knowledge-base entry when their normalized forms are
+    equal, or when one contains the other. Equality is a dict lookup,
+    "entry contained in brand" runs an Aho-Corasick automaton over the brand,
+    and "brand contained in entry" is a lookup in a table of all substrings
+    of the (short) entry keys. When several entries match, the first one in
+    knowledge-base order wins, as with the original linear scan. Results are
+    memoized per distinct input string.
+    """
+
+    def __init__(self, knowledge_base: Dict[str, Dict[str, Any]]):
+        """
+        Build the indexes.
+
+        Args:
+            knowledge_base: Brand name -> enrichment fields
+        """
+        self.knowledge_base = knowledge_base
+        self.brands: List[str] = list(knowledge_base)
+        self._memo: Dict[str, Optional[int]] = {}
+
+        # Normalized key -> first entry index
+        self._exact: Dict[str, int] = {}
+        # Every substring of a normalized key -> first entry index containing it
+        self._substrings: Dict[str, int] = {}
+        for order, brand in enumerate(self.brands):
+            key = normalize_brand(brand)
+            if not key:
+                continue
+            self._exact.setdefault(key, order)
+            for start in range(len(key)):
+                for end in range(start + 1, len(key) + 1):
+                    self._substrings.setdefault(key[start:end], order)
+
+        self._build_automaton()
+
+    @classmethod
+    def from_file(cls, path: Optional[Path] = None) -> 'BrandMatcher':
+        """Create a matcher from a knowledge-base JSON file."""
+        return cls(load_brand_knowledge_base(path))
+
+    def _build_automaton(self):
+        """Build the Aho-Corasick goto/fail tables over the normalized keys."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Smallest entry index whose key ends at this state (including via fail links)
+        self._best: List[Optional[int]] = [None]
+
+        for key, order in self._exact.items():
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = nxt
+            if self._best[state] is None or order < self._best[state]:
+                self._best[state] = order
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                inherited = self._best[self._fail[nxt]]
+                current = self._best[nxt]
+                if inherited is not None and (current is None or inherited < current):
+                    self._best[nxt] = inherited
+
+    def _first_contained(self, text: str) -> Optional[int]:
+        """Smallest entry index whose key occurs in text."""
+        best = None
+        state = 0
+        for ch in text:
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            found = self._best[state]
+            if found is not None and (best is None or found < best):
+                best = found
+        return best
+
+    def _lookup(self, brand: str) -> Optional[int]:
+        key = normalize_brand(brand)
+        if not key:
+            return None
+        if key in self._exact:
+            return self._exact[key]
+        candidates = [
+            order for order in (self._first_contained(key), self._substrings.get(key))
+            if order is not None
+        ]
+        return min(candidates) if candidates else None
+
+    def match(self, brand: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Find the knowledge-base entry for a brand/operator string.
+
+        Args:
+            brand: Brand or operator tag value
+
+        Returns:
+            (knowledge-base brand name, entry) or None
+        """
+        if brand not in self._memo:
+            self._memo[brand] = self._lookup(brand)
+        order = self._memo[brand]
+        if order is None:
+            return None
+        kb_brand = self.brands[order]
+        return kb_brand, self.knowledge_base[kb_brand]
@@ -0,0 +1,406 @@
+"""
+@File    : geo_index.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from geopy.distance import geodesic
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Relative error allowed for the equirectangular projection before the exact
+# geodesic decides. Across a city-sized area the projection (spherical Earth,
+# one reference latitude) is off by well under 1%, so a candidate whose
+# projected distance is more than 1% beyond the k-th best cannot win.
+REFINE_TOLERANCE = 0.01
+
+LEAF_SIZE = 16
+
+
+class KDTree:
+    """
+    Static 2-d tree over projected points, queried for many points at once.
+
+    Nodes are stored in flat lists (split dimension, split value, children,
+    leaf slice) and queries walk the tree with whole groups of query points,
+    so the per-point work at each leaf is a NumPy distance computation.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        """
+        Build the tree.
+
+        Args:
+            points: (n, 2) array of projected coordinates
+            leaf_size: Maximum points per leaf
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = max(1, leaf_size)
+        self.order = np.arange(len(self.points))
+        self.split_dim: List[int] = []
+        self.split_value: List[float] = []
+        self.children: List[Tuple[int, int]] = []
+        self.leaf_range: List[Tuple[int, int]] = []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self.sorted_points = self.points[self.order]
+
+    def _new_node(self) -> int:
+        self.split_dim.append(-1)
+        self.split_value.append(0.0)
+        self.children.append((-1, -1))
+        self.leaf_range.append((0, 0))
+        return len(self.split_dim) - 1
+
+    def _build(self, start: int, end: int) -> int:
+        node = self._new_node()
+        if end - start <= self.leaf_size:
+            self.leaf_range[node] = (start, end)
+            return node
+        idx = self.order[start:end]
+        spread = self.points[idx].max(axis=0) - self.points[idx].min(axis=0)
+        dim = int(np.argmax(spread))
+        mid = (end - start) // 2
+        part = np.argpartition(self.points[idx, dim], mid)
+        self.order[start:end] = idx[part]
+        self.split_dim[node] = dim
+        self.split_value[node] = float(self.points[self.order[start + mid], dim])
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, end)
+        self.children[node] = (left, right)
+        return node
+
+    def _walk(self, queries: np.ndarray, bound: np.ndarray, visit_leaf):
+        """
+        Depth-first walk for all queries, near side first.
+
+        Args:
+            queries: (m, 2) query points
+            bound: (m,) current squared search radius per query; read again
+                before each subtree, so visit_leaf may shrink it
+            visit_leaf: Callback (query indices, start, end) for each leaf reached
+        """
+        stack = [(0, np.arange(len(queries)), np.zeros(len(queries)))]
+        while stack:
+            node, idx, lower = stack.pop()
+            keep = lower <= bound[idx]
+            if not keep.all():
+                idx = idx[keep]
+            if len(idx) == 0:
+                continue
+            dim = self.split_dim[node]
+            if dim < 0:
+                start, end = self.leaf_range[node]
+                visit_leaf(idx, start, end)
+                continue
+            diff = queries[idx, dim] - self.split_value[node]
+            far_lower = diff * diff
+            left, right = self.children[node]
+            go_left = diff < 0
+            # Far sides first so the near sides are popped (and tighten bounds) first
+            stack.append((right, idx[go_left], far_lower[go_left]))
+            stack.append((left, idx[~go_left], far_lower[~go_left]))
+            stack.append((right, idx[~go_left], np.zeros(int((~go_left).sum()))))
+            stack.append((left, idx[go_left], np.zeros(int(go_left.sum()))))
+
+    def query(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest points for every query point.
+
+        Args:
+            queries: (m, 2) query points
+            k: Number of neighbours (capped at the number of points)
+
+        Returns:
+            (distances, indices), both (m, k), sorted by distance
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        k = min(k, len(self.points))
+        best_d = np.full((len(queries), k), np.inf)
+        best_i = np.full((len(queries), k), -1, dtype=np.int64)
+        bound = np.full(len(queries), np.inf)
+
+        def visit_leaf(idx, start, end):
+            leaf = self.sorted_points[start:end]
+            d = ((queries[idx, None, :] - leaf[None, :, :]) ** 2).sum(axis=2)
+            all_d = np.concatenate([best_d[idx], d], axis=1)
+            leaf_ids = np.broadcast_to(self.order[start:end], d.shape)
+            all_i = np.concatenate([best_i[idx], leaf_ids], axis=1)
+            top = np.argsort(all_d, axis=1, kind='stable')[:, :k]
+            best_d[idx] = np.take_along_axis(all_d, top, axis=1)
+            best_i[idx] = np.take_along_axis(all_i, top, axis=1)
+            bound[idx] = best_d[idx, -1]
+
+        if k > 0 and len(queries):
+            self._walk(queries, bound, visit_leaf)
+        return np.sqrt(best_d), best_i
+
+    def query_radius(self, queries: np.ndarray,
+                     radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All (query, point) pairs within a radius.
+
+        Args:
+            queries: (m, 2) query points
+            radius: Search radius in projected units
+
+        Returns:
+            (query indices, point indices, distances) as flat arrays
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        bound = np.full(len(queries), radius * radius)
+        found_q, found_p, found_d = [], [], []
+
+        def visit_leaf(idx, start, end):
+            leaf = self.sorted_points[start:end]
+            d = ((queries[idx, None, :] - leaf[None, :, :]) ** 2).sum(axis=2)
+            rows, cols = np.nonzero(d <= bound[idx, None])
+            found_q.append(idx[rows])
+            found_p.append(self.order[start + cols])
+            found_d.append(np.sqrt(d[rows, cols]))
+
+        if len(queries) and len(self.points):
+            self._walk(queries, bound, visit_leaf)
+        if not found_q:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(found_q), np.concatenate(found_p), np.concatenate(found_d)
+
+
+class STRIndex:
+    """
+    Static R-tree with a single level of Sort-Tile-Recursive packed leaves.
+
+    Points are sorted into vertical slices by x and each slice into leaves
+    by y, so every leaf is a compact box of at most ``leaf_size`` points. A
+    query tests all leaf boxes in one NumPy operation and then only looks at
+    the points of the leaves it hits, which keeps single-point lookups (the
+    common case for an online service) free of per-node Python work.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 64):
+        """
+        Pack the points.
+
+        Args:
+            points: (n, 2) array of projected coordinates
+            leaf_size: Maximum points per leaf
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(self.points)
+        leaf_size = max(1, leaf_size)
+        n_leaves = max(1, math.ceil(n / leaf_size))
+        n_slices = max(1, math.ceil(math.sqrt(n_leaves)))
+        slice_size = n_slices * leaf_size
+
+        by_x = np.argsort(self.points[:, 0], kind='stable')
+        order = []
+        for s in range(0, n, slice_size):
+            part = by_x[s:s + slice_size]
+            part = part[np.argsort(self.points[part, 1], kind='stable')]
+            for start in range(0, len(part), leaf_size):
+                order.append(part[start:start + leaf_size])
+        self.order = np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+        self.sorted_points = self.points[self.order]
+        self.leaf_start = np.array([0] + np.cumsum([len(o) for o in order]).tolist(),
+                                   dtype=np.int64)
+        self.box_min = np.array([self.points[o].min(axis=0) for o in order]).reshape(-1, 2)
+        self.box_max = np.array([self.points[o].max(axis=0) for o in order]).reshape(-1, 2)
+
+    def _leaf_points(self, leaves: np.ndarray) -> np.ndarray:
+        """Positions (into sorted_points) of all points in the given leaves."""
+        if len(leaves) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(self.leaf_start[leaf], self.leaf_start[leaf + 1])
+                               for leaf in leaves.tolist()])
+
+    def _box_distance(self, x: float, y: float) -> np.ndarray:
+        """Distance from a point to every leaf box (0 inside)."""
+        dx = np.maximum(np.maximum(self.box_min[:, 0] - x, x - self.box_max[:, 0]), 0.0)
+        dy = np.maximum(np.maximum(self.box_min[:, 1] - y, y - self.box_max[:, 1]), 0.0)
+        return np.hypot(dx, dy)
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """
+        Indices of all points inside a box (boundaries included).
+
+        Returns:
+            Point indices in packing order
+        """
+        hit = np.flatnonzero((self.box_min[:, 0] <= max_x) & (self.box_max[:, 0] >= min_x)
+                             & (self.box_min[:, 1] <= max_y) & (self.box_max[:, 1] >= min_y))
+        pos = self._leaf_points(hit)
+        p = self.sorted_points[pos]
+        inside = (p[:, 0] >= min_x) & (p[:, 0] <= max_x) & (p[:, 1] >= min_y) & (p[:, 1] <= max_y)
+        return self.order[pos[inside]]
+
+    def query_radius(self, x: float, y: float, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All points within a radius of one query point.
+
+        Returns:
+            (point indices, distances), unsorted
+        """
+        if len(self.points) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        pos = self._leaf_points(np.flatnonzero(self._box_distance(x, y) <= radius))
+        d = np.hypot(self.sorted_points[pos, 0] - x, self.sorted_points[pos, 1] - y)
+        keep = d <= radius
+        return self.order[pos[keep]], d[keep]
+
+    def query(self, x: float, y: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest points of one query point.
+
+        Leaves are visited in order of box distance until they hold k points;
+        the k-th distance among those bounds the final radius search.
+
+        Returns:
+            (point indices, distances), nearest first
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        box_d = self._box_distance(x, y)
+        by_distance = np.argsort(box_d, kind='stable')
+        sizes = np.diff(self.leaf_start)[by_distance]
+        first = int(np.searchsorted(np.cumsum(sizes), k)) + 1
+        pos = self._leaf_points(by_distance[:first])
+        d = np.hypot(self.sorted_points[pos, 0] - x, self.sorted_points[pos, 1] - y)
+        bound = float(np.partition(d, k - 1)[k - 1])
+        idx, d = self.query_radius(x, y, bound)
+        top = np.lexsort((idx, d))[:k]
+        return idx[top], d[top]
+
+
+class StationIndex:
+    """
+    Nearest-station lookups for POIs.
+
+    Stations are projected with an equirectangular projection centred on their
+    mean latitude and indexed in a :class:`KDTree`. Queries take all POIs at
+    once; the projected search only selects candidates, and distances are then
+    recomputed with geopy's ``geodesic`` for those candidates alone.
+    """
+
+    def __init__(self, stations: Sequence[Dict]):
+        """
+        Build the index.
+
+        Args:
+            stations: Station dictionaries with 'id', 'lat' and 'lon'
+        """
+        if not stations:
+            raise ValueError("StationIndex needs at least one station")
+        self.stations = list(stations)
+        self.ids = [station["id"] for station in self.stations]
+        self.lat = np.array([station["lat"] for station in self.stations], dtype=np.float64)
+        self.lon = np.array([station["lon"] for station in self.stations], dtype=np.float64)
+        self.ref_lat = float(self.lat.mean())
+        self.tree = KDTree(self.project(self.lat, self.lon))
+
+    def project(self, lat, lon) -> np.ndarray:
+        """
+        Equirectangular projection to kilometres.
+
+        Args:
+            lat: Latitudes in degrees
+            lon: Longitudes in degrees
+
+        Returns:
+            (n, 2) array of (x, y) in km
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        scale = math.radians(1.0) * EARTH_RADIUS_KM
+        return np.column_stack([lon * scale * math.cos(math.radians(self.ref_lat)), lat * scale])
+
+    def _geodesic(self, poi_lat: np.ndarray, poi_lon: np.ndarray,
+                  poi_idx: np.ndarray, station_idx: np.ndarray) -> np.ndarray:
+        return np.array([
+            geodesic((poi_lat[p], poi_lon[p]), (self.lat[s], self.lon[s])).kilometers
+            for p, s in zip(poi_idx.tolist(), station_idx.tolist())
+        ])
+
+    def nearest(self, poi_lat, poi_lon, k: int = 1,
+                tolerance: float = REFINE_TOLERANCE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest stations for every POI by geodesic distance.
+
+        Args:
+            poi_lat: (n,) POI latitudes
+            poi_lon: (n,) POI longitudes
+            k: Stations per POI (capped at the number of stations)
+            tolerance: Relative projection error covered by the refinement
+
+        Returns:
+            (station indices, distances in km), both (n, k), nearest first
+        """
+        poi_lat = np.asarray(poi_lat, dtype=np.float64)
+        poi_lon = np.asarray(poi_lon, dtype=np.float64)
+        k = min(k, len(self.stations))
+        if len(poi_lat) == 0:
+            return np.empty((0, k), dtype=np.int64), np.empty((0, k))
+
+        # A few extra candidates so a station just beyond the k-th can still win
+        n_candidates = min(len(self.stations), k + 2)
+        proj_d, cand = self.tree.query(self.project(poi_lat, poi_lon), n_candidates)
+
+        # Only candidates within tolerance of the k-th projected distance need the exact solve
+        limit = proj_d[:, k - 1:k] * (1 + tolerance) + 1e-9
+        refine = proj_d <= limit
+        exact = np.full(proj_d.shape, np.inf)
+        rows, cols = np.nonzero(refine)
+        exact[rows, cols] = self._geodesic(poi_lat, poi_lon, rows, cand[rows, cols])
+
+        top = np.argsort(exact, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(cand, top, axis=1), np.take_along_axis(exact, top, axis=1)
+
+    def within(self, poi_lat, poi_lon, radius_km: float,
+               tolerance: float = REFINE_TOLERANCE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every (POI, station) pair closer than radius_km by geodesic distance.
+
+        Args:
+            poi_lat: (n,) POI latitudes
+            poi_lon: (n,) POI longitudes
+            radius_km: Coverage radius in km
+            tolerance: Relative projection error covered by the refinement
+
+        Returns:
+            (POI indices, station indices, distances in km), sorted by POI then distance
+        """
+        poi_lat = np.asarray(poi_lat, dtype=np.float64)
+        poi_lon = np.asarray(poi_lon, dtype=np.float64)
+        poi_idx, station_idx, _ = self.tree.query_radius(
+            self.project(poi_lat, poi_lon), radius_km * (1 + tolerance))
+        exact = self._geodesic(poi_lat, poi_lon, poi_idx, station_idx)
+        keep = exact <= radius_km
+        poi_idx, station_idx, exact = poi_idx[keep], station_idx[keep], exact[keep]
+        order = np.lexsort((exact, poi_idx))
+        return poi_idx[order], station_idx[order], exact[order]
+
+    def station_id(self, index: int) -> str:
+        return self.ids[index]
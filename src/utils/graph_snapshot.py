@@ -0,0 +1,233 @@
+"""
+@File    : graph_snapshot.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+from triple_store import TermDictionary, TripleStore, parse_encoded
+
+SNAPSHOT_FORMAT = 1
+
+# Snapshots live in this directory next to the parsed files by default
+SNAPSHOT_DIR = ".snapshots"
+
+TERM_URI, TERM_BNODE, TERM_LITERAL = 0, 1, 2
+
+
+def file_digest(path) -> str:
+    """SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path(rdf_file, snapshot_dir=None) -> Path:
+    """Snapshot file of an RDF file (<dir>/.snapshots/<name>.npz by default)."""
+    rdf_file = Path(rdf_file)
+    directory = Path(snapshot_dir) if snapshot_dir else rdf_file.parent / SNAPSHOT_DIR
+    return directory / f"{rdf_file.name}.npz"
+
+
+def encode_terms(terms: List[Node]) -> Dict[str, np.ndarray]:
+    """
+    Pack RDF terms into flat arrays.
+
+    Lexical values are concatenated into one UTF-8 buffer with character
+    offsets; language tags and datatypes go to a small table referenced by
+    index (0 = none).
+
+    Returns:
+        Dictionary of arrays: term_kind, term_text, term_offsets, term_tag, tags
+    """
+    kinds = np.empty(len(terms), dtype=np.int8)
+    tag_ids = np.zeros(len(terms), dtype=np.int32)
+    tags: Dict[str, int] = {'': 0}
+    values = []
+    for index, term in enumerate(terms):
+        if isinstance(term, Literal):
+            kinds[index] = TERM_LITERAL
+            if term.language:
+                tag = f"@{term.language}"
+            elif term.datatype:
+                tag = f"^^{term.datatype}"
+            else:
+                tag = ''
+            tag_ids[index] = tags.setdefault(tag, len(tags))
+        elif isinstance(term, BNode):
+            kinds[index] = TERM_BNODE
+        else:
+            kinds[index] = TERM_URI
+        values.append(str(term))
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    text = np.frombuffer(''.join(values).encode('utf-8'), dtype=np.uint8)
+    return {
+        'term_kind': kinds,
+        'term_text': text,
+        'term_offsets': offsets,
+        'term_tag': tag_ids,
+        'tags': np.array(list(tags), dtype=str),
+    }
+
+
+def decode_terms(arrays) -> List[Node]:
+    """Rebuild the RDF terms packed by encode_terms."""
+    text = arrays['term_text'].tobytes().decode('utf-8')
+    offsets = arrays['term_offsets'].tolist()
+    tags = arrays['tags'].tolist()
+    datatypes = {tag: URIRef(tag[2:]) for tag in tags if tag.startswith('^^')}
+    terms = []
+    append = terms.append
+    kinds, tag_ids = arrays['term_kind'].tolist(), arrays['term_tag'].tolist()
+    for index, (kind, tag_id) in enumerate(zip(kinds, tag_ids)):
+        value = text[offsets[index]:offsets[index + 1]]
+        if kind == TERM_URI:
+            append(URIRef(value))
+        elif kind == TERM_BNODE:
+            append(BNode(value))
+        else:
+            tag = tags[tag_id]
+            if tag.startswith('@'):
+                append(Literal(value, lang=tag[1:]))
+            elif tag:
+                append(Literal(value, datatype=datatypes[tag]))
+            else:
+                append(Literal(value))
+    return terms
+
+
+def save_snapshot(path, digest: str, terms: List[Node], rows: np.ndarray, prefixes: Dict[str, str]):
+    """
+    Write a snapshot atomically (a concurrent reader never sees a partial file).
+
+    Args:
+        path: Snapshot file
+        digest: SHA-1 of the source file
+        terms: Term table
+        rows: (n, 3) array of (s, p, o) term ids
+        prefixes: Namespace bindings of the source file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name, suffix='.tmp', dir=str(path.parent))
+    try:
+        bindings = [f"{prefix}\t{namespace}" for prefix, namespace in prefixes.items()]
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, format=np.array(SNAPSHOT_FORMAT), digest=np.array(digest), rows=rows,
+                     prefixes=np.array(bindings, dtype=str), **encode_terms(terms))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def load_snapshot(path, digest: str) -> Optional[Tuple[List[Node], np.ndarray, Dict[str, str]]]:
+    """
+    Read a snapshot if it exists and was taken from a file with this digest.
+
+    Returns:
+        (terms, rows, prefixes), or None if the snapshot is missing, stale or unreadable
+    """
+    try:
+        with np.load(path) as data:
+            if int(data['format']) != SNAPSHOT_FORMAT or str(data['digest']) != digest:
+                return None
+            prefixes = dict(line.split('\t', 1) for line in data['prefixes'].tolist())
+            return decode_terms(data), data['rows'], prefixes
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def load_encoded(rdf_file, snapshot_dir=None,
+                 format: str = "turtle") -> Tuple[List[Node], np.ndarray, Dict[str, str]]:
+    """
+    Terms and encoded triples of an RDF file, from its snapshot when fresh.
+
+    On a miss the file is parsed and the snapshot is (re)written; failing to
+    write it (read-only directory, ...) is not an error.
+
+    Args:
+        rdf_file: RDF file
+        snapshot_dir: Snapshot directory (default: .snapshots next to the file;
+            '' disables snapshots)
+        format: rdflib parser name
+
+    Returns:
+        (terms, (n, 3) int32 rows of term ids, prefix -> namespace bindings)
+    """
+    if snapshot_dir == '':
+        terms, rows, prefixes = parse_encoded(rdf_file, format)
+        return terms.terms, rows, prefixes
+
+    digest = file_digest(rdf_file)
+    path = snapshot_path(rdf_file, snapshot_dir)
+    cached = load_snapshot(path, digest)
+    if cached is not None:
+        return cached
+
+    terms, rows, prefixes = parse_encoded(rdf_file, format)
+    try:
+        save_snapshot(path, digest, terms.terms, rows, prefixes)
+    except OSError:
+        pass
+    return terms.terms, rows, prefixes
+
+
+def load_graph(rdf_file, snapshot_dir=None, format: str = "turtle",
+               graph: Optional[Graph] = None) -> Graph:
+    """
+    Drop-in replacement for ``Graph().parse(rdf_file)`` backed by a snapshot.
+
+    Args:
+        rdf_file: RDF file
+        snapshot_dir: Snapshot directory (see load_encoded)
+        format: rdflib parser name
+        graph: Graph to add the triples to (a new Graph if omitted)
+
+    Returns:
+        Graph with the triples and namespace bindings of the file
+    """
+    terms, rows, prefixes = load_encoded(rdf_file, snapshot_dir, format)
+    g = Graph() if graph is None else graph
+    for prefix, namespace in prefixes.items():
+        g.bind(prefix, namespace)
+    g.addN((terms[s], terms[p], terms[o], g) for s, p, o in rows.tolist())
+    return g
+
+
+def load_triple_store(rdf_file, snapshot_dir=None, format: str = "turtle") -> TripleStore:
+    """TripleStore of an RDF file, built from its snapshot when fresh."""
+    terms, rows, _ = load_encoded(rdf_file, snapshot_dir, format)
+    return TripleStore(TermDictionary.from_terms(terms), rows)
@@ -0,0 +1,276 @@
+"""
+@File    : name_index.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from brand_matcher import normalize_brand
+from poi_index import haversine_m
+
+INDEX_FORMAT = 1
+
+# Arrays of a persisted index, one .npy file each (loaded memory-mapped)
+INDEX_ARRAYS = ('keys', 'indptr', 'postings', 'doc_poi', 'doc_size',
+                'uri', 'category', 'name_vi', 'name_en', 'lat', 'lon')
+
+NON_WORD_RE = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(text: str) -> str:
+    """
+    Search form of a name: accent-stripped, lowercase, words of letters and digits.
+
+    "Bệnh viện Bạch Mai" and "benh vien  bach-mai" both become "benh vien bach mai".
+    """
+    return ' '.join(NON_WORD_RE.sub(' ', normalize_brand(text or '')).split())
+
+
+def trigrams(text: str) -> List[str]:
+    """
+    Distinct trigrams of a normalized string.
+
+    Every word is padded with two leading spaces and one trailing space, so
+    short words and word starts still produce trigrams.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+class NameIndex:
+    """
+    Trigram inverted index over the bilingual names of all POIs.
+
+    Each distinct normalized name of a POI is one document. Postings are kept
+    as compact CSR arrays (sorted trigram keys, offsets, int32 document ids),
+    so a query is a binary search per trigram plus one ``bincount``; results
+    are ranked by trigram similarity (shared / union, as in pg_trgm) and
+    optionally by distance to a point.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Args:
+            arrays: Index arrays keyed by INDEX_ARRAYS (see from_records and load)
+        """
+        self.arrays = arrays
+        self.keys = arrays['keys']
+        self.indptr = arrays['indptr']
+        self.postings = arrays['postings']
+        self.doc_poi = arrays['doc_poi']
+        self.doc_size = arrays['doc_size']
+
+    @classmethod
+    def from_records(cls, records: Dict[str, np.ndarray]) -> 'NameIndex':
+        """
+        Build the index.
+
+        Args:
+            records: POI arrays with 'uri', 'category', 'name_vi', 'name_en', 'lat'
+                and 'lon' (see poi_index.load_poi_records)
+
+        Returns:
+            NameIndex
+        """
+        doc_poi, doc_size, doc_grams = [], [], []
+        for row, names in enumerate(zip(records['name_vi'].tolist(), records['name_en'].tolist())):
+            for name in dict.fromkeys(normalize_name(name) for name in names):
+                grams = trigrams(name)
+                if grams:
+                    doc_poi.append(row)
+                    doc_size.append(len(grams))
+                    doc_grams.append(grams)
+
+        keys = np.array(sorted({gram for grams in doc_grams for gram in grams}), dtype='<U3')
+        key_ids = {key: i for i, key in enumerate(keys.tolist())}
+        gram_ids = np.array([key_ids[gram] for grams in doc_grams for gram in grams],
+                            dtype=np.int64)
+        docs = np.repeat(np.arange(len(doc_grams), dtype=np.int32), doc_size)
+        order = np.lexsort((docs, gram_ids))
+        counts = np.bincount(gram_ids, minlength=len(keys))
+
+        arrays = {
+            'keys': keys,
+            'indptr': np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            'postings': docs[order],
+            'doc_poi': np.array(doc_poi, dtype=np.int32),
+            'doc_size': np.array(doc_size, dtype=np.int16),
+        }
+        for column in ('uri', 'category', 'name_vi', 'name_en'):
+            arrays[column] = np.asarray(records[column]).astype(str)
+        for column in ('lat', 'lon'):
+            arrays[column] = np.asarray(records[column], dtype=np.float64)
+        return cls(arrays)
+
+    def save(self, directory):
+        """Write the index as one .npy file per array plus meta.json."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in INDEX_ARRAYS:
+            np.save(directory / f"{name}.npy", self.arrays[name])
+        with open(directory / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump({'format': INDEX_FORMAT, 'pois': len(self.arrays['uri']),
+                       'documents': len(self.doc_poi), 'trigrams': len(self.keys)}, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> 'NameIndex':
+        """
+        Open a saved index; arrays are memory-mapped unless mmap is False.
+
+        Raises:
+            ValueError: If the directory holds an index of another format
+        """
+        directory = Path(directory)
+        with open(directory / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != INDEX_FORMAT:
+            raise ValueError(f"Unsupported name index format: {meta.get('format')}")
+        mode = 'r' if mmap else None
+        return cls({name: np.load(directory / f"{name}.npy", mmap_mode=mode)
+                    for name in INDEX_ARRAYS})
+
+    def __len__(self) -> int:
+        return len(self.arrays['uri'])
+
+    def search(self, query: str, limit: int = 10, min_similarity: float = 0.3,
+               near: Optional[Tuple[float, float]] = None, proximity_weight: float = 0.3,
+               proximity_scale_m: float = 2000.0,
+               categories: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Find POIs whose name is similar to a query, in either language.
+
+        Args:
+            query: Free text, with or without accents
+            limit: Maximum number of results
+            min_similarity: Trigram similarity threshold (0-1)
+            near: Optional (lat, lon); closer POIs rank higher
+            proximity_weight: Share of the score given to proximity when near is set
+            proximity_scale_m: Distance at which the proximity score falls to 1/e
+            categories: Only these categories
+
+        Returns:
+            Result dictionaries (uri, category, name_vi, name_en, lat, lon,
+            similarity, score and distance_m when near is set), best first
+        """
+        grams = trigrams(normalize_name(query))
+        if not grams or len(self.keys) == 0:
+            return []
+        query_keys = np.array(grams, dtype='<U3')
+        slots = np.searchsorted(self.keys, query_keys)
+        found = slots < len(self.keys)
+        found[found] = self.keys[slots[found]] == query_keys[found]
+        slots = slots[found]
+        if len(slots) == 0:
+            return []
+        hits = np.concatenate([self.postings[self.indptr[s]:self.indptr[s + 1]]
+                               for s in slots.tolist()])
+        counts = np.bincount(hits, minlength=len(self.doc_size))
+        docs = np.flatnonzero(counts)
+        shared = counts[docs]
+        similarity = shared / (len(grams) + self.doc_size[docs].astype(np.float64) - shared)
+
+        # Best document per POI
+        pois = self.doc_poi[docs]
+        order = np.lexsort((-similarity, pois))
+        pois, similarity = pois[order], similarity[order]
+        first = np.concatenate([[True], pois[1:] != pois[:-1]])
+        pois, similarity = pois[first], similarity[first]
+
+        keep = similarity >= min_similarity
+        if categories:
+            keep &= np.isin(self.arrays['category'][pois], list(categories))
+        pois, similarity = pois[keep], similarity[keep]
+
+        score = similarity
+        distances = None
+        if near is not None and len(pois):
+            distances = haversine_m(near[0], near[1],
+                                    self.arrays['lat'][pois], self.arrays['lon'][pois])
+            proximity = np.exp(-distances / proximity_scale_m)
+            score = (1 - proximity_weight) * similarity + proximity_weight * proximity
+
+        top = np.lexsort((pois, -score))[:limit]
+        results = []
+        for i in top.tolist():
+            row = int(pois[i])
+            result = {
+                'uri': str(self.arrays['uri'][row]),
+                'category': str(self.arrays['category'][row]),
+                'name_vi': str(self.arrays['name_vi'][row]),
+                'name_en': str(self.arrays['name_en'][row]),
+                'lat': float(self.arrays['lat'][row]),
+                'lon': float(self.arrays['lon'][row]),
+                'similarity': round(float(similarity[i]), 3),
+                'score': round(float(score[i]), 3),
+            }
+            if distances is not None:
+                result['distance_m'] = round(float(distances[i]), 1)
+            results.append(result)
+        return results
+
+
+def main():
+    """Build a name index from cleaned TTLs, or search a saved one."""
+    parser = argparse.ArgumentParser(
+        description="Accent-insensitive trigram name search over all POIs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build the index from POI .ttl files")
+    build.add_argument("data_dir", help="Directory with POI .ttl files (e.g. datav2/cleaned)")
+    build.add_argument("index_dir", help="Output directory of the index")
+
+    search = commands.add_parser("search", help="Search a saved index")
+    search.add_argument("index_dir")
+    search.add_argument("query")
+    search.add_argument("--near", nargs=2, type=float, metavar=("LAT", "LON"),
+                        help="Rank nearby POIs higher")
+    search.add_argument("--category", action="append", help="Restrict to a category (repeatable)")
+    search.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from poi_index import load_poi_records
+        index = NameIndex.from_records(load_poi_records(args.data_dir))
+        index.save(args.index_dir)
+        print(f"✓ Indexed {len(index.doc_poi):,} names of {len(index):,} POIs "
+              f"({len(index.keys):,} trigrams) → {args.index_dir}")
+        return
+
+    index = NameIndex.load(args.index_dir)
+    for result in index.search(args.query, args.limit, near=args.near, categories=args.category):
+        distance = f"  {result['distance_m']:>8.0f} m" if 'distance_m' in result else ""
+        print(f"{result['score']:.3f}  {result['category']:<16} "
+              f"{result['name_vi']} / {result['name_en']}{distance}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+@File    : pipeline_runner.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class Target:
+    """
+    One buildable artifact (or group of artifacts) in the pipeline.
+
+    A target is rebuilt when one of its outputs is missing, or when the content
+    of an input file, a code file or its arguments changed since the last
+    successful build.
+    """
+
+    def __init__(self, name: str, outputs: Iterable[str], action: Callable[..., Any],
+                 args: Tuple = (), inputs: Iterable[str] = (), code: Iterable[str] = (),
+                 resource: Optional[str] = None, adopt_existing: bool = False):
+        """
+        Args:
+            name: Unique target name (e.g. "clean:cafe")
+            outputs: Files written by the action
+            action: Module-level function that builds the outputs
+            args: Positional arguments for the action
+            inputs: Files read by the action
+            code: Source files whose changes invalidate the outputs
+            resource: Name of a shared external service (e.g. "overpass");
+                at most one target per resource runs at a time
+            adopt_existing: Treat outputs that already exist but were never
+                built by the runner as up to date (for data downloaded from
+                external services that cannot be rebuilt for free)
+        """
+        self.name = name
+        self.outputs = [str(p) for p in outputs]
+        self.action = action
+        self.args = tuple(args)
+        self.inputs = [str(p) for p in inputs]
+        self.code = [str(p) for p in code]
+        self.resource = resource
+        self.adopt_existing = adopt_existing
+
+    def __repr__(self) -> str:
+        return f"Target({self.name!r})"
+
+
+class PipelineRunner:
+    """
+    Make-style runner: builds targets in dependency order, skipping up-to-date ones.
+
+    Dependencies are derived from file paths: a target depends on every target
+    that produces one of its inputs. Fingerprints (SHA-1 of file contents) are
+    kept in a JSON state file; file hashes are reused while the file size and
+    modification time are unchanged, so an up-to-date run reads no data.
+    Independent targets run in parallel in a process (or thread) pool.
+    """
+
+    def __init__(self, targets: List[Target], state_file: str, max_workers: int = 4,
+                 use_processes: bool = True):
+        """
+        Args:
+            targets: All pipeline targets
+            state_file: JSON file holding fingerprints of the last successful builds
+            max_workers: Maximum number of targets running at once
+            use_processes: Run actions in worker processes (CPU-bound RDF work)
+                instead of threads
+        """
+        self.targets: Dict[str, Target] = {}
+        self.producers: Dict[str, str] = {}
+        for target in targets:
+            if target.name in self.targets:
+                raise ValueError(f"Duplicate target: {target.name}")
+            self.targets[target.name] = target
+            for output in target.outputs:
+                key = os.path.normpath(output)
+                if key in self.producers:
+                    raise ValueError(f"{output} is produced by both {self.producers[key]} "
+                                     f"and {target.name}")
+                self.producers[key] = target.name
+
+        self.state_file = state_file
+        self.max_workers = max(1, max_workers)
+        self.use_processes = use_processes
+        self.state = self._load_state()
+
+    # ------------------------------------------------------------------
+    # State and fingerprints
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Any]:
+        state = {'files': {}, 'targets': {}}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state.update(json.load(f))
+            except Exception as e:
+                print(f"Warning: Could not load pipeline state {self.state_file}: {e}")
+        return state
+
+    def _save_state(self):
+        state_dir = os.path.dirname(self.state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_file)
+
+    def file_hash(self, path: str) -> Optional[str]:
+        """
+        Content hash of a file, or None if it does not exist.
+
+        Args:
+            path: File path
+
+        Returns:
+            Hex SHA-1 digest
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        key = os.path.normpath(path)
+        cached = self.state['files'].get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha1']
+
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.state['files'][key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': digest.hexdigest()
+        }
+        return digest.hexdigest()
+
+    def fingerprint(self, target: Target) -> Dict[str, Any]:
+        """Current fingerprint of a target's inputs, code and arguments."""
+        code_digest = hashlib.sha1()
+        for path in sorted(target.code):
+            code_digest.update(f"{path}:{self.file_hash(path)}\n".encode('utf-8'))
+        return {
+            'inputs': {path: self.file_hash(path) for path in sorted(target.inputs)},
+            'code': code_digest.hexdigest(),
+            'args': repr(target.args)
+        }
+
+    def stale_reason(self, target: Target) -> Optional[str]:
+        """
+        Explain why a target must be rebuilt.
+
+        Returns:
+            Reason string, or None if the target is up to date
+        """
+        missing = [path for path in target.outputs if not os.path.exists(path)]
+        if missing:
+            return f"missing output {missing[0]}"
+
+        recorded = self.state['targets'].get(target.name)
+        if recorded is None:
+            return None if target.adopt_existing else "never built"
+
+        current = self.fingerprint(target)
+        if current['code'] != recorded.get('code'):
+            return "code changed"
+        if current['args'] != recorded.get('args'):
+            return "arguments changed"
+        for path, digest in current['inputs'].items():
+            if recorded.get('inputs', {}).get(path) != digest:
+                return f"input changed {path}"
+        return None
+
+    # ------------------------------------------------------------------
+    # Graph
+    # ------------------------------------------------------------------
+
+    def dependencies(self, target: Target) -> Set[str]:
+        """Names of the targets producing this target's inputs."""
+        deps = set()
+        for path in target.inputs:
+            producer = self.producers.get(os.path.normpath(path))
+            if producer is not None and producer != target.name:
+                deps.add(producer)
+        return deps
+
+    def select(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Resolve requested targets plus everything upstream, in dependency order.
+
+        Args:
+            names: Target names or prefixes ending in ':' (e.g. "clean:");
+                all targets if omitted
+
+        Returns:
+            Topologically ordered target names
+        """
+        if not names:
+            wanted = list(self.targets)
+        else:
+            wanted = []
+            for name in names:
+                if name in self.targets:
+                    wanted.append(name)
+                else:
+                    matches = [t for t in self.targets if t.startswith(name)]
+                    if not matches:
+                        raise KeyError(f"Unknown target: {name}")
+                    wanted.extend(matches)
+
+        order: List[str] = []
+        visiting: Set[str] = set()
+        done: Set[str] = set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle at {name}")
+            visiting.add(name)
+            for dep in sorted(self.dependencies(self.targets[name])):
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in wanted:
+            visit(name)
+        return order
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def plan(self, names: Optional[Iterable[str]] = None,
+             force: bool = False) -> List[Tuple[str, str]]:
+        """
+        List the targets a run would rebuild, without running anything.
+
+        Targets downstream of a rebuilt target are listed as "upstream rebuilt",
+        since their inputs may change.
+
+        Returns:
+            (target name, reason) pairs in build order
+        """
+        planned = []
+        rebuilt: Set[str] = set()
+        for name in self.select(names):
+            target = self.targets[name]
+            reason = "forced" if force else self.stale_reason(target)
+            if reason is None and self.dependencies(target) & rebuilt:
+                reason = "upstream rebuilt"
+            if reason is not None:
+                rebuilt.add(name)
+                planned.append((name, reason))
+        return planned
+
+    def _record_success(self, target: Target):
+        self.state['targets'][target.name] = self.fingerprint(target)
+        for path in target.outputs:
+            self.file_hash(path)
+        self._save_state()
+
+    def run(self, names: Optional[Iterable[str]] = None,
+            force: bool = False) -> Dict[str, List[str]]:
+        """
+        Build the requested targets (and their upstream) that are out of date.
+
+        A target is checked for staleness only after all its dependencies have
+        finished, so a rebuild that produces identical output does not cascade.
+
+        Args:
+            names: Target names or prefixes (all targets if omitted)
+            force: Rebuild every selected target
+
+        Returns:
+            Dictionary with 'built', 'skipped', 'failed' and 'blocked' target names
+        """
+        order = self.select(names)
+        pending = {name: self.dependencies(self.targets[name]) & set(order) for name in order}
+        result = {'built': [], 'skipped': [], 'failed': [], 'blocked': []}
+        finished: Set[str] = set()
+        failed: Set[str] = set()
+        busy_resources: Set[str] = set()
+        running: Dict[Any, str] = {}
+
+        pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=self.max_workers) as pool:
+            while pending or running:
+                # Start every ready target whose resource is free
+                for name in list(pending):
+                    deps = pending[name]
+                    if deps & failed:
+                        del pending[name]
+                        failed.add(name)
+                        result['blocked'].append(name)
+                        print(f"[pipeline] ✗ {name}: blocked by failed dependency")
+                        continue
+                    if not deps <= finished or len(running) >= self.max_workers:
+                        continue
+
+                    target = self.targets[name]
+                    reason = "forced" if force else self.stale_reason(target)
+                    if reason is None:
+                        del pending[name]
+                        finished.add(name)
+                        result['skipped'].append(name)
+                        if name not in self.state['targets']:
+                            self._record_success(target)
+                        continue
+                    if target.resource is not None and target.resource in busy_resources:
+                        continue
+
+                    missing = [p for p in target.inputs
+                               if not os.path.exists(p)
+                               and os.path.normpath(p) not in self.producers]
+                    if missing:
+                        del pending[name]
+                        failed.add(name)
+                        result['failed'].append(name)
+                        print(f"[pipeline] ✗ {name}: missing input {missing[0]}")
+                        continue
+
+                    del pending[name]
+                    if target.resource is not None:
+                        busy_resources.add(target.resource)
+                    print(f"[pipeline] ▶ {name} ({reason})")
+                    future = pool.submit(target.action, *target.args)
+                    future.start_time = time.time()
+                    running[future] = name
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    target = self.targets[name]
+                    if target.resource is not None:
+                        busy_resources.discard(target.resource)
+                    elapsed = time.time() - future.start_time
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed.add(name)
+                        result['failed'].append(name)
+                        print(f"[pipeline] ✗ {name} failed after {elapsed:.1f}s: {e}")
+                        continue
+                    self._record_success(target)
+                    finished.add(name)
+                    result['built'].append(name)
+                    print(f"[pipeline] ✓ {name} ({elapsed:.1f}s)")
+
+        self._save_state()
+        return result
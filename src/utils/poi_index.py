@@ -0,0 +1,310 @@
+"""
+@File    : poi_index.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from rdflib import Literal, Namespace
+
+from geo_index import EARTH_RADIUS_KM, REFINE_TOLERANCE, STRIndex
+from graph_snapshot import load_graph
+from poi_loader import find_poi_files, poi_file_category
+
+GEO = Namespace("http://www.opengis.net/ont/geosparql#")
+SCHEMA = Namespace("http://schema.org/")
+
+EARTH_RADIUS_M = EARTH_RADIUS_KM * 1000.0
+
+# Columns of a POI record set; all are NumPy arrays of equal length
+RECORD_COLUMNS = ('uri', 'category', 'name_vi', 'name_en', 'lat', 'lon')
+TEXT_COLUMNS = ('uri', 'category', 'name_vi', 'name_en')
+
+CACHE_FILE = ".poi_index.npz"
+
+
+def parse_poi_records(ttl_file) -> Dict[str, List]:
+    """
+    Points and bilingual names of every entity with a WKT point in one file.
+
+    Args:
+        ttl_file: Turtle file path
+
+    Returns:
+        Dictionary of lists keyed by RECORD_COLUMNS (category is filled by the caller)
+    """
+    g = load_graph(ttl_file)
+    records = {column: [] for column in RECORD_COLUMNS if column != 'category'}
+    for subject, wkt in g.subject_objects(GEO.asWKT):
+        try:
+            lon, lat = map(float, str(wkt).split("POINT(")[1].split(")")[0].split())
+        except (IndexError, ValueError):
+            continue
+        names = {'vi': '', 'en': ''}
+        for name in g.objects(subject, SCHEMA.name):
+            if isinstance(name, Literal) and name.language in names and not names[name.language]:
+                names[name.language] = str(name)
+        records['uri'].append(str(subject))
+        records['name_vi'].append(names['vi'])
+        records['name_en'].append(names['en'])
+        records['lat'].append(lat)
+        records['lon'].append(lon)
+    return records
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_poi_records(data_dir, cache_file: Optional[str] = None,
+                     workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Load POI points, categories and names, from the binary cache when it is fresh.
+
+    The cache (an .npz next to the data by default) records the SHA-1 of
+    every source file; if any file was added, removed or changed, the TTL
+    files are parsed again (in parallel) and the cache is rewritten.
+
+    Args:
+        data_dir: Directory with POI .ttl files (e.g. datav2/cleaned)
+        cache_file: Cache path (default: <data_dir>/.poi_index.npz; '' disables the cache)
+        workers: Processes used for parsing (default: CPU count)
+
+    Returns:
+        Dictionary of arrays keyed by RECORD_COLUMNS
+    """
+    files = find_poi_files(data_dir)
+    sources = np.array([f"{path.name}:{_file_digest(path)}" for path in files], dtype=str)
+    if cache_file is None:
+        cache_file = str(Path(data_dir) / CACHE_FILE)
+
+    if cache_file and Path(cache_file).exists():
+        try:
+            with np.load(cache_file) as cached:
+                if np.array_equal(cached['sources'], sources):
+                    return {column: cached[column] for column in RECORD_COLUMNS}
+        except (OSError, KeyError, ValueError):
+            pass
+
+    workers = min(len(files), workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_poi_records, files))
+    else:
+        results = [parse_poi_records(path) for path in files]
+
+    columns = {column: [] for column in RECORD_COLUMNS}
+    for path, result in zip(files, results):
+        for column, values in result.items():
+            columns[column].extend(values)
+        columns['category'].extend([poi_file_category(path)] * len(result['uri']))
+    records = {column: np.array(columns[column], dtype=str) for column in TEXT_COLUMNS}
+    records['lat'] = np.array(columns['lat'], dtype=np.float64)
+    records['lon'] = np.array(columns['lon'], dtype=np.float64)
+
+    if cache_file:
+        np.savez(cache_file, sources=sources, **records)
+    return records
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized great-circle distance in meters."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0))) * EARTH_RADIUS_M
+
+
+class POIIndex:
+    """
+    In-memory radius, bounding-box and nearest-neighbour search over POIs.
+
+    Points are projected to meters (equirectangular, centred on the mean
+    latitude) and packed into one :class:`geo_index.STRIndex` for all POIs
+    plus one per category, so category-filtered queries only touch the
+    indexes of those categories. The projected search selects candidates
+    with a small tolerance; results are ranked by exact haversine distance.
+    """
+
+    def __init__(self, records: Dict[str, np.ndarray], tolerance: float = REFINE_TOLERANCE):
+        """
+        Build the index.
+
+        Args:
+            records: Arrays keyed by RECORD_COLUMNS (see load_poi_records)
+            tolerance: Relative projection error covered by the refinement
+        """
+        self.records = records
+        self.tolerance = tolerance
+        self.lat = np.asarray(records['lat'], dtype=np.float64)
+        self.lon = np.asarray(records['lon'], dtype=np.float64)
+        self.ref_lat = float(self.lat.mean()) if len(self.lat) else 21.0
+        points = self.project(self.lat, self.lon)
+        self.tree = STRIndex(points)
+        self.category_index: Dict[str, Tuple[STRIndex, np.ndarray]] = {}
+        categories = np.asarray(records['category'])
+        for category in np.unique(categories).tolist():
+            members = np.flatnonzero(categories == category)
+            self.category_index[category] = (STRIndex(points[members]), members)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def project(self, lat, lon) -> np.ndarray:
+        """Equirectangular projection to meters; (n, 2) array of (x, y)."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        scale = math.radians(1.0) * EARTH_RADIUS_M
+        x = lon * scale * math.cos(math.radians(self.ref_lat))
+        return np.column_stack([x, lat * scale]).reshape(-1, 2)
+
+    def categories(self) -> Dict[str, int]:
+        """Number of POIs per category."""
+        return {category: len(members) for category, (_, members) in self.category_index.items()}
+
+    def _trees(self,
+               categories: Optional[Iterable[str]]) -> List[Tuple[STRIndex, Optional[np.ndarray]]]:
+        if not categories:
+            return [(self.tree, None)]
+        return [self.category_index[c] for c in sorted(set(categories)) if c in self.category_index]
+
+    def _within(self, lat: float, lon: float, radius_m: float,
+                categories: Optional[Iterable[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and exact distances of all POIs within radius_m (unsorted)."""
+        x, y = self.project(lat, lon)[0]
+        found = []
+        for tree, members in self._trees(categories):
+            idx, _ = tree.query_radius(x, y, radius_m * (1 + self.tolerance))
+            found.append(idx if members is None else members[idx])
+        idx = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        distances = haversine_m(lat, lon, self.lat[idx], self.lon[idx])
+        keep = distances <= radius_m
+        return idx[keep], distances[keep]
+
+    def _results(self, idx: np.ndarray, distances: Optional[np.ndarray] = None,
+                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        if distances is not None:
+            order = np.lexsort((idx, distances))
+            idx, distances = idx[order], distances[order]
+        if limit is not None:
+            idx = idx[:limit]
+        results = []
+        for position, i in enumerate(idx.tolist()):
+            result = {
+                'uri': str(self.records['uri'][i]),
+                'category': str(self.records['category'][i]),
+                'name_vi': str(self.records['name_vi'][i]),
+                'name_en': str(self.records['name_en'][i]),
+                'lat': float(self.lat[i]),
+                'lon': float(self.lon[i]),
+            }
+            if distances is not None:
+                result['distance_m'] = round(float(distances[position]), 1)
+            results.append(result)
+        return results
+
+    def radius(self, lat: float, lon: float, radius_m: float,
+               categories: Optional[Iterable[str]] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        POIs within radius_m of a point, nearest first.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            radius_m: Radius in meters
+            categories: Only these categories (None: all)
+            limit: Maximum number of results
+
+        Returns:
+            Result dictionaries (uri, category, name_vi, name_en, lat, lon, distance_m)
+        """
+        idx, distances = self._within(lat, lon, radius_m, categories)
+        return self._results(idx, distances, limit)
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+             categories: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        POIs inside a bounding box, in index order.
+
+        Returns:
+            Result dictionaries (without distance_m)
+        """
+        # The projection is linear in latitude and longitude, so the box maps to a box
+        (min_x, min_y), (max_x, max_y) = self.project([min_lat, max_lat], [min_lon, max_lon])
+        found = []
+        for tree, members in self._trees(categories):
+            idx = tree.query_box(min_x, min_y, max_x, max_y)
+            found.append(idx if members is None else members[idx])
+        idx = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return self._results(np.sort(idx), None, limit)
+
+    def nearest(self, lat: float, lon: float, k: int = 10,
+                categories: Optional[Iterable[str]] = None,
+                max_distance_m: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        k nearest POIs of a point by haversine distance.
+
+        The projected k-th neighbour bounds a radius search (widened by the
+        tolerance), so no POI that is nearer on the sphere than in the
+        projection is missed.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            k: Number of results
+            categories: Only these categories (None: all)
+            max_distance_m: Ignore POIs farther than this
+
+        Returns:
+            Result dictionaries with distance_m, nearest first
+        """
+        trees = self._trees(categories)
+        if k <= 0 or not trees:
+            return []
+        x, y = self.project(lat, lon)[0]
+        # The k-th neighbour of any single index with k points bounds the overall k-th
+        bounds, farthest = [], 0.0
+        for tree, _ in trees:
+            _, distances = tree.query(x, y, k)
+            if len(distances) == k:
+                bounds.append(float(distances[-1]))
+            elif len(distances):
+                farthest = max(farthest, float(distances[-1]))
+        bound = min(bounds) if bounds else farthest
+        radius_m = bound * (1 + self.tolerance) + 1e-6
+        if max_distance_m is not None:
+            radius_m = min(radius_m, max_distance_m)
+        idx, distances = self._within(lat, lon, radius_m, categories)
+        return self._results(idx, distances, k)
@@ -0,0 +1,207 @@
+"""
+@File    : poi_loader.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from rdflib import Graph, Namespace
+
+GEO = Namespace("http://www.opengis.net/ont/geosparql#")
+
+# data_hanoi_<category>.ttl, N_data_hanoi_<category>_cleaned.ttl, ..._cleanedv2.ttl
+POI_FILE_RE = re.compile(r'^(?:\d+_)?data_hanoi_(?P<category>.+?)(?:_cleaned(?:v2)?)?\.ttl$')
+
+# Files that follow the naming pattern but hold no POIs
+NON_POI_CATEGORIES = {'topology', 'duplicates'}
+
+PREFIX_RE = re.compile(r'^\s*@?prefix\s+([A-Za-z][\w.-]*)?:\s*<([^>]*)>', re.IGNORECASE)
+SUBJECT_RE = re.compile(r'^(<[^>]*>|[A-Za-z][\w.-]*:[^\s;,]*)')
+WKT_RE = re.compile(
+    r'(<[^>]*>|[A-Za-z][\w.-]*:asWKT|:asWKT)\s+'
+    r'"\s*POINT\s*\(\s*([-+0-9.eE]+)\s+([-+0-9.eE]+)\s*\)\s*"'
+)
+
+
+def poi_file_category(path) -> Optional[str]:
+    """
+    Category of a POI data file, from its name.
+
+    Args:
+        path: File path or name
+
+    Returns:
+        Category (e.g. 'atm'), or None if the file is not a POI data file
+    """
+    match = POI_FILE_RE.match(Path(path).name)
+    if not match or match.group('category') in NON_POI_CATEGORIES:
+        return None
+    return match.group('category')
+
+
+def find_poi_files(data_dir, categories: Optional[Iterable[str]] = None) -> List[Path]:
+    """
+    POI data files in a directory, optionally restricted to some categories.
+
+    Topology, IoT and other non-POI outputs in the same directory are skipped.
+
+    Args:
+        data_dir: Directory with .ttl files
+        categories: Categories to keep (None keeps all)
+
+    Returns:
+        Sorted list of file paths
+    """
+    wanted = set(categories) if categories is not None else None
+    files = []
+    for path in sorted(Path(data_dir).glob("*.ttl")):
+        category = poi_file_category(path)
+        if category is None or (wanted is not None and category not in wanted):
+            continue
+        files.append(path)
+    return files
+
+
+def _expand(token: str, prefixes: Dict[str, str]) -> Optional[str]:
+    if token.startswith('<'):
+        return token[1:-1]
+    prefix, _, local = token.partition(':')
+    namespace = prefixes.get(prefix)
+    return None if namespace is None else namespace + local
+
+
+def scan_wkt_points(ttl_file) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Read (subject, point) pairs from a Turtle file without building a graph.
+
+    Lines are scanned for ``geo:asWKT "POINT(lon lat)"`` objects and paired
+    with the subject that opened the current statement. This covers the
+    layout written by the fetcher and by rdflib's serializer; if the scan
+    misses any asWKT line the file is parsed with rdflib instead.
+
+    Args:
+        ttl_file: Turtle file path
+
+    Returns:
+        (subject IRIs, latitudes, longitudes)
+    """
+    asWKT = str(GEO.asWKT)
+    prefixes: Dict[str, str] = {}
+    subjects: List[str] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    subject = None
+    wkt_lines = 0
+
+    with open(ttl_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line or line[0] in ' \t\n#':
+                pass
+            elif line[0] == '@' or line[:6].upper() == 'PREFIX':
+                match = PREFIX_RE.match(line)
+                if match:
+                    prefixes[match.group(1) or ''] = match.group(2)
+                continue
+            else:
+                match = SUBJECT_RE.match(line)
+                subject = _expand(match.group(1), prefixes) if match else None
+
+            if 'asWKT' not in line:
+                continue
+            wkt_lines += 1
+            match = WKT_RE.search(line)
+            if match is None or subject is None or _expand(match.group(1), prefixes) != asWKT:
+                continue
+            try:
+                lon, lat = float(match.group(2)), float(match.group(3))
+            except ValueError:
+                continue
+            subjects.append(subject)
+            lats.append(lat)
+            lons.append(lon)
+
+    if len(subjects) != wkt_lines:
+        return _parse_wkt_points(ttl_file)
+    return subjects, np.array(lats, dtype=np.float64), np.array(lons, dtype=np.float64)
+
+
+def _parse_wkt_points(ttl_file) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Fallback for layouts the line scanner does not understand."""
+    g = Graph()
+    g.parse(str(ttl_file), format="turtle")
+    subjects, lats, lons = [], [], []
+    for subject, wkt in g.subject_objects(GEO.asWKT):
+        try:
+            coords = str(wkt).replace("POINT(", "").replace(")", "").strip()
+            lon_str, lat_str = coords.split()
+            lats.append(float(lat_str))
+            lons.append(float(lon_str))
+            subjects.append(str(subject))
+        except ValueError:
+            continue
+    return subjects, np.array(lats, dtype=np.float64), np.array(lons, dtype=np.float64)
+
+
+def load_poi_arrays(data_dir, categories: Optional[Iterable[str]] = None,
+                    workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Load every POI point in a directory into NumPy arrays.
+
+    Files are scanned in parallel (one task per file) and concatenated in
+    file-name order, so the result does not depend on the worker count.
+
+    Args:
+        data_dir: Directory with POI .ttl files
+        categories: Only load these categories (None loads all)
+        workers: Processes to use (default: CPU count; 1 scans in-process)
+
+    Returns:
+        Dictionary with 'uri' (object array of IRIs), 'lat', 'lon' (float64)
+        and 'category' (object array)
+    """
+    files = find_poi_files(data_dir, categories)
+    workers = min(len(files), workers or os.cpu_count() or 1)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(scan_wkt_points, files))
+    else:
+        results = [scan_wkt_points(path) for path in files]
+
+    uris: List[str] = []
+    category_column: List[str] = []
+    for path, (subjects, _, _) in zip(files, results):
+        uris.extend(subjects)
+        category_column.extend([poi_file_category(path)] * len(subjects))
+
+    return {
+        'uri': np.array(uris, dtype=object),
+        'lat': np.concatenate([r[1] for r in results]) if results else np.empty(0),
+        'lon': np.concatenate([r[2] for r in results]) if results else np.empty(0),
+        'category': np.array(category_column, dtype=object),
+    }
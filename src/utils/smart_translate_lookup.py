@@ -23,32 +23,48 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 import re
-import json
 import os
-import time
+import threading
 import requests
-from typing import Optional, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterable, List, Tuple
 import unicodedata
+from rate_limiter import TokenBucket
+from translation_cache import TranslationCache
 
 class SmartTranslator:
     """
     Intelligent translator using Wikidata API with caching and pattern-based fallback.
     """
     
-    def __init__(self, cache_file: str = "translation_cache.json"):
+    def __init__(self, cache_file: str = "translation_cache.json", cache_batch_size: int = 100,
+                 requests_per_second: float = 1.0):
         """
         Initialize the translator with cache support.
         
         Args:
-            cache_file: Path to JSON cache file
+            cache_file: Path to the cache database. A legacy ``.json`` path is
+                migrated once into a SQLite file next to it (``.db`` suffix).
+            cache_batch_size: Number of new translations committed per batch
+            requests_per_second: Wikidata request budget shared by all workers
         """
+        self.legacy_cache_file = None
+        if cache_file.endswith('.json'):
+            self.legacy_cache_file = cache_file
+            cache_file = os.path.splitext(cache_file)[0] + '.db'
         self.cache_file = cache_file
+        self.cache_batch_size = cache_batch_size
         self.cache = self._load_cache()
         self.api_call_count = 0
         self.cache_hit_count = 0
+        self._stats_lock = threading.Lock()
         
-        # Wikidata API endpoint
+        # Wikidata API endpoint and shared rate limit
         self.wikidata_api = "https://www.wikidata.org/w/api.php"
+        self.rate_limiter = TokenBucket(rate=requests_per_second)
+        
+        # wbgetentities accepts at most 50 IDs per request
+        self.label_batch_size = 50
         
         # Generic prefixes to remove (often found in OSM but not official names)
         self.prefixes_to_remove = [
@@ -136,24 +152,35 @@ class SmartTranslator:
             'Chợ Đồng Xuân': 'Dong Xuan Market',
         }
     
-    def _load_cache(self) -> Dict[str, str]:
-        """Load translation cache from JSON file."""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load cache: {e}")
-                return {}
-        return {}
+    def _load_cache(self) -> TranslationCache:
+        """Open the translation cache database (importing the legacy JSON cache if needed)."""
+        return TranslationCache(
+            self.cache_file,
+            batch_size=self.cache_batch_size,
+            legacy_json=self.legacy_cache_file
+        )
     
-    def _save_cache(self):
-        """Save translation cache to JSON file."""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Warning: Could not save cache: {e}")
+    def _save_cache(self, vi_name: str, en_name: str, source: str):
+        """Queue a translation for the next batched cache commit."""
+        self.cache.put(vi_name, en_name, source)
+    
+    def flush_cache(self):
+        """Commit pending translations to the cache database."""
+        self.cache.flush()
+    
+    def open(self):
+        """Reopen the translation cache after close(); a no-op if it is open."""
+        self.cache.open()
+    
+    def close(self):
+        """Flush and compact the translation cache."""
+        self.cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def _normalize_vietnamese_name(self, name: str) -> str:
         """
@@ -181,66 +208,98 @@ class SmartTranslator:
         
         return name.strip()
     
-    def _search_wikidata(self, vi_name: str) -> Optional[str]:
+    def _wikidata_get(self, params: Dict[str, str]) -> Dict:
         """
-        Search Wikidata for English translation.
+        Perform one rate-limited Wikidata API request.
+        
+        Args:
+            params: Query parameters
+            
+        Returns:
+            Decoded JSON response
+        """
+        self.rate_limiter.acquire()
+        response = requests.get(self.wikidata_api, params=params, timeout=10)
+        response.raise_for_status()
+        with self._stats_lock:
+            self.api_call_count += 1
+        return response.json()
+    
+    def _search_wikidata_id(self, vi_name: str) -> Optional[str]:
+        """
+        Find the most relevant Wikidata entity ID for a Vietnamese name.
         
         Args:
             vi_name: Vietnamese name to search
             
         Returns:
-            English name if found, None otherwise
+            Entity ID (e.g. 'Q1003180') if found, None otherwise
         """
         try:
-            # Wikidata search parameters
-            params = {
+            data = self._wikidata_get({
                 'action': 'wbsearchentities',
                 'format': 'json',
                 'language': 'vi',
                 'search': vi_name,
                 'limit': 5
-            }
+            })
             
-            # Rate limiting: max 1 request per second
-            time.sleep(1)
-            
-            response = requests.get(self.wikidata_api, params=params, timeout=10)
-            response.raise_for_status()
+            # Get the first result (most relevant)
+            if 'search' in data and len(data['search']) > 0:
+                return data['search'][0]['id']
+            return None
             
-            data = response.json()
-            self.api_call_count += 1
+        except Exception as e:
+            print(f"  Wikidata search failed for '{vi_name}': {e}")
+            return None
+    
+    def _fetch_english_labels(self, entity_ids: List[str]) -> Dict[str, str]:
+        """
+        Fetch English labels for Wikidata entities in batches of 50 IDs.
+        
+        Args:
+            entity_ids: Wikidata entity IDs
             
-            # Check if we have results
-            if 'search' in data and len(data['search']) > 0:
-                # Get the first result (most relevant)
-                entity_id = data['search'][0]['id']
-                
-                # Fetch entity details to get English label
-                entity_params = {
+        Returns:
+            Dictionary mapping entity ID to English label
+        """
+        labels = {}
+        unique_ids = list(dict.fromkeys(entity_ids))
+        
+        for start in range(0, len(unique_ids), self.label_batch_size):
+            chunk = unique_ids[start:start + self.label_batch_size]
+            try:
+                entity_data = self._wikidata_get({
                     'action': 'wbgetentities',
                     'format': 'json',
-                    'ids': entity_id,
+                    'ids': '|'.join(chunk),
                     'props': 'labels',
                     'languages': 'en'
-                }
-                
-                time.sleep(1)
-                entity_response = requests.get(self.wikidata_api, params=entity_params, timeout=10)
-                entity_response.raise_for_status()
-                
-                entity_data = entity_response.json()
-                
-                # Extract English label
-                if 'entities' in entity_data and entity_id in entity_data['entities']:
-                    entity = entity_data['entities'][entity_id]
-                    if 'labels' in entity and 'en' in entity['labels']:
-                        return entity['labels']['en']['value']
+                })
+            except Exception as e:
+                print(f"  Wikidata label fetch failed for {len(chunk)} entities: {e}")
+                continue
             
-            return None
+            for entity_id, entity in entity_data.get('entities', {}).items():
+                if 'labels' in entity and 'en' in entity['labels']:
+                    labels[entity_id] = entity['labels']['en']['value']
+        
+        return labels
+    
+    def _search_wikidata(self, vi_name: str) -> Optional[str]:
+        """
+        Search Wikidata for English translation.
+        
+        Args:
+            vi_name: Vietnamese name to search
             
-        except Exception as e:
-            print(f"  Wikidata search failed for '{vi_name}': {e}")
+        Returns:
+            English name if found, None otherwise
+        """
+        entity_id = self._search_wikidata_id(vi_name)
+        if not entity_id:
             return None
+        return self._fetch_english_labels([entity_id]).get(entity_id)
     
     def _pattern_based_translation(self, vi_name: str) -> Optional[str]:
         """
@@ -312,14 +371,10 @@ class SmartTranslator:
         
         original_name = vi_name.strip()
         
-        # Strategy 1: Check special cases
-        if original_name in self.special_cases:
-            return (self.special_cases[original_name], 'special')
-        
-        # Strategy 2: Check cache
-        if original_name in self.cache:
-            self.cache_hit_count += 1
-            return (self.cache[original_name], 'cache')
+        # Strategies 1-2: Check special cases, then cache
+        known = self.lookup_known(original_name)
+        if known is not None:
+            return known
         
         # Strategy 3: Normalize name
         normalized_name = self._normalize_vietnamese_name(original_name)
@@ -328,24 +383,117 @@ class SmartTranslator:
         wikidata_result = self._search_wikidata(normalized_name)
         if wikidata_result:
             # Cache the result
-            self.cache[original_name] = wikidata_result
-            self._save_cache()
+            self._save_cache(original_name, wikidata_result, 'wikidata')
             return (wikidata_result, 'wikidata')
         
+        return self._offline_translation(original_name, normalized_name)
+    
+    def lookup_known(self, vi_name: str) -> Optional[Tuple[str, str]]:
+        """
+        Resolve a name from the special cases or the cache only (no network, no new cache entries).
+        
+        Args:
+            vi_name: Vietnamese name
+            
+        Returns:
+            Tuple of (english_name, source) with source 'special' or 'cache', or None
+        """
+        original_name = (vi_name or '').strip()
+        if not original_name:
+            return None
+        if original_name in self.special_cases:
+            return (self.special_cases[original_name], 'special')
+        cached = self.cache.get(original_name)
+        if cached is not None:
+            self.cache_hit_count += 1
+            return (cached, 'cache')
+        return None
+    
+    def _offline_translation(self, original_name: str, normalized_name: str) -> Tuple[str, str]:
+        """
+        Apply strategies 5 and 6 (pattern, then transliteration) and cache the result.
+        
+        Args:
+            original_name: Name as found in the data (cache key)
+            normalized_name: Normalized Vietnamese name
+            
+        Returns:
+            Tuple of (english_name, source)
+        """
         # Strategy 5: Pattern-based translation
         pattern_result = self._pattern_based_translation(normalized_name)
         if pattern_result:
             # Cache the result
-            self.cache[original_name] = pattern_result
-            self._save_cache()
+            self._save_cache(original_name, pattern_result, 'pattern')
             return (pattern_result, 'pattern')
         
         # Strategy 6: Fallback to transliteration
         transliterated = self._transliterate_vietnamese(normalized_name)
-        self.cache[original_name] = transliterated
-        self._save_cache()
+        self._save_cache(original_name, transliterated, 'transliterate')
         return (transliterated, 'transliterate')
     
+    def translate_batch(self, vi_names: Iterable[str],
+                        max_workers: int = 4) -> Dict[str, Tuple[str, str]]:
+        """
+        Translate many Vietnamese names with deduplicated, concurrent Wikidata lookups.
+        
+        Special cases and cached names are resolved locally. The remaining
+        normalized names are searched through a bounded worker pool that shares
+        this translator's token bucket, and English labels for all hits are then
+        fetched with one ``wbgetentities`` call per 50 IDs.
+        
+        Args:
+            vi_names: Vietnamese names (duplicates and empty names are ignored)
+            max_workers: Number of concurrent search workers
+            
+        Returns:
+            Dictionary mapping each stripped name to (english_name, source)
+        """
+        results = {}
+        pending = {}
+        
+        for vi_name in vi_names:
+            if not vi_name:
+                continue
+            original_name = vi_name.strip()
+            if not original_name or original_name in results or original_name in pending:
+                continue
+            
+            if original_name in self.special_cases:
+                results[original_name] = (self.special_cases[original_name], 'special')
+                continue
+            
+            cached = self.cache.get(original_name)
+            if cached is not None:
+                self.cache_hit_count += 1
+                results[original_name] = (cached, 'cache')
+                continue
+            
+            pending[original_name] = self._normalize_vietnamese_name(original_name)
+        
+        if not pending:
+            return results
+        
+        # Search each distinct normalized name once
+        search_terms = list(dict.fromkeys(pending.values()))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            found = executor.map(self._search_wikidata_id, search_terms)
+            entity_ids = dict(zip(search_terms, found))
+        
+        labels = self._fetch_english_labels([eid for eid in entity_ids.values() if eid])
+        
+        for original_name, normalized_name in pending.items():
+            entity_id = entity_ids.get(normalized_name)
+            label = labels.get(entity_id) if entity_id else None
+            if label:
+                self._save_cache(original_name, label, 'wikidata')
+                results[original_name] = (label, 'wikidata')
+            else:
+                results[original_name] = self._offline_translation(original_name, normalized_name)
+        
+        self.flush_cache()
+        return results
+    
     def get_stats(self) -> Dict[str, int]:
         """
         Get translation statistics.
@@ -406,6 +554,8 @@ def test_translator():
         print(f"   English: {english_name}")
         print(f"   Source: {source}")
     
+    translator.close()
+    
     print("\n" + "="*80)
     print("Translation Statistics:")
     stats = translator.get_stats()
@@ -0,0 +1,234 @@
+"""
+@File    : spatial_cells.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+DECODE = {char: index for index, char in enumerate(BASE32)}
+
+EARTH_RADIUS_M = 6371008.8
+
+# Geohash precisions attached to every POI. Around Hanoi a cell is roughly
+# 4.9 x 4.9 km at 5 characters, 1.2 x 0.6 km at 6 and 150 x 150 m at 7.
+CELL_PRECISIONS = (5, 6, 7)
+
+
+def cell_predicate(precision: int) -> str:
+    """Local name (under the ext: namespace) of the cell ID property for a precision."""
+    return f"geohash_{precision}"
+
+
+def encode(lat: float, lon: float, precision: int = max(CELL_PRECISIONS)) -> str:
+    """
+    Geohash of a point.
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        precision: Number of base-32 characters
+
+    Returns:
+        Geohash string; each prefix is the cell of the point at that precision
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if lon >= mid:
+                value = value * 2 + 1
+                lon_range[0] = mid
+            else:
+                value *= 2
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                value = value * 2 + 1
+                lat_range[0] = mid
+            else:
+                value *= 2
+                lat_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_ids(lat: float, lon: float, precisions: Sequence[int] = CELL_PRECISIONS) -> Dict[int, str]:
+    """
+    Cell IDs of a point at several precisions.
+
+    Returns:
+        Dictionary precision -> geohash
+    """
+    full = encode(lat, lon, max(precisions))
+    return {precision: full[:precision] for precision in precisions}
+
+
+def decode_bbox(cell: str) -> Tuple[float, float, float, float]:
+    """
+    Bounding box of a geohash cell.
+
+    Returns:
+        (min_lat, min_lon, max_lat, max_lon)
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            target[1 - bit] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Height and width of a cell in degrees (latitude, longitude)."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def bbox_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+               precision: int) -> List[str]:
+    """
+    All cells at a precision that intersect a bounding box.
+
+    Returns:
+        Sorted list of geohashes
+    """
+    height, width = cell_size(precision)
+    cells = set()
+    row = math.floor((min_lat + 90.0) / height)
+    while row * height - 90.0 <= max_lat:
+        col = math.floor((min_lon + 180.0) / width)
+        while col * width - 180.0 <= max_lon:
+            center_lat = min(row * height - 90.0 + height / 2, 90.0)
+            center_lon = min(col * width - 180.0 + width / 2, 180.0)
+            cells.add(encode(center_lat, center_lon, precision))
+            col += 1
+        row += 1
+    return sorted(cells)
+
+
+def _distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * math.asin(math.sqrt(min(1.0, a))) * EARTH_RADIUS_M
+
+
+def circle_cells(lat: float, lon: float, radius_m: float, precision: int) -> List[str]:
+    """
+    Cells at a precision that intersect a circle.
+
+    Args:
+        lat: Latitude of the center
+        lon: Longitude of the center
+        radius_m: Radius in meters
+        precision: Geohash precision
+
+    Returns:
+        Sorted list of geohashes whose cell contains at least one point of the circle
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-12)
+    cells = []
+    for cell in bbox_cells(lat - dlat, lon - dlon, lat + dlat, lon + dlon, precision):
+        min_lat, min_lon, max_lat, max_lon = decode_bbox(cell)
+        # Nearest point of the cell to the center
+        near_lat = min(max(lat, min_lat), max_lat)
+        near_lon = min(max(lon, min_lon), max_lon)
+        if _distance_m(lat, lon, near_lat, near_lon) <= radius_m:
+            cells.append(cell)
+    return cells
+
+
+def covering_cells(lat: float, lon: float, radius_m: float,
+                   precisions: Sequence[int] = CELL_PRECISIONS,
+                   max_cells: int = 24) -> Tuple[int, List[str]]:
+    """
+    Cover a query circle with stored cell IDs.
+
+    The finest stored precision whose covering needs at most max_cells cells
+    is used (the coarsest one if none is small enough). Every POI inside the
+    circle carries one of the returned IDs, so a query can prefilter with
+    exact string matches before computing distances.
+
+    Args:
+        lat: Latitude of the center
+        lon: Longitude of the center
+        radius_m: Radius in meters
+        precisions: Precisions stored on the POIs
+        max_cells: Largest acceptable covering
+
+    Returns:
+        (precision, sorted geohashes)
+    """
+    ordered = sorted(precisions, reverse=True)
+    for precision in ordered:
+        cells = circle_cells(lat, lon, radius_m, precision)
+        if len(cells) <= max_cells:
+            return precision, cells
+    return ordered[-1], cells
+
+
+def sparql_cell_filter(lat: float, lon: float, radius_m: float, var: str = "?poi",
+                       precisions: Sequence[int] = CELL_PRECISIONS, max_cells: int = 24) -> str:
+    """
+    SPARQL graph pattern restricting var to the cells covering a circle.
+
+    Placed before the geo:asWKT / distance part of a query, it narrows the
+    candidates to a few cells with exact literal matches.
+
+    Returns:
+        Pattern using a VALUES block over the ext:geohash_<p> property
+        (requires the ext: prefix in the query)
+    """
+    precision, cells = covering_cells(lat, lon, radius_m, precisions, max_cells)
+    values = ' '.join(f'"{cell}"' for cell in cells)
+    return (f"VALUES ?cell {{ {values} }}\n"
+            f"{var} ext:{cell_predicate(precision)} ?cell .")
+
+
+def turtle_cell_lines(lat: float, lon: float, precisions: Iterable[int] = CELL_PRECISIONS) -> str:
+    """Turtle predicate-object lines (';'-terminated) with the cell IDs of a point."""
+    return ''.join(
+        f"    ext:{cell_predicate(precision)} \"{cell}\" ;\n"
+        for precision, cell in cell_ids(lat, lon, tuple(precisions)).items()
+    )
@@ -0,0 +1,261 @@
+"""
+@File    : translation_cache.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class TranslationCache:
+    """
+    SQLite-backed write-behind store for Vietnamese → English translations.
+
+    New entries are buffered in memory and committed in batches, so a run with
+    N cache misses costs N/batch_size small transactions instead of N full
+    rewrites of a JSON file. The database runs in WAL mode, which lets several
+    cleaner processes read and append to the same cache concurrently.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 100,
+                 legacy_json: Optional[str] = None, timeout: float = 30.0):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Number of pending entries that triggers a commit
+            legacy_json: Optional old-style JSON cache imported once when the
+                database is empty
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self._entries: Dict[str, str] = {}
+        self._pending: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.RLock()
+        self._timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.open()
+
+        if legacy_json:
+            self._import_legacy_json(legacy_json)
+            self._load()
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called since the database was last opened."""
+        return self._conn is None
+
+    def open(self):
+        """
+        Open the database connection; a no-op if it is already open.
+
+        A closed cache can be reopened with this method. Entries committed by
+        other processes in the meantime are picked up.
+        """
+        with self._lock:
+            if self._conn is not None:
+                return
+            self._conn = sqlite3.connect(self.db_path, timeout=self._timeout,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " vi_name TEXT PRIMARY KEY,"
+                " en_name TEXT NOT NULL,"
+                " source TEXT,"
+                " updated_at REAL)"
+            )
+            self._conn.commit()
+            self._load()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The open connection; raises if the cache has been closed."""
+        if self._conn is None:
+            raise RuntimeError(
+                f"Translation cache {self.db_path} is closed; call open() to reuse it")
+        return self._conn
+
+    def _import_legacy_json(self, json_path: str):
+        """Import an old translation_cache.json once, if the database is still empty."""
+        if not os.path.exists(json_path):
+            return
+
+        (row_count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        if row_count > 0:
+            return
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not import legacy cache {json_path}: {e}")
+            return
+
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO translations (vi_name, en_name, source, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(vi, en, 'legacy', now) for vi, en in legacy.items() if isinstance(en, str)]
+            )
+
+    def _load(self):
+        """Load all committed entries with a single table scan."""
+        rows = self._conn.execute("SELECT vi_name, en_name FROM translations")
+        self._entries = dict(rows)
+        self._entries.update((vi, en) for vi, (en, _) in self._pending.items())
+
+    def _lookup_db(self, vi_name: str) -> Optional[str]:
+        """Look up an entry committed by another process after startup."""
+        row = self._connection().execute(
+            "SELECT en_name FROM translations WHERE vi_name = ?", (vi_name,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._entries[vi_name] = row[0]
+        return row[0]
+
+    def get(self, vi_name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Get the cached English name for a Vietnamese name.
+
+        Args:
+            vi_name: Vietnamese name
+            default: Value returned when the name is not cached
+
+        Returns:
+            Cached English name or default
+
+        Raises:
+            RuntimeError: If the cache is closed
+        """
+        with self._lock:
+            self._connection()
+            if vi_name in self._entries:
+                return self._entries[vi_name]
+            found = self._lookup_db(vi_name)
+            return default if found is None else found
+
+    def put(self, vi_name: str, en_name: str, source: str = ''):
+        """
+        Store a translation; it is committed with the next batch.
+
+        Args:
+            vi_name: Vietnamese name
+            en_name: English name
+            source: Strategy that produced the translation (wikidata, pattern, ...)
+
+        Raises:
+            RuntimeError: If the cache is closed
+        """
+        with self._lock:
+            self._connection()
+            self._entries[vi_name] = en_name
+            self._pending[vi_name] = (en_name, source)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Commit all pending entries in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            now = time.time()
+            rows = [(vi, en, source, now) for vi, (en, source) in self._pending.items()]
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations (vi_name, en_name, source, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            self._pending.clear()
+
+    def close(self):
+        """
+        Flush pending entries and compact the write-ahead log into the database.
+
+        Closing twice is a no-op. Afterwards get() and put() raise until open()
+        is called again; len(), items() and export_json() keep working on the
+        entries already loaded.
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self.flush()
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print(f"Warning: Could not compact translation cache: {e}")
+            finally:
+                self._conn.close()
+                self._conn = None
+
+    def export_json(self, json_path: str):
+        """
+        Write the whole cache as JSON (for inspection or sharing).
+
+        Args:
+            json_path: Output JSON file path
+        """
+        with self._lock:
+            self.flush()
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over (vi_name, en_name) pairs known to this process."""
+        return iter(list(self._entries.items()))
+
+    def __contains__(self, vi_name: str) -> bool:
+        return self.get(vi_name) is not None
+
+    def __getitem__(self, vi_name: str) -> str:
+        value = self.get(vi_name)
+        if value is None:
+            raise KeyError(vi_name)
+        return value
+
+    def __setitem__(self, vi_name: str, en_name: str):
+        self.put(vi_name, en_name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
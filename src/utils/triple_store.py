@@ -0,0 +1,304 @@
+"""
+@File    : triple_store.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from rdflib import Graph
+from rdflib.term import Node
+
+Pattern = Tuple[Optional[Node], Optional[Node], Optional[Node]]
+
+# Position of each term in a triple
+SUBJ, PRED, OBJ = 0, 1, 2
+
+
+class TermDictionary:
+    """Two-way mapping between RDF terms and dense integer ids."""
+
+    def __init__(self):
+        self.terms: List[Node] = []
+        self.ids: Dict[Node, int] = {}
+
+    @classmethod
+    def from_terms(cls, terms: List[Node]) -> 'TermDictionary':
+        """Dictionary whose ids are the positions of terms in a list."""
+        dictionary = cls()
+        dictionary.terms = list(terms)
+        dictionary.ids = {term: term_id for term_id, term in enumerate(dictionary.terms)}
+        return dictionary
+
+    def encode(self, term: Node) -> int:
+        """Id of a term, assigning the next id to new terms."""
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+    def lookup(self, term: Node) -> Optional[int]:
+        """Id of a known term, or None."""
+        return self.ids.get(term)
+
+    def decode(self, term_id: int) -> Node:
+        return self.terms[term_id]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+class _EncodingSink(Graph):
+    """Graph stand-in handed to rdflib parsers; triples go straight to the encoder."""
+
+    def __init__(self, terms: TermDictionary):
+        super().__init__()
+        self.terms = terms
+        self.rows: List[Tuple[int, int, int]] = []
+
+    def add(self, triple):
+        s, p, o = triple
+        encode = self.terms.encode
+        self.rows.append((encode(s), encode(p), encode(o)))
+        return self
+
+
+def parse_encoded(path,
+                  format: str = "turtle") -> Tuple[TermDictionary, np.ndarray, Dict[str, str]]:
+    """
+    Parse an RDF file straight into dictionary-encoded rows.
+
+    Args:
+        path: RDF file
+        format: rdflib parser name ('turtle', 'nt', ...)
+
+    Returns:
+        (terms, (n, 3) int32 array of (s, p, o) ids in file order,
+        prefix -> namespace bindings of the parsed graph)
+    """
+    terms = TermDictionary()
+    sink = _EncodingSink(terms)
+    sink.parse(str(path), format=format)
+    prefixes = {prefix: str(namespace) for prefix, namespace in sink.namespaces()}
+    return terms, np.array(sink.rows, dtype=np.int32).reshape(-1, 3), prefixes
+
+
+class TripleStore:
+    """
+    Compact read-only triple store for reports over large graphs.
+
+    Terms are dictionary-encoded and triples kept as three int32 columns in
+    SPO order, plus POS and OSP permutations. Any triple pattern is answered
+    by binary search on the matching index, so counts never materialise
+    the triples and lookups do not scan the whole graph.
+    """
+
+    def __init__(self, terms: TermDictionary, rows: np.ndarray):
+        """
+        Build the indexes.
+
+        Args:
+            terms: Dictionary the rows were encoded with
+            rows: (n, 3) integer array of (s, p, o) ids; duplicates are removed
+        """
+        self.terms = terms
+        rows = np.asarray(rows, dtype=np.int32).reshape(-1, 3)
+        if len(rows):
+            rows = np.unique(rows, axis=0)  # sorted by s, p, o
+        self.s = np.ascontiguousarray(rows[:, SUBJ])
+        self.p = np.ascontiguousarray(rows[:, PRED])
+        self.o = np.ascontiguousarray(rows[:, OBJ])
+
+        self.pos = np.lexsort((self.s, self.o, self.p)).astype(np.int32)
+        self.pos_p = self.p[self.pos]
+        self.pos_o = self.o[self.pos]
+        self.osp = np.lexsort((self.p, self.s, self.o)).astype(np.int32)
+        self.osp_o = self.o[self.osp]
+        self.osp_s = self.s[self.osp]
+
+    @classmethod
+    def from_triples(cls, triples: Iterable[Tuple[Node, Node, Node]]) -> 'TripleStore':
+        """Build a store from (s, p, o) term tuples."""
+        terms = TermDictionary()
+        encode = terms.encode
+        rows = [(encode(s), encode(p), encode(o)) for s, p, o in triples]
+        return cls(terms, np.array(rows, dtype=np.int32))
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'TripleStore':
+        """Build a store from an rdflib graph."""
+        return cls.from_triples(graph)
+
+    @classmethod
+    def from_file(cls, path, format: str = "turtle") -> 'TripleStore':
+        """
+        Parse an RDF file directly into a store, without an intermediate Graph.
+
+        Args:
+            path: RDF file
+            format: rdflib parser name ('turtle', 'nt', ...)
+
+        Returns:
+            TripleStore
+        """
+        terms, rows, _ = parse_encoded(path, format)
+        return cls(terms, rows)
+
+    def __len__(self) -> int:
+        return len(self.s)
+
+    # ------------------------------------------------------------------
+    # Pattern lookups
+    # ------------------------------------------------------------------
+    def _encode_pattern(self, pattern: Pattern) -> Optional[Tuple[Optional[int], ...]]:
+        ids = []
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+                continue
+            term_id = self.terms.lookup(term)
+            if term_id is None:
+                return None  # unknown term: nothing can match
+            ids.append(term_id)
+        return tuple(ids)
+
+    @staticmethod
+    def _narrow(column: np.ndarray, value: int, lo: int, hi: int) -> Tuple[int, int]:
+        window = column[lo:hi]
+        return (lo + int(np.searchsorted(window, value, 'left')),
+                lo + int(np.searchsorted(window, value, 'right')))
+
+    def _rows(self, pattern: Pattern) -> np.ndarray:
+        """Row numbers (in SPO order) of the triples matching a pattern."""
+        ids = self._encode_pattern(pattern)
+        if ids is None:
+            return np.empty(0, dtype=np.int64)
+        s, p, o = ids
+        lo, hi = 0, len(self)
+
+        if s is not None and (p is not None or o is None):
+            lo, hi = self._narrow(self.s, s, lo, hi)
+            if p is not None:
+                lo, hi = self._narrow(self.p, p, lo, hi)
+                if o is not None:
+                    lo, hi = self._narrow(self.o, o, lo, hi)
+            return np.arange(lo, hi)
+        if p is not None:
+            lo, hi = self._narrow(self.pos_p, p, lo, hi)
+            if o is not None:
+                lo, hi = self._narrow(self.pos_o, o, lo, hi)
+            return self.pos[lo:hi]
+        if o is not None:
+            lo, hi = self._narrow(self.osp_o, o, lo, hi)
+            if s is not None:
+                lo, hi = self._narrow(self.osp_s, s, lo, hi)
+            return self.osp[lo:hi]
+        return np.arange(len(self))
+
+    def count(self, pattern: Pattern = (None, None, None)) -> int:
+        """
+        Number of triples matching a pattern.
+
+        Args:
+            pattern: (s, p, o) with None as wildcard
+
+        Returns:
+            Match count
+        """
+        return len(self._rows(pattern))
+
+    def triples(self, pattern: Pattern = (None, None, None),
+                limit: Optional[int] = None) -> Iterator[Tuple[Node, Node, Node]]:
+        """
+        Iterate over the triples matching a pattern.
+
+        Args:
+            pattern: (s, p, o) with None as wildcard
+            limit: Stop after this many triples
+
+        Yields:
+            (s, p, o) terms
+        """
+        rows = self._rows(pattern)
+        if limit is not None:
+            rows = rows[:limit]
+        decode = self.terms.terms
+        for s, p, o in zip(self.s[rows].tolist(), self.p[rows].tolist(), self.o[rows].tolist()):
+            yield decode[s], decode[p], decode[o]
+
+    def match(self, pattern: Pattern = (None, None, None),
+              limit: Optional[int] = None) -> List[Tuple[Node, Node, Node]]:
+        """Matching triples as a list (see :meth:`triples`)."""
+        return list(self.triples(pattern, limit))
+
+    def subjects(self, predicate: Optional[Node] = None, obj: Optional[Node] = None) -> List[Node]:
+        """Distinct subjects of the triples matching (?, predicate, obj)."""
+        rows = self._rows((None, predicate, obj))
+        return [self.terms.terms[i] for i in np.unique(self.s[rows]).tolist()]
+
+    def objects(self, subject: Optional[Node] = None,
+                predicate: Optional[Node] = None) -> List[Node]:
+        """Distinct objects of the triples matching (subject, predicate, ?)."""
+        rows = self._rows((subject, predicate, None))
+        return [self.terms.terms[i] for i in np.unique(self.o[rows]).tolist()]
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+    def group_count(self, by: int = PRED, pattern: Pattern = (None, None, None)) -> Dict[Node, int]:
+        """
+        Count matching triples grouped by one position.
+
+        Args:
+            by: SUBJ, PRED or OBJ
+            pattern: Optional filter pattern
+
+        Returns:
+            Dictionary term -> count, largest first
+        """
+        rows = self._rows(pattern)
+        column = (self.s, self.p, self.o)[by][rows]
+        values, counts = np.unique(column, return_counts=True)
+        order = np.argsort(-counts, kind='stable')
+        return {self.terms.terms[int(values[i])]: int(counts[i]) for i in order}
+
+    def count_by_predicate(self) -> Dict[Node, int]:
+        """Number of triples per predicate, largest first."""
+        return self.group_count(PRED)
+
+    def distinct_count(self, position: int, pattern: Pattern = (None, None, None)) -> int:
+        """Number of distinct terms at a position among matching triples."""
+        rows = self._rows(pattern)
+        return len(np.unique((self.s, self.p, self.o)[position][rows]))
+
+    def node_count(self) -> int:
+        """Number of distinct terms used as subject or object."""
+        return len(np.union1d(self.s, self.o))
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the index arrays (term dictionary excluded)."""
+        arrays = (self.s, self.p, self.o, self.pos, self.pos_p, self.pos_o,
+                  self.osp, self.osp_o, self.osp_s)
+        return sum(array.nbytes for array in arrays)
@@ -0,0 +1,290 @@
+"""
+@File    : topology_stats.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+from rdflib import Graph, Literal
+
+POI_PREFIX = "urn:ngsi-ld:PointOfInterest:"
+
+PREFIX_RE = re.compile(r'^\s*(?:@prefix|PREFIX)\s+([A-Za-z][\w.-]*)?:\s*<([^>]*)>\s*\.?\s*$',
+                       re.IGNORECASE)
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        <(?P<iri>[^>]*)>
+      | (?P<literal>"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^(?:<[^>]*>|[A-Za-z][\w.-]*:[\w-]*))?)
+      | (?P<pname>(?:[A-Za-z][\w.-]*)?:(?:[\w-](?:[\w.-]*[\w-])?)?)
+      | (?P<a>a)(?=\s)
+      | (?P<punct>[;,.])
+      | (?P<comment>\#.*)
+    )''', re.VERBOSE)
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+
+class UnsupportedSyntax(ValueError):
+    """Raised by the line scanner for Turtle it cannot handle (blank nodes, multi-line strings)."""
+
+
+def iter_triples(path) -> Iterator[Tuple[str, str, str]]:
+    """
+    Stream (s, p, o) from an N-Triples or Turtle file without building a graph.
+
+    Handles the layouts written by rdflib and by this project: IRIs, prefixed
+    names, 'a' and single-line literals, with ';' and ',' abbreviations.
+    IRIs are returned without angle brackets and literals as written.
+
+    Args:
+        path: .nt or .ttl file
+
+    Raises:
+        UnsupportedSyntax: For constructs the scanner does not understand
+    """
+    prefixes: Dict[str, str] = {}
+    subject = predicate = None
+    expect = 'subject'
+
+    def expand(match) -> str:
+        if match.group('iri') is not None:
+            return match.group('iri')
+        if match.group('a') is not None:
+            return RDF_TYPE
+        if match.group('literal') is not None:
+            return match.group('literal')
+        prefix, _, local = match.group('pname').partition(':')
+        if prefix not in prefixes:
+            raise UnsupportedSyntax(f"unknown prefix '{prefix}:'")
+        return prefixes[prefix] + local
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if expect == 'subject' and stripped[0] in '@Pp':
+                match = PREFIX_RE.match(line)
+                if match:
+                    prefixes[match.group(1) or ''] = match.group(2)
+                    continue
+                if stripped[0] == '@' or stripped[:4].upper() in ('PREF', 'BASE'):
+                    raise UnsupportedSyntax(f"line {line_no}: directive not supported")
+
+            pos, end = 0, len(line.rstrip('\n'))
+            while pos < end:
+                match = TOKEN_RE.match(line, pos)
+                if match is None or match.end() == pos:
+                    if line[pos:end].strip():
+                        raise UnsupportedSyntax(
+                            f"line {line_no}: cannot parse {line[pos:pos + 20]!r}")
+                    break
+                pos = match.end()
+                if match.group('comment') is not None:
+                    break
+                punct = match.group('punct')
+                if punct is not None:
+                    if expect != 'punct':
+                        raise UnsupportedSyntax(f"line {line_no}: unexpected '{punct}'")
+                    expect = {'.': 'subject', ';': 'predicate', ',': 'object'}[punct]
+                    continue
+
+                if expect == 'subject':
+                    if match.group('literal') is not None:
+                        raise UnsupportedSyntax(f"line {line_no}: literal subject")
+                    subject = expand(match)
+                    expect = 'predicate'
+                elif expect == 'predicate':
+                    predicate = expand(match)
+                    expect = 'object'
+                elif expect == 'object':
+                    yield subject, predicate, expand(match)
+                    expect = 'punct'
+                else:
+                    raise UnsupportedSyntax(f"line {line_no}: missing '.', ';' or ','")
+
+    if expect != 'subject':
+        raise UnsupportedSyntax("unterminated statement at end of file")
+
+
+def category_of(term: str) -> str:
+    """POI category from urn:ngsi-ld:PointOfInterest:Hanoi:<category>:<id>, else 'other'."""
+    if term.startswith(POI_PREFIX):
+        parts = term.split(":")
+        if len(parts) >= 2:
+            return parts[-2]
+    return "other"
+
+
+def local_name(iri: str) -> str:
+    return iri.split("/")[-1].split("#")[-1]
+
+
+class TopologyStats:
+    """
+    Accumulates topology metrics from a stream of triples.
+
+    Memory grows with the number of distinct entities (for degrees), not with
+    the number of links, so a multi-million-link file is summarised in one pass.
+    """
+
+    def __init__(self):
+        self.triples = 0
+        self.predicates: Counter = Counter()
+        self.category_pairs: Counter = Counter()
+        self.out_degree: Counter = Counter()
+        self.in_degree: Counter = Counter()
+
+    def add(self, s: str, p: str, o: str):
+        """Record one link."""
+        self.triples += 1
+        self.predicates[p] += 1
+        self.category_pairs[(category_of(s), category_of(o))] += 1
+        self.out_degree[s] += 1
+        self.in_degree[o] += 1
+
+    def to_dict(self, top_n: int = 10) -> Dict[str, Any]:
+        """
+        All metrics as a JSON-serialisable dictionary.
+
+        Args:
+            top_n: Number of hubs and category pairs to list
+
+        Returns:
+            Dictionary of metrics
+        """
+        degree = Counter(self.out_degree)
+        degree.update(self.in_degree)
+        degree_histogram = Counter(degree.values())
+        return {
+            'total_triples': self.triples,
+            'predicates': {local_name(p): count for p, count in self.predicates.most_common()},
+            'unique_entities': len(degree),
+            'unique_sources': len(self.out_degree),
+            'unique_targets': len(self.in_degree),
+            'category_pairs': [
+                {'source': src, 'target': tgt, 'count': count}
+                for (src, tgt), count in self.category_pairs.most_common(top_n)
+            ],
+            'degree': {
+                'mean': round(sum(degree.values()) / len(degree), 3) if degree else 0.0,
+                'max': max(degree.values(), default=0),
+                'histogram': {str(d): degree_histogram[d] for d in sorted(degree_histogram)},
+            },
+            'top_hubs': [
+                {'entity': entity, 'category': category_of(entity), 'degree': count,
+                 'out': self.out_degree[entity], 'in': self.in_degree[entity]}
+                for entity, count in degree.most_common(top_n)
+            ],
+        }
+
+
+class _StatsSink(Graph):
+    """Graph stand-in for rdflib parsers that feeds triples to TopologyStats."""
+
+    def __init__(self, stats: TopologyStats):
+        super().__init__()
+        self.stats = stats
+
+    def add(self, triple):
+        s, p, o = triple
+        self.stats.add(str(s), str(p), o.n3() if isinstance(o, Literal) else str(o))
+        return self
+
+
+def compute_topology_stats(path, top_n: int = 10) -> Dict[str, Any]:
+    """
+    Compute topology metrics in one streaming pass over a file.
+
+    The line scanner is used when it understands the file; otherwise rdflib's
+    parser streams the triples instead (still without keeping a graph).
+
+    Args:
+        path: Topology file (.ttl or .nt)
+        top_n: Number of hubs and category pairs to list
+
+    Returns:
+        Metrics dictionary (see TopologyStats.to_dict)
+    """
+    stats = TopologyStats()
+    try:
+        for s, p, o in iter_triples(path):
+            stats.add(s, p, o)
+    except UnsupportedSyntax:
+        stats = TopologyStats()
+        fmt = "nt" if str(path).endswith(".nt") else "turtle"
+        _StatsSink(stats).parse(str(path), format=fmt)
+    return stats.to_dict(top_n)
+
+
+def format_summary(report: Dict[str, Any]) -> str:
+    """Human-readable summary of a metrics dictionary."""
+    lines = [f"📊 Total triples: {report['total_triples']:,}", "", "Predicate Distribution:"]
+    lines += [f"  • {name}: {count:,}" for name, count in report['predicates'].items()]
+    lines += [
+        "",
+        f"🔗 Unique entities involved: {report['unique_entities']:,}",
+        f"  • As sources: {report['unique_sources']:,}",
+        f"  • As targets: {report['unique_targets']:,}",
+        "",
+        "Top category pairs:",
+    ]
+    lines += [f"  • {pair['source']} → {pair['target']}: {pair['count']:,}"
+              for pair in report['category_pairs']]
+    lines += [
+        "",
+        f"Degree: mean {report['degree']['mean']}, max {report['degree']['max']}",
+        "",
+        "Top hubs:",
+    ]
+    lines += [
+        f"  {i}. {hub['category']} {hub['entity'].split(':')[-1]}: {hub['degree']} links "
+        f"({hub['out']} out, {hub['in']} in)"
+        for i, hub in enumerate(report['top_hubs'], 1)
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    """Entry point: python src/validators/topology_stats.py [file] [--json out.json]."""
+    parser = argparse.ArgumentParser(description="Single-pass statistics for a topology file")
+    parser.add_argument("path", nargs="?", default="datav2/data_hanoi_topology.ttl")
+    parser.add_argument("--json", type=Path, help="Also write the metrics as JSON")
+    parser.add_argument("--top", type=int, default=10, help="Hubs and category pairs to list")
+    args = parser.parse_args()
+
+    report = compute_topology_stats(args.path, args.top)
+    print(format_summary(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Saved metrics to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,12 +22,17 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
-from rdflib import Graph, Namespace
+import sys
+from pathlib import Path
+
+from rdflib import Namespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from triple_store import TripleStore
 
 # Load the topology graph
 print("Loading topology graph...")
-g = Graph()
-g.parse("datav2/data_hanoi_topology.ttl", format="turtle")
+g = TripleStore.from_file("datav2/data_hanoi_topology.ttl", format="turtle")
 
 SCHEMA = Namespace("http://schema.org/")
 EXT = Namespace("http://opendatafithou.org/def/extension/")
@@ -35,86 +40,43 @@ EXT = Namespace("http://opendatafithou.org/def/extension/")
 print(f"✓ Loaded {len(g):,} triples\n")
 print("=" * 80)
 
+
+def show_predicate(predicate):
+    """Print 10 sample links and the total count (one index lookup each)."""
+    for i, (source, _, target) in enumerate(g.triples((None, predicate, None), limit=10), 1):
+        src_type = str(source).split(":")[-2]
+        tgt_type = str(target).split(":")[-2]
+        print(f"  {i}. {src_type} → {tgt_type}")
+    return g.count((None, predicate, None))
+
+
 # Check for containedInPlace (≤50m)
 print("\n📍 PREDICATE 1: schema:containedInPlace (≤50m)")
 print("-" * 80)
-query_contained = """
-PREFIX schema: <http://schema.org/>
-SELECT ?source ?target
-WHERE {
-    ?source schema:containedInPlace ?target .
-}
-LIMIT 10
-"""
-results = list(g.query(query_contained))
-for i, (source, target) in enumerate(results, 1):
-    src_type = str(source).split(":")[-2]
-    tgt_type = str(target).split(":")[-2]
-    print(f"  {i}. {src_type} → {tgt_type}")
-
-total = len(list(g.query(query_contained.replace("LIMIT 10", ""))))
+total = show_predicate(SCHEMA.containedInPlace)
 print(f"\n✅ Total containedInPlace relationships: {total:,}")
 
 # Check for isNextTo (50-200m)
 print("\n\n🚶 PREDICATE 2: schema:isNextTo (50-200m)")
 print("-" * 80)
-query_next = """
-PREFIX schema: <http://schema.org/>
-SELECT ?source ?target
-WHERE {
-    ?source schema:isNextTo ?target .
-}
-LIMIT 10
-"""
-results = list(g.query(query_next))
-for i, (source, target) in enumerate(results, 1):
-    src_type = str(source).split(":")[-2]
-    tgt_type = str(target).split(":")[-2]
-    print(f"  {i}. {src_type} → {tgt_type}")
-
-total = len(list(g.query(query_next.replace("LIMIT 10", ""))))
+total = show_predicate(SCHEMA.isNextTo)
 print(f"\n✅ Total isNextTo relationships: {total:,}")
 
 # Check for amenityFeature (>200m)
 print("\n\n🎯 PREDICATE 3: schema:amenityFeature (200-500m)")
 print("-" * 80)
-query_amenity = """
-PREFIX schema: <http://schema.org/>
-SELECT ?source ?target
-WHERE {
-    ?source schema:amenityFeature ?target .
-}
-LIMIT 10
-"""
-results = list(g.query(query_amenity))
-for i, (source, target) in enumerate(results, 1):
-    src_type = str(source).split(":")[-2]
-    tgt_type = str(target).split(":")[-2]
-    print(f"  {i}. {src_type} → {tgt_type}")
-
-total = len(list(g.query(query_amenity.replace("LIMIT 10", ""))))
+total = show_predicate(SCHEMA.amenityFeature)
 print(f"\n✅ Total amenityFeature relationships: {total:,}")
 
 # Check for other domain-specific predicates
 print("\n\n🔗 OTHER DOMAIN-SPECIFIC PREDICATES (>200m)")
 print("-" * 80)
-query_other = """
-PREFIX schema: <http://schema.org/>
-PREFIX ext: <http://opendatafithou.org/def/extension/>
-
-SELECT DISTINCT ?predicate (COUNT(?s) as ?count)
-WHERE {
-    ?s ?predicate ?o .
-    FILTER(?predicate NOT IN (schema:containedInPlace, schema:isNextTo, schema:amenityFeature))
-    FILTER(STRSTARTS(STR(?predicate), "http://schema.org/") || STRSTARTS(STR(?predicate), "http://opendatafithou.org/def/extension/"))
-}
-GROUP BY ?predicate
-ORDER BY DESC(?count)
-"""
-results = list(g.query(query_other))
-for predicate, count in results:
+main_predicates = {SCHEMA.containedInPlace, SCHEMA.isNextTo, SCHEMA.amenityFeature}
+for predicate, count in g.count_by_predicate().items():
+    if predicate in main_predicates or not str(predicate).startswith((str(SCHEMA), str(EXT))):
+        continue
     pred_name = str(predicate).split("/")[-1].split("#")[-1]
-    print(f"  • {pred_name}: {int(count):,}")
+    print(f"  • {pred_name}: {count:,}")
 
 print("\n" + "=" * 80)
 print("✅ ALL PREDICATE TYPES VERIFIED!")
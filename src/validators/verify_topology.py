@@ -26,30 +26,15 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 """Quick verification script for the generated topology."""
 
-from rdflib import Graph
-from collections import Counter
-
-# Load the topology graph
-g = Graph()
-print("Loading topology graph...")
-g.parse("datav2/data_hanoi_topology.ttl", format="turtle")
-
-# Count predicates
-predicates = Counter()
-for s, p, o in g:
-    pred_name = str(p).split("/")[-1].split("#")[-1]
-    predicates[pred_name] += 1
-
-print(f"\n📊 Total triples: {len(g):,}")
-print("\nPredicate Distribution:")
-for pred, count in predicates.most_common():
-    print(f"  • {pred}: {count:,}")
-
-# Count unique entities
-subjects = set(str(s) for s, p, o in g)
-objects = set(str(o) for s, p, o in g)
-all_entities = subjects | objects
-
-print(f"\n🔗 Unique entities involved: {len(all_entities):,}")
-print(f"  • As sources: {len(subjects):,}")
-print(f"  • As targets: {len(objects):,}")
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from topology_stats import compute_topology_stats, format_summary
+
+# One streaming pass over the file; no graph is built
+print("Scanning topology file...")
+report = compute_topology_stats("datav2/data_hanoi_topology.ttl")
+
+print()
+print(format_summary(report))
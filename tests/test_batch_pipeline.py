@@ -0,0 +1,98 @@
+"""
+@File    : test_batch_pipeline.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+CASES = [
+    ("atm", "amenity", "atm", "schema:FinancialService"),
+    ("bank", "amenity", "bank", "schema:BankOrCreditUnion"),
+]
+
+
+@pytest.fixture
+def batch_processor(monkeypatch):
+    """Import batch_processor with its flat-import folders on the path for this test only."""
+    for folder in (ROOT / "config", ROOT / "src" / "utils", ROOT / "src" / "fetchers",
+                   ROOT / "src" / "processors"):
+        monkeypatch.syspath_prepend(str(folder))
+    return importlib.import_module("batch_processor")
+
+
+def _fake_stages(batch_processor, monkeypatch, calls, fail_enrich_for=()):
+    def fake_fetch(osm_key, osm_value, area_name="Hanoi", rate_limiter=None):
+        calls.append(("fetch", osm_value))
+        return [{'id': 1, 'type': 'node', 'lat': 21.0, 'lon': 105.8, 'tags': {'name': osm_value}}]
+
+    def fake_enrich(elements, rate_limiter=None):
+        calls.append(("enrich", elements[0]['tags']['name']))
+        if elements[0]['tags']['name'] in fail_enrich_for:
+            raise RuntimeError("Wikidata unavailable")
+        return elements
+
+    monkeypatch.setattr(batch_processor, "fetch_osm_data", fake_fetch)
+    monkeypatch.setattr(batch_processor, "enrich_with_wikidata", fake_enrich)
+
+
+def test_pipeline_writes_all_categories(batch_processor, tmp_path, monkeypatch):
+    """Every category goes through all three stages and is written."""
+    calls = []
+    _fake_stages(batch_processor, monkeypatch, calls)
+
+    processor = batch_processor.BatchProcessor(output_dir=str(tmp_path))
+    processor.run_pipeline(CASES)
+
+    assert sorted(processor.progress['completed']) == ["atm", "bank"]
+    for stage in batch_processor.STAGES:
+        assert sorted(processor.progress['stages'][stage]) == ["atm", "bank"]
+    assert (tmp_path / "data_hanoi_atm.ttl").exists()
+    assert (tmp_path / "data_hanoi_bank.ttl").exists()
+    assert not list((tmp_path / ".stages").glob("*.json"))
+
+
+def test_retry_resumes_at_failed_stage(batch_processor, tmp_path, monkeypatch):
+    """A category that failed during enrichment is not fetched again on retry."""
+    calls = []
+    _fake_stages(batch_processor, monkeypatch, calls, fail_enrich_for=("bank",))
+    processor = batch_processor.BatchProcessor(output_dir=str(tmp_path))
+    processor.run_pipeline(CASES)
+
+    progress = json.loads((tmp_path / "processing_progress.json").read_text(encoding="utf-8"))
+    assert progress['failed'] == ["bank"]
+    assert "bank" in progress['stages']['fetch']
+    assert "bank" not in progress['stages']['enrich']
+
+    calls.clear()
+    _fake_stages(batch_processor, monkeypatch, calls)
+    monkeypatch.setattr(batch_processor, "AMENITY_TYPES", CASES)
+    batch_processor.BatchProcessor(output_dir=str(tmp_path)).retry_failed()
+
+    assert calls == [("enrich", "bank")]
+    assert (tmp_path / "data_hanoi_bank.ttl").exists()
@@ -0,0 +1,78 @@
+"""
+@File    : test_brand_matcher.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from brand_matcher import BrandMatcher, load_brand_knowledge_base, normalize_brand
+
+
+def linear_scan(knowledge_base, brand):
+    """Reference implementation: the original exact + two-way substring scan."""
+    if brand in knowledge_base:
+        return brand
+    brand_lower = brand.lower()
+    for kb_brand in knowledge_base:
+        if kb_brand.lower() in brand_lower or brand_lower in kb_brand.lower():
+            return kb_brand
+    return None
+
+
+def test_matches_linear_scan_on_shipped_knowledge_base():
+    """The indexed matcher picks the same entry as the original linear scan."""
+    knowledge_base = load_brand_knowledge_base()
+    matcher = BrandMatcher(knowledge_base)
+
+    probes = list(knowledge_base)
+    probes += [f"ATM {b} Hoàn Kiếm" for b in knowledge_base]
+    probes += [b[:3] for b in knowledge_base if len(b) > 3 and b.isascii()]
+    probes += ["Unknown Brand", "x", "Circle K Mart", "BIDV - Chi nhánh Hà Nội"]
+
+    for brand in probes:
+        match = matcher.match(brand)
+        assert (match[0] if match else None) == linear_scan(knowledge_base, brand), brand
+
+
+def test_matching_is_accent_insensitive_and_first_entry_wins():
+    """Accents are ignored and overlapping keys resolve in knowledge-base order."""
+    matcher = BrandMatcher({
+        "Phở Thìn": {"wikidata": "Q1"},
+        "Phở": {"wikidata": "Q2"},
+        "Thìn": {"wikidata": "Q3"},
+    })
+    assert normalize_brand("  Phở   THÌN ") == "pho thin"
+    assert matcher.match("pho thin bo ho")[0] == "Phở Thìn"
+    assert matcher.match("Quán Phở")[0] == "Phở"
+    assert matcher.match("Thin")[0] == "Thìn"
+    assert matcher.match("thi")[0] == "Phở Thìn"
+
+
+def test_normalized_exact_match_beats_substring_match():
+    """Case variants of a known brand resolve to that brand, not to a shorter key it contains."""
+    matcher = BrandMatcher(load_brand_knowledge_base())
+    assert matcher.match("SACOMBANK")[0] == "Sacombank"
+    assert matcher.match("Bún chả") is None
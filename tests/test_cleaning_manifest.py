@@ -0,0 +1,117 @@
+"""
+@File    : test_cleaning_manifest.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "processors"))
+
+from rdflib import Graph, URIRef
+
+from cleaning_manifest import CleaningManifest
+from clean_all_remaining import UniversalDataCleaner
+from entity_table import SCHEMA
+
+SAMPLE_TTL = """
+@prefix schema: <http://schema.org/> .
+@prefix geo: <http://www.opengis.net/ont/geosparql#> .
+@prefix ext: <http://opendatafithou.org/def/extension/> .
+@prefix fiware: <https://smartdatamodels.org/dataModel.PointOfInterest/> .
+
+<urn:ngsi-ld:PointOfInterest:Hanoi:parking:1> a fiware:PointOfInterest ;
+    schema:name "Bãi đỗ xe #1"@vi ;
+    ext:addr_housenumber "12" ;
+    ext:addr_street "Hàng Bài" ;
+    geo:asWKT "POINT(105.85 21.02)"^^geo:wktLiteral .
+
+<urn:ngsi-ld:PointOfInterest:Hanoi:parking:2> a fiware:PointOfInterest ;
+    schema:name "Bãi đỗ xe Vincom"@vi, "Vincom Parking"@en ;
+    schema:telephone "+84 24 3974 3550" ;
+    schema:openingHours "Mo-Su 08:00-22:00" ;
+    geo:asWKT "POINT(105.86 21.01)"^^geo:wktLiteral .
+"""
+
+
+def test_incremental_run_only_reprocesses_changed_entities(tmp_path):
+    """Unchanged entities are copied from the previous output, changed ones are renamed."""
+    input_file = tmp_path / "data_hanoi_parking.ttl"
+    output_file = tmp_path / "cleaned" / "data_hanoi_parking_cleaned.ttl"
+    manifest_path = tmp_path / "cleaned" / "cleaning_manifest.json"
+    input_file.write_text(SAMPLE_TTL, encoding="utf-8")
+
+    cleaner = UniversalDataCleaner()
+    processed = []
+    original_process_row = cleaner.process_row
+
+    def tracking_process_row(table, index, category):
+        processed.append(str(table.subjects[index]))
+        return original_process_row(table, index, category)
+
+    cleaner.process_row = tracking_process_row
+
+    def run(version=''):
+        manifest = CleaningManifest(str(manifest_path), code_version=version)
+        result = cleaner.process_file(str(input_file), str(output_file), manifest=manifest)
+        manifest.save()
+        return result
+
+    def objects_of(subject, predicate=SCHEMA.name):
+        g = Graph()
+        g.parse(str(output_file), format="turtle")
+        return set(g.objects(URIRef(subject), predicate))
+
+    first = run()
+    assert first['success'] and first['reused'] == 0
+    assert len(processed) == 2
+    first_names = objects_of("urn:ngsi-ld:PointOfInterest:Hanoi:parking:1")
+
+    # Second run with the same input reuses everything
+    processed.clear()
+    second = run()
+    assert second['reused'] == 2
+    assert processed == []
+
+    # Changing one entity's WKT only reprocesses that entity
+    input_file.write_text(SAMPLE_TTL.replace("105.86 21.01", "105.87 21.01"), encoding="utf-8")
+    third = run()
+    assert third['reused'] == 1
+    assert processed == ["urn:ngsi-ld:PointOfInterest:Hanoi:parking:2"]
+    assert objects_of("urn:ngsi-ld:PointOfInterest:Hanoi:parking:1") == first_names
+
+    # Fields outside the hash are taken from the current input, not the old output
+    processed.clear()
+    edited = input_file.read_text(encoding="utf-8")
+    input_file.write_text(edited.replace("+84 24 3974 3550", "+84 24 3974 9999")
+                          .replace("08:00-22:00", "09:00-21:00"), encoding="utf-8")
+    fourth = run()
+    assert fourth['reused'] == 2
+    assert processed == []
+    subject = "urn:ngsi-ld:PointOfInterest:Hanoi:parking:2"
+    assert {str(o) for o in objects_of(subject, SCHEMA.telephone)} == {"+84 24 3974 9999"}
+    assert {str(o) for o in objects_of(subject, SCHEMA.openingHours)} == {"Mo-Su 09:00-21:00"}
+
+    # A different version of the naming code invalidates every recorded hash
+    fifth = run(version="changed")
+    assert fifth['reused'] == 0
+    assert len(processed) == 2
@@ -0,0 +1,88 @@
+"""
+@File    : test_entity_table.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "processors"))
+
+from rdflib import Graph, Literal, URIRef
+
+from entity_table import EntityTable, SCHEMA
+from clean_all_remaining import UniversalDataCleaner
+
+SAMPLE_TTL = """
+@prefix schema: <http://schema.org/> .
+@prefix geo: <http://www.opengis.net/ont/geosparql#> .
+@prefix ext: <http://opendatafithou.org/def/extension/> .
+@prefix fiware: <https://smartdatamodels.org/dataModel.PointOfInterest/> .
+
+<urn:ngsi-ld:PointOfInterest:Hanoi:parking:1> a fiware:PointOfInterest, schema:ParkingFacility ;
+    schema:name "Bãi đỗ xe #1"@vi, "Parking #1"@en ;
+    ext:addr_housenumber "12" ;
+    ext:addr_street "Hàng Bài" ;
+    geo:asWKT "POINT(105.85 21.02)"^^geo:wktLiteral .
+
+<urn:ngsi-ld:PointOfInterest:Hanoi:parking:2> a fiware:PointOfInterest, schema:ParkingFacility ;
+    schema:name "Bãi đỗ xe Vincom"@vi, "Vincom Parking"@en ;
+    geo:asWKT "POINT(105.86 21.01)"^^geo:wktLiteral .
+"""
+
+
+def _load():
+    g = Graph()
+    g.parse(data=SAMPLE_TTL, format="turtle")
+    return g
+
+
+def test_table_columns_from_single_pass():
+    """All naming fields are collected per subject."""
+    table = EntityTable.from_graph(_load())
+    assert len(table) == 2
+
+    row = table.row(table.index[URIRef("urn:ngsi-ld:PointOfInterest:Hanoi:parking:1")])
+    assert row["name_vi"] == "Bãi đỗ xe #1"
+    assert row["addr_street"] == "Hàng Bài"
+    assert row["addr_housenumber"] == "12"
+    assert row["wkt"] == "POINT(105.85 21.02)"
+    assert all(table.is_poi)
+
+
+def test_only_changed_names_are_written_back():
+    """The cleaner records a diff and leaves good names untouched."""
+    g = _load()
+    table = EntityTable.from_graph(g)
+    cleaner = UniversalDataCleaner()
+
+    for index, _ in table.rows(poi_only=True):
+        cleaner.process_row(table, index, "parking")
+
+    assert table.apply_changes(g) == 2
+
+    generic = URIRef("urn:ngsi-ld:PointOfInterest:Hanoi:parking:1")
+    names = {(str(o), o.language) for o in g.objects(generic, SCHEMA.name)}
+    assert names == {("Bãi đỗ xe 12 Hàng Bài", "vi"), ("Parking Lot 12 Hang Bai", "en")}
+
+    named = URIRef("urn:ngsi-ld:PointOfInterest:Hanoi:parking:2")
+    assert (named, SCHEMA.name, Literal("Vincom Parking", lang="en")) in g
@@ -0,0 +1,102 @@
+"""
+@File    : test_geo_index.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from geopy.distance import geodesic
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from geo_index import KDTree, STRIndex, StationIndex
+
+STATIONS = [
+    {"id": "Lang", "lat": 21.017, "lon": 105.800},
+    {"id": "CauGiay", "lat": 21.033, "lon": 105.800},
+    {"id": "HoGuom", "lat": 21.028, "lon": 105.852},
+    {"id": "HaDong", "lat": 20.971, "lon": 105.776},
+    {"id": "LongBien", "lat": 21.036, "lon": 105.894},
+]
+
+
+def random_pois(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 20.95 + rng.random(n) * 0.12, 105.75 + rng.random(n) * 0.16
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(1)
+    points = rng.random((500, 2)) * 10
+    queries = rng.random((200, 2)) * 10
+    brute = np.sqrt(((queries[:, None] - points[None]) ** 2).sum(axis=2))
+
+    distances, indices = KDTree(points, leaf_size=4).query(queries, k=3)
+    assert np.allclose(distances, np.sort(brute, axis=1)[:, :3])
+    assert np.array_equal(indices, np.argsort(brute, axis=1, kind='stable')[:, :3])
+
+    q, p, d = KDTree(points, leaf_size=4).query_radius(queries, 1.5)
+    assert len(q) == (brute <= 1.5).sum()
+    assert np.allclose(d, brute[q, p])
+
+
+def test_nearest_station_uses_geodesic_distance():
+    lat, lon = random_pois(300)
+    index = StationIndex(STATIONS)
+    station_idx, km = index.nearest(lat, lon, k=2)
+    for i in range(len(lat)):
+        exact = sorted((geodesic((lat[i], lon[i]), (s["lat"], s["lon"])).kilometers, j)
+                       for j, s in enumerate(STATIONS))
+        assert [j for _, j in exact[:2]] == station_idx[i].tolist()
+        assert np.allclose([d for d, _ in exact[:2]], km[i])
+
+
+def test_radius_coverage():
+    lat, lon = random_pois(100, seed=2)
+    index = StationIndex(STATIONS)
+    poi_idx, station_idx, km = index.within(lat, lon, 4.0)
+    pairs = set(zip(poi_idx.tolist(), station_idx.tolist()))
+    for i in range(len(lat)):
+        for j, s in enumerate(STATIONS):
+            inside = geodesic((lat[i], lon[i]), (s["lat"], s["lon"])).kilometers <= 4.0
+            assert ((i, j) in pairs) == inside
+    assert (km <= 4.0).all()
+
+
+def test_str_index_matches_brute_force():
+    rng = np.random.default_rng(2)
+    points = rng.random((3000, 2)) * 1000
+    index = STRIndex(points, leaf_size=32)
+    for x, y in rng.random((30, 2)) * 1000:
+        d = np.hypot(points[:, 0] - x, points[:, 1] - y)
+        idx, dist = index.query(x, y, 6)
+        assert np.array_equal(idx, np.argsort(d, kind='stable')[:6])
+        assert np.allclose(dist, np.sort(d)[:6])
+        idx, _ = index.query_radius(x, y, 60)
+        assert sorted(idx.tolist()) == np.flatnonzero(d <= 60).tolist()
+        inside = ((points[:, 0] >= x) & (points[:, 0] <= x + 80)
+                  & (points[:, 1] >= y) & (points[:, 1] <= y + 40))
+        found = index.query_box(x, y, x + 80, y + 40)
+        assert sorted(found.tolist()) == np.flatnonzero(inside).tolist()
@@ -0,0 +1,103 @@
+"""
+@File    : test_graph_snapshot.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+from rdflib import Graph, Namespace
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from graph_snapshot import load_graph, load_triple_store, snapshot_path
+
+SCHEMA = Namespace("http://schema.org/")
+
+TTL = """@prefix schema: <http://schema.org/> .
+@prefix ext: <http://opendatafithou.org/def/extension/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+<http://opendatafithou.org/poi/node_1> a schema:Cafe ;
+    schema:name "Cà phê Giảng"@vi, "Giang Cafe"@en ;
+    ext:addr_housenumber "39" ;
+    ext:rating "4.5"^^xsd:decimal ;
+    ext:contact [ schema:telephone "+84 24 3826 9868" ] .
+
+<http://opendatafithou.org/poi/node_2> a schema:Cafe ;
+    schema:name "Highlands Coffee" .
+"""
+
+
+def write_ttl(tmp_path, text=TTL):
+    path = tmp_path / "data_hanoi_cafe.ttl"
+    path.write_text(text, encoding='utf-8')
+    return path
+
+
+def test_load_graph_matches_parse_and_writes_snapshot(tmp_path):
+    path = write_ttl(tmp_path)
+    expected = Graph().parse(path, format="turtle")
+
+    first = load_graph(path)
+    assert snapshot_path(path).exists()
+    second = load_graph(path)
+
+    for graph in (first, second):
+        assert isomorphic(graph, expected)
+        assert dict(graph.namespaces())['schema'] == dict(expected.namespaces())['schema']
+
+
+def test_changed_file_invalidates_snapshot(tmp_path):
+    path = write_ttl(tmp_path)
+    load_graph(path)
+    write_ttl(tmp_path, TTL.replace("Highlands Coffee", "The Coffee House"))
+
+    names = {str(o) for o in load_graph(path).objects(predicate=SCHEMA.name)}
+    assert "The Coffee House" in names
+    assert "Highlands Coffee" not in names
+
+
+def test_empty_snapshot_dir_disables_snapshots(tmp_path):
+    path = write_ttl(tmp_path)
+    graph = load_graph(path, snapshot_dir='')
+    assert len(graph) == 9
+    assert not snapshot_path(path).exists()
+
+
+def test_corrupt_snapshot_is_reparsed(tmp_path):
+    path = write_ttl(tmp_path)
+    snapshot = snapshot_path(path, tmp_path / "snap")
+    snapshot.parent.mkdir()
+    snapshot.write_bytes(b"not a snapshot")
+
+    assert len(load_graph(path, snapshot_dir=tmp_path / "snap")) == 9
+    assert len(load_graph(path, snapshot_dir=tmp_path / "snap")) == 9
+
+
+def test_load_triple_store(tmp_path):
+    path = write_ttl(tmp_path)
+    load_graph(path)
+    store = load_triple_store(path)
+    assert len(store) == 9
@@ -0,0 +1,110 @@
+"""
+@File    : test_iri_encoding.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "fetchers"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "processors"))
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDFS
+
+from osm_data_fetcher import encode_iri, write_turtle_file
+from clean_all_remaining import UniversalDataCleaner
+
+SCHEMA = Namespace("http://schema.org/")
+
+
+def test_encode_iri_keeps_existing_escapes():
+    """Spaces and Vietnamese characters are encoded, %XX sequences are kept."""
+    assert encode_iri("https://vi.wikipedia.org/wiki/Hồ Gươm") == \
+        "https://vi.wikipedia.org/wiki/H%E1%BB%93%20G%C6%B0%C6%A1m"
+    assert encode_iri("https://vi.wikipedia.org/wiki/H%E1%BB%93") == \
+        "https://vi.wikipedia.org/wiki/H%E1%BB%93"
+    assert encode_iri("https://example.com/a?b=1&c=2") == "https://example.com/a?b=1&c=2"
+
+
+def test_written_links_parse_and_need_no_repair(tmp_path):
+    """write_turtle_file emits valid IRIs, so the cleaner has nothing left to fix."""
+    elements = [{
+        'id': 1, 'type': 'node', 'lat': 21.03, 'lon': 105.85,
+        'tags': {
+            'name': 'Hồ Gươm',
+            'wikipedia': 'vi:Hồ Hoàn Kiếm',
+            'website': 'https://example.com/trang chủ',
+        }
+    }]
+    output = tmp_path / "data_hanoi_park.ttl"
+    write_turtle_file(elements, output, 'park', 'schema:Park')
+
+    g = Graph()
+    g.parse(str(output), format="turtle")
+    links = list(g.objects(None, RDFS.seeAlso))
+    assert links == [URIRef("https://vi.wikipedia.org/wiki/H%E1%BB%93_Ho%C3%A0n_Ki%E1%BA%BFm")]
+    assert UniversalDataCleaner().fix_invalid_uris(g) == 0
+
+
+def test_fix_invalid_uris_repairs_legacy_links():
+    """Old files with raw Wikipedia titles are repaired through the seeAlso index."""
+    g = Graph()
+    subject = URIRef("urn:ngsi-ld:PointOfInterest:Hanoi:park:1")
+    g.add((subject, RDFS.seeAlso, URIRef("https://vi.wikipedia.org/wiki/Hồ Gươm")))
+    g.add((subject, RDFS.label, Literal("https://vi.wikipedia.org/wiki/Hồ Gươm")))
+
+    assert UniversalDataCleaner().fix_invalid_uris(g) == 1
+    assert list(g.objects(subject, RDFS.seeAlso)) == [
+        URIRef("https://vi.wikipedia.org/wiki/H%E1%BB%93%20G%C6%B0%C6%A1m")
+    ]
+
+
+def test_encode_iri_rejects_unusable_hosts():
+    """Hosts that urlsplit cannot parse or that hold characters forbidden in <...> give None."""
+    assert encode_iri("https://[[vi.wikipedia.org/wiki/Hồ_Gươm]]") is None
+    assert encode_iri("http://foo.com>") is None
+    assert encode_iri('http://host:80"x/') is None
+    assert encode_iri("http://exa mple.com/") is None
+    assert encode_iri("http://localhost:8080/a b") == "http://localhost:8080/a%20b"
+
+
+def test_malformed_links_are_skipped_or_kept_as_literals(tmp_path):
+    """A bad wikipedia/website tag is skipped and a bad image URL becomes a literal."""
+    elements = [{
+        'id': 2, 'type': 'node', 'lat': 21.03, 'lon': 105.85,
+        'tags': {
+            'name': 'Hồ Gươm',
+            'wikipedia': '[[vi:Hồ Gươm]]',
+            'website': 'http://foo.com>',
+            'image': 'http://host:80"x/logo.png',
+        }
+    }]
+    output = tmp_path / "data_hanoi_park.ttl"
+    write_turtle_file(elements, output, 'park', 'schema:Park')
+
+    g = Graph()
+    g.parse(str(output), format="turtle")
+    assert list(g.objects(None, RDFS.seeAlso)) == []
+    assert list(g.objects(None, SCHEMA.url)) == []
+    assert list(g.objects(None, SCHEMA.image)) == [Literal('http://host:80"x/logo.png')]
@@ -0,0 +1,110 @@
+"""
+@File    : test_name_index.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from name_index import NameIndex, normalize_name, trigrams
+from poi_index import POIIndex
+from poi_query_service import run_query
+
+
+def make_records(rows):
+    columns = list(zip(*rows))
+    return {
+        "uri": np.array([f"urn:ngsi-ld:PointOfInterest:Hanoi:{c}:{i}"
+                         for i, c in enumerate(columns[0])]),
+        "category": np.array(columns[0]),
+        "name_vi": np.array(columns[1]),
+        "name_en": np.array(columns[2]),
+        "lat": np.array(columns[3], dtype=np.float64),
+        "lon": np.array(columns[4], dtype=np.float64),
+    }
+
+
+RECORDS = make_records([
+    ("hospital", "Bệnh viện Bạch Mai", "Bach Mai Hospital", 21.0003, 105.8406),
+    ("hospital", "Bệnh viện Việt Đức", "Viet Duc Hospital", 21.0291, 105.8467),
+    ("bank", "Vietcombank Hoàn Kiếm", "", 21.0245, 105.8550),
+    ("bank", "Vietcombank Cầu Giấy", "", 21.0359, 105.7906),
+    ("cafe", "Cà phê Giảng", "Giang Cafe", 21.0337, 105.8540),
+])
+
+
+def test_normalize_and_trigrams():
+    assert normalize_name("Bệnh viện  Bạch-Mai") == "benh vien bach mai"
+    assert normalize_name("Đường Láng") == "duong lang"
+    assert trigrams("ab") == ["  a", " ab", "ab "]
+    assert len(trigrams("mai mai")) == len(set(trigrams("mai mai")))
+
+
+def test_search_is_accent_insensitive_and_bilingual():
+    index = NameIndex.from_records(RECORDS)
+    for query in ("benh vien bach mai", "Bệnh viện Bạch Mai", "bach mai hospital"):
+        results = index.search(query)
+        assert results[0]["name_vi"] == "Bệnh viện Bạch Mai"
+        assert results[0]["similarity"] == 1.0
+    assert index.search("ca phe giang")[0]["category"] == "cafe"
+
+
+def test_search_tolerates_typos_and_filters():
+    index = NameIndex.from_records(RECORDS)
+    assert index.search("benh vien bach mia")[0]["name_vi"] == "Bệnh viện Bạch Mai"
+    assert index.search("vietcombnak")[0]["category"] == "bank"
+    hospitals = index.search("viet", min_similarity=0.0, categories=["hospital"])
+    assert all(r["category"] == "hospital" for r in hospitals)
+    assert index.search("zzzz") == []
+
+
+def test_proximity_breaks_ties():
+    index = NameIndex.from_records(RECORDS)
+    near_cau_giay = index.search("vietcombank", near=(21.036, 105.79))
+    assert near_cau_giay[0]["name_vi"] == "Vietcombank Cầu Giấy"
+    assert near_cau_giay[0]["distance_m"] < near_cau_giay[1]["distance_m"]
+    near_hoan_kiem = index.search("vietcombank", near=(21.0245, 105.855))
+    assert near_hoan_kiem[0]["name_vi"] == "Vietcombank Hoàn Kiếm"
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    index = NameIndex.from_records(RECORDS)
+    index.save(tmp_path / "names")
+    loaded = NameIndex.load(tmp_path / "names")
+    assert isinstance(loaded.postings, np.memmap)
+    assert len(loaded) == len(index)
+    near = (21.03, 105.85)
+    assert loaded.search("viet duc", near=near) == index.search("viet duc", near=near)
+
+
+def test_search_endpoint():
+    index, names = POIIndex(RECORDS), NameIndex.from_records(RECORDS)
+    body = run_query(index, "search", {"q": ["viet duc"], "limit": ["1"]}, names)
+    assert body["count"] == 1
+    assert body["results"][0]["name_en"] == "Viet Duc Hospital"
@@ -0,0 +1,97 @@
+"""
+@File    : test_pipeline_runner.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from pipeline_runner import PipelineRunner, Target
+
+CALLS = []
+
+
+def upper_copy(source, destination):
+    CALLS.append(destination)
+    Path(destination).write_text(Path(source).read_text().upper())
+
+
+def concat(destination, *sources):
+    CALLS.append(destination)
+    Path(destination).write_text("".join(Path(s).read_text() for s in sources))
+
+
+def _runner(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a_up, b_up = tmp_path / "a_up.txt", tmp_path / "b_up.txt"
+    merged = tmp_path / "merged.txt"
+    targets = [
+        Target("up:a", [a_up], upper_copy, args=(str(a), str(a_up)), inputs=[a]),
+        Target("up:b", [b_up], upper_copy, args=(str(b), str(b_up)), inputs=[b]),
+        Target("merge", [merged], concat, args=(str(merged), str(a_up), str(b_up)),
+               inputs=[a_up, b_up]),
+    ]
+    return PipelineRunner(targets, str(tmp_path / "state.json"), max_workers=2, use_processes=False)
+
+
+def test_second_run_is_a_no_op(tmp_path):
+    """Up-to-date targets are skipped on the next run."""
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    CALLS.clear()
+
+    first = _runner(tmp_path).run()
+    assert sorted(first['built']) == ["merge", "up:a", "up:b"]
+    assert (tmp_path / "merged.txt").read_text() == "AB"
+
+    CALLS.clear()
+    second = _runner(tmp_path).run()
+    assert second['built'] == []
+    assert CALLS == []
+
+
+def test_changed_input_rebuilds_only_dependents(tmp_path):
+    """Editing one input rebuilds its target and the merge, nothing else."""
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    _runner(tmp_path).run()
+
+    (tmp_path / "a.txt").write_text("aa")
+    runner = _runner(tmp_path)
+    assert [name for name, _ in runner.plan()] == ["up:a", "merge"]
+
+    CALLS.clear()
+    result = runner.run()
+    assert sorted(result['built']) == ["merge", "up:a"]
+    assert (tmp_path / "merged.txt").read_text() == "AAB"
+
+
+def test_failure_blocks_downstream(tmp_path):
+    """A failed target stops its dependents but not independent targets."""
+    (tmp_path / "b.txt").write_text("b")
+    result = _runner(tmp_path).run()
+    assert result['failed'] == ["up:a"]
+    assert result['built'] == ["up:b"]
+    assert result['blocked'] == ["merge"]
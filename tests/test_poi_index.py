@@ -0,0 +1,135 @@
+"""
+@File    : test_poi_index.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import sys
+import threading
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from poi_index import POIIndex, haversine_m, load_poi_records
+from poi_query_service import (QueryError, ThreadingHTTPServer, batch_queries, make_handler,
+                               run_query)
+
+
+def synthetic_records(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    categories = np.array(["cafe", "pharmacy", "school"])[rng.integers(0, 3, n)]
+    return {
+        "uri": np.array([f"urn:ngsi-ld:PointOfInterest:Hanoi:{c}:{i}"
+                         for i, c in enumerate(categories)]),
+        "category": categories,
+        "name_vi": np.array([f"Địa điểm {i}" for i in range(n)]),
+        "name_en": np.array([f"Place {i}" for i in range(n)]),
+        "lat": 20.98 + rng.random(n) * 0.1,
+        "lon": 105.78 + rng.random(n) * 0.12,
+    }
+
+
+def test_queries_match_brute_force():
+    records = synthetic_records()
+    index = POIIndex(records)
+    rng = np.random.default_rng(1)
+    for lat, lon in zip(21.0 + rng.random(20) * 0.06, 105.8 + rng.random(20) * 0.08):
+        d = haversine_m(lat, lon, records["lat"], records["lon"])
+        radius = [r["uri"] for r in index.radius(lat, lon, 700)]
+        assert sorted(radius) == sorted(records["uri"][d <= 700].tolist())
+
+        pharmacy = np.where(records["category"] == "pharmacy", d, np.inf)
+        nearest = index.nearest(lat, lon, 4, ["pharmacy"])
+        expected = records["uri"][np.argsort(pharmacy, kind="stable")[:4]]
+        assert [r["uri"] for r in nearest] == expected.tolist()
+        assert nearest[0]["distance_m"] == round(float(pharmacy.min()), 1)
+
+        box = ((records["lat"] >= lat) & (records["lat"] <= lat + 0.01)
+               & (records["lon"] >= lon) & (records["lon"] <= lon + 0.02))
+        assert len(index.bbox(lat, lon, lat + 0.01, lon + 0.02)) == box.sum()
+
+
+def test_records_are_cached_until_a_file_changes(tmp_path):
+    ttl = tmp_path / "data_hanoi_cafe.ttl"
+    ttl.write_text(
+        '@prefix geo: <http://www.opengis.net/ont/geosparql#> .\n'
+        '@prefix schema: <http://schema.org/> .\n'
+        '<urn:ngsi-ld:PointOfInterest:Hanoi:cafe:1> '
+        'schema:name "Cà phê Giảng"@vi, "Giang Cafe"@en ;\n'
+        '    geo:asWKT "POINT(105.8542 21.0285)"^^geo:wktLiteral .\n', encoding="utf-8")
+    records = load_poi_records(tmp_path, workers=1)
+    assert records["name_vi"].tolist() == ["Cà phê Giảng"]
+    assert records["category"].tolist() == ["cafe"]
+    assert (tmp_path / ".poi_index.npz").exists()
+
+    cached = load_poi_records(tmp_path, workers=1)
+    assert cached["name_en"].tolist() == ["Giang Cafe"]
+    ttl.write_text(ttl.read_text(encoding="utf-8").replace("Giang Cafe", "Giang Coffee"),
+                   encoding="utf-8")
+    assert load_poi_records(tmp_path, workers=1)["name_en"].tolist() == ["Giang Coffee"]
+
+
+def test_http_and_batch_queries(tmp_path):
+    index = POIIndex(synthetic_records(300))
+    with pytest.raises(QueryError):
+        run_query(index, "radius", {"lat": ["x"], "lon": ["105.8"]})
+    base = {"lat": ["21.03"], "lon": ["105.84"]}
+    for endpoint, name, value in (("nearest", "k", "inf"), ("nearest", "k", "2.5"),
+                                  ("radius", "limit", "-1"), ("radius", "limit", "nan"),
+                                  ("nearest", "lat", "91"), ("radius", "lon", "-180.5"),
+                                  ("radius", "radius", "-1")):
+        with pytest.raises(QueryError, match=name):
+            run_query(index, endpoint, dict(base, **{name: [value]}))
+    bounds = {"min_lat": ["21.0"], "min_lon": ["105.8"], "max_lat": ["21.1"], "max_lon": ["105.9"]}
+    for name, value in (("min_lat", "-90.1"), ("min_lon", "-181"),
+                        ("max_lat", "95"), ("max_lon", "181")):
+        with pytest.raises(QueryError, match=name):
+            run_query(index, "bbox", dict(bounds, **{name: [value]}))
+    assert run_query(index, "radius", dict(base, limit=["2"], radius=["5000"]))["count"] == 2
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(index))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = server.server_address[1]
+        url = f"http://127.0.0.1:{port}/nearest?lat=21.03&lon=105.84&k=3&category=cafe"
+        with urlopen(url) as response:
+            body = json.loads(response.read().decode("utf-8"))
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"http://127.0.0.1:{port}/nearest?lat=21.03&lon=105.84&k=inf")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert body["count"] == 3
+    assert {r["category"] for r in body["results"]} == {"cafe"}
+
+    (tmp_path / "points.csv").write_text("id,lat,lon\na,21.03,105.84\nb,21.0,105.8\n",
+                                         encoding="utf-8")
+    assert batch_queries(index, str(tmp_path / "points.csv"), str(tmp_path / "out.csv"), k=2) == 4
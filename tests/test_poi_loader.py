@@ -0,0 +1,101 @@
+"""
+@File    : test_poi_loader.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from poi_loader import find_poi_files, load_poi_arrays, poi_file_category, scan_wkt_points
+
+FETCHER_LAYOUT = """@prefix geo: <http://www.opengis.net/ont/geosparql#> .
+@prefix schema: <http://schema.org/> .
+
+<urn:ngsi-ld:PointOfInterest:Hanoi:atm:1> a schema:FinancialService ;
+    schema:name "ATM 1"@vi ;
+    geo:asWKT "POINT(105.85 21.02)"^^geo:wktLiteral .
+
+<urn:ngsi-ld:PointOfInterest:Hanoi:atm:2> a schema:FinancialService ;
+    geo:asWKT "POINT(105.80 20.99)"^^geo:wktLiteral .
+"""
+
+OTHER_LAYOUT = """PREFIX g: <http://www.opengis.net/ont/geosparql#>
+PREFIX ex: <http://example.org/>
+ex:cafe1 <http://www.opengis.net/ont/geosparql#asWKT> "POINT(105.1 21.1)" .
+ex:cafe2 g:asWKT "POINT(105.2 21.2)"^^g:wktLiteral ;
+    <http://schema.org/name> "Cafe 2" .
+"""
+
+NESTED_LAYOUT = """@prefix geo: <http://www.opengis.net/ont/geosparql#> .
+<http://example.org/park1> <http://schema.org/geo> [
+    geo:asWKT "POINT(105.3 21.3)" ] .
+"""
+
+
+def test_file_categories():
+    assert poi_file_category("data_hanoi_atm.ttl") == "atm"
+    assert poi_file_category("4_data_hanoi_bus_stop_cleaned.ttl") == "bus_stop"
+    assert poi_file_category("data_hanoi_cafe_cleanedv2.ttl") == "cafe"
+    assert poi_file_category("data_hanoi_topology.ttl") is None
+    assert poi_file_category("31_iot_infrastructure.ttl") is None
+
+
+def test_scan_layouts(tmp_path):
+    (tmp_path / "a.ttl").write_text(FETCHER_LAYOUT, encoding="utf-8")
+    subjects, lat, lon = scan_wkt_points(tmp_path / "a.ttl")
+    assert subjects == ["urn:ngsi-ld:PointOfInterest:Hanoi:atm:1",
+                        "urn:ngsi-ld:PointOfInterest:Hanoi:atm:2"]
+    assert np.allclose(lat, [21.02, 20.99]) and np.allclose(lon, [105.85, 105.80])
+
+    (tmp_path / "b.ttl").write_text(OTHER_LAYOUT, encoding="utf-8")
+    subjects, lat, _ = scan_wkt_points(tmp_path / "b.ttl")
+    assert subjects == ["http://example.org/cafe1", "http://example.org/cafe2"]
+    assert np.allclose(lat, [21.1, 21.2])
+
+
+def test_unknown_layout_falls_back_to_rdflib(tmp_path):
+    (tmp_path / "c.ttl").write_text(NESTED_LAYOUT, encoding="utf-8")
+    subjects, lat, lon = scan_wkt_points(tmp_path / "c.ttl")
+    assert len(subjects) == 1 and np.allclose(lat, [21.3])
+
+
+def test_load_filters_categories_and_non_poi_files(tmp_path):
+    (tmp_path / "1_data_hanoi_atm_cleaned.ttl").write_text(FETCHER_LAYOUT, encoding="utf-8")
+    (tmp_path / "2_data_hanoi_cafe_cleaned.ttl").write_text(OTHER_LAYOUT, encoding="utf-8")
+    (tmp_path / "31_iot_infrastructure.ttl").write_text(FETCHER_LAYOUT, encoding="utf-8")
+
+    assert [p.name for p in find_poi_files(tmp_path)] == [
+        "1_data_hanoi_atm_cleaned.ttl",
+        "2_data_hanoi_cafe_cleaned.ttl",
+    ]
+    pois = load_poi_arrays(tmp_path, workers=2)
+    assert len(pois["uri"]) == 4
+    assert pois["category"].tolist() == ["atm", "atm", "cafe", "cafe"]
+
+    cafes = load_poi_arrays(tmp_path, categories=["cafe"], workers=1)
+    assert cafes["uri"].tolist() == ["http://example.org/cafe1", "http://example.org/cafe2"]
+    assert cafes["lat"].dtype == np.float64
@@ -0,0 +1,130 @@
+"""
+@File    : test_resolve_duplicates.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import sys
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "processors"))
+
+from poi_index import haversine_m
+from resolve_duplicates import block_pairs, detect_duplicates, resolve_duplicates
+
+TTL_PREFIXES = """@prefix ext: <http://opendatafithou.org/def/extension/> .
+@prefix geo: <http://www.opengis.net/ont/geosparql#> .
+@prefix schema: <http://schema.org/> .
+
+"""
+
+
+def poi(category, osm_id, name, lon, lat, osm_type="node", extra=""):
+    return f"""<urn:ngsi-ld:PointOfInterest:Hanoi:{category}:{osm_id}>
+    ext:osm_id "{osm_id}" ;
+    ext:osm_type "{osm_type}" ;
+    schema:name "{name}"@vi ;
+{extra}    geo:asWKT "POINT({lon} {lat})" .
+
+"""
+
+
+def test_block_pairs_finds_every_close_pair():
+    rng = np.random.default_rng(3)
+    lat = 21.0 + rng.random(600) * 0.005
+    lon = 105.8 + rng.random(600) * 0.005
+    pairs = block_pairs(lat, lon, 30.0)
+    found = {tuple(pair) for pair in pairs.tolist()}
+    expected = {(i, j) for i, j in combinations(range(600), 2)
+                if haversine_m(lat[i], lon[i], lat[j], lon[j]) <= 30.0}
+    assert expected <= found
+    assert len(found) == len(pairs) < 600 * 599 // 2
+
+
+def test_detects_duplicates_across_categories(tmp_path):
+    data = tmp_path / "cleaned"
+    data.mkdir()
+    cafes = (poi("cafe", 1, "Cộng Cà Phê", 105.85000, 21.03000)
+             + poi("cafe", 2, "Quán cà phê tại Phố Huế", 105.86000, 21.02000)
+             + poi("cafe", 3, "Quán cà phê tại Phố Huế", 105.86005, 21.02005)
+             + poi("cafe", 9, "Highlands Coffee", 105.87000, 21.01000))
+    restaurants = (poi("restaurant", 5, "Cong Ca Phe", 105.85010, 21.03005, osm_type="way")
+                   + poi("restaurant", 9, "Highlands", 105.87000, 21.01000)
+                   + poi("restaurant", 6, "Cộng Cà Phê", 105.86000, 21.04000))
+    banks = poi("bank", 7, "Vietcombank", 105.84000, 21.02500,
+                extra='    schema:brand "Vietcombank" ;\n    ext:addr_housenumber "12" ;\n')
+    atms = (poi("atm", 8, "Vietcombank", 105.84005, 21.02500,
+                extra='    schema:brand "Vietcombank" ;\n')
+            + poi("atm", 10, "ATM BIDV", 105.84000, 21.02505, extra='    schema:brand "BIDV" ;\n')
+            + poi("atm", 11, "Vietcombank", 105.84002, 21.02501,
+                  extra='    schema:brand "Vietcombank" ;\n    ext:addr_housenumber "14" ;\n'))
+    for category, text in (("cafe", cafes), ("restaurant", restaurants),
+                           ("bank", banks), ("atm", atms)):
+        (data / f"data_hanoi_{category}.ttl").write_text(TTL_PREFIXES + text, encoding="utf-8")
+
+    result = detect_duplicates(data, tmp_path / "same_as.ttl", tmp_path / "report.json", workers=1)
+    links = {(m["source"].rsplit(":", 2)[1], m["target"].rsplit(":", 2)[1])
+             for m in result["same_as"]}
+    # Accent-insensitive name match, same OSM element in two files, brand match across atm/bank
+    assert ("cafe", "restaurant") in links
+    assert len(result["same_as"]) == 3
+    assert any(m["evidence"] == ["same_osm_element"] for m in result["same_as"])
+    assert any("brand" in m["evidence"] for m in result["same_as"])
+    # Generated names, different brands and far-apart namesakes never match
+    matched = {uri for m in result["same_as"] + result["suggestions"]
+               for uri in (m["source"], m["target"])}
+    assert not any(uri.endswith((":cafe:2", ":cafe:3", ":atm:10", ":restaurant:6"))
+                   for uri in matched)
+    # A neighbouring ATM of the same bank is only a suggestion;
+    # a different house number rules out the bank
+    assert [(m["source"], m["target"]) for m in result["suggestions"]] == [
+        ("urn:ngsi-ld:PointOfInterest:Hanoi:atm:11", "urn:ngsi-ld:PointOfInterest:Hanoi:atm:8")]
+
+    stats = result["stats"]
+    assert stats["entities"] == 11 and stats["possible_pairs"] == 55
+    assert stats["evaluated_pairs"] < stats["possible_pairs"]
+    assert json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))["stats"] == stats
+    assert (tmp_path / "same_as.ttl").read_text(encoding="utf-8").count("owl:sameAs") == 3
+
+
+def test_repeated_names_need_more_evidence():
+    entities = {
+        "uri": np.array(["urn:bus_stop:1", "urn:bus_stop:2"]),
+        "category": np.array(["bus_stop", "bus_stop"]),
+        "osm_type": np.array(["node", "node"]),
+        "osm_id": np.array(["1", "2"]),
+        "name_vi": np.array(["Bến xe Giáp Bát", "Bến xe Giáp Bát"]),
+        "name_en": np.array(["", ""]),
+        "brand": np.array(["", ""]),
+        "housenumber": np.array(["", ""]),
+        "street": np.array(["", ""]),
+        "lat": np.array([20.9800, 20.9801]),
+        "lon": np.array([105.8410, 105.8411]),
+    }
+    result = resolve_duplicates(entities)
+    assert result["same_as"] == []
+    assert len(result["suggestions"]) == 1
@@ -0,0 +1,120 @@
+"""
+@File    : test_single_pass_naming.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "fetchers"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "processors"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from rdflib import Graph, Literal, URIRef
+
+from osm_data_fetcher import write_turtle_file
+from run_pipeline import build_targets, cleaned_file
+from clean_all_remaining import UniversalDataCleaner
+from entity_table import SCHEMA
+from single_pass_naming import SinglePassNamer
+from smart_translate_lookup import SmartTranslator
+
+ELEMENTS = {
+    'school': [
+        {'id': 1, 'type': 'node', 'lat': 21.01, 'lon': 105.81,
+         'tags': {'name': 'Trường Tiểu học Kim Liên'}},
+        {'id': 2, 'type': 'node', 'lat': 21.02, 'lon': 105.82,
+         'tags': {'addr:street': 'Phố Huế', 'addr:housenumber': '12'}},
+        {'id': 3, 'type': 'way', 'center': {'lat': 21.03, 'lon': 105.83}, 'tags': {}},
+    ],
+    'parking': [
+        {'id': 4, 'type': 'node', 'lat': 21.04, 'lon': 105.84,
+         'tags': {'addr:district': 'Đống Đa'}},
+        {'id': 5, 'type': 'node', 'lat': 21.05, 'lon': 105.85,
+         'tags': {'name': 'Bãi đỗ xe Vincom'}},
+    ],
+}
+
+
+def make_cleaner():
+    """Cleaner whose reverse geocoding is answered from its cache."""
+    cleaner = UniversalDataCleaner()
+    for elements in ELEMENTS.values():
+        for element in elements:
+            point = element.get('center', element)
+            cleaner.geocode_cache[f"{round(point['lat'], 4)}_{round(point['lon'], 4)}"] = "Ba Đình"
+    return cleaner
+
+
+def names(path):
+    g = Graph()
+    g.parse(str(path), format="turtle")
+    return {(s, o) for s, o in g.subject_objects(SCHEMA.name)}
+
+
+def test_single_pass_matches_fetch_then_clean(tmp_path):
+    translator = SmartTranslator(cache_file=str(tmp_path / "cache.db"))
+    try:
+        for category, elements in ELEMENTS.items():
+            raw = tmp_path / f"data_hanoi_{category}.ttl"
+            write_turtle_file([dict(e, tags=dict(e['tags'])) for e in elements], raw, category,
+                              'schema:Place')
+            cleaned = tmp_path / f"data_hanoi_{category}_cleaned.ttl"
+            assert make_cleaner().process_file(str(raw), str(cleaned))['success']
+
+            single = tmp_path / "single" / f"data_hanoi_{category}_cleaned.ttl"
+            namer = SinglePassNamer(category, make_cleaner(), translator)
+            write_turtle_file([dict(e, tags=dict(e['tags'])) for e in elements], single, category,
+                              'schema:Place', namer=namer)
+            assert names(single) == names(cleaned)
+            assert names(single) != names(raw)
+    finally:
+        translator.close()
+
+
+def test_single_pass_uses_cached_translations(tmp_path):
+    translator = SmartTranslator(cache_file=str(tmp_path / "cache.db"))
+    translator.cache.put('Trường Tiểu học Kim Liên', 'Kim Lien Primary School', 'wikidata')
+    try:
+        output = tmp_path / "data_hanoi_school_cleaned.ttl"
+        with SinglePassNamer('school', make_cleaner(), translator) as namer:
+            write_turtle_file([dict(ELEMENTS['school'][0])], output, 'school', 'schema:School',
+                              namer=namer)
+        assert namer.stats['translated'] == 1
+        subject = URIRef("urn:ngsi-ld:PointOfInterest:Hanoi:school:1")
+        assert (subject, Literal('Kim Lien Primary School', lang='en')) in names(output)
+        # A cache miss is left for the second pass instead of querying Wikidata
+        assert translator.lookup_known('Trường THCS Giảng Võ') is None
+        assert translator.api_call_count == 0
+    finally:
+        translator.close()
+
+
+def test_single_pass_targets_keep_second_pass():
+    """--single-pass drops only the clean step; the second pass still reads the fetched file."""
+    targets = {target.name: target for target in build_targets(single_pass=True)}
+    assert 'clean:cafe' not in targets
+    assert targets['fetch:cafe'].outputs == [cleaned_file('cafe')]
+    assert targets['second_pass:cafe'].inputs == [cleaned_file('cafe')]
+    assert 'clean:cafe' in {target.name for target in build_targets()}
@@ -0,0 +1,83 @@
+"""
+@File    : test_spatial_cells.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "fetchers"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from rdflib import Graph, Literal, Namespace, URIRef
+
+from spatial_cells import cell_ids, covering_cells, decode_bbox, encode
+from osm_data_fetcher import write_turtle_file
+from backfill_spatial_cells import add_spatial_cells
+
+EXT = Namespace("http://opendatafithou.org/def/extension/")
+GEO = Namespace("http://www.opengis.net/ont/geosparql#")
+
+
+def test_encode_known_values_and_prefixes():
+    assert encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    cells = cell_ids(21.0285, 105.8542)
+    assert cells == {5: "w7er8", 6: "w7er8u", 7: "w7er8u0"}
+    min_lat, min_lon, max_lat, max_lon = decode_bbox(cells[7])
+    assert min_lat <= 21.0285 <= max_lat and min_lon <= 105.8542 <= max_lon
+
+
+def test_covering_cells_contain_every_point_in_circle():
+    rng = random.Random(7)
+    lat, lon = 21.03, 105.85
+    for radius in (80, 400, 2500):
+        precision, cells = covering_cells(lat, lon, radius)
+        assert len(cells) <= 24
+        for _ in range(300):
+            distance = radius * math.sqrt(rng.random())
+            bearing = rng.random() * 2 * math.pi
+            p_lat = lat + math.degrees(distance * math.cos(bearing) / 6371008.8)
+            p_lon = lon + (math.degrees(distance * math.sin(bearing) / 6371008.8)
+                           / math.cos(math.radians(lat)))
+            assert encode(p_lat, p_lon, precision) in cells
+
+
+def test_writer_and_backfill_attach_the_same_cells(tmp_path):
+    output = tmp_path / "data_hanoi_atm.ttl"
+    write_turtle_file([{'id': 5, 'type': 'node', 'lat': 21.0285, 'lon': 105.8542, 'tags': {}}],
+                      output, 'atm', 'schema:FinancialService')
+    written = Graph().parse(str(output), format="turtle")
+    subject = URIRef("urn:ngsi-ld:PointOfInterest:Hanoi:atm:5")
+    assert written.value(subject, EXT.geohash_7) == Literal("w7er8u0")
+
+    legacy = Graph()
+    legacy.add((subject, GEO.asWKT, Literal("POINT(105.8542 21.0285)", datatype=GEO.wktLiteral)))
+    legacy.add((subject, EXT.geohash_7, Literal("stale00")))
+    assert add_spatial_cells(legacy) == 1
+    assert add_spatial_cells(legacy) == 1
+    for precision in (5, 6, 7):
+        predicate = EXT[f"geohash_{precision}"]
+        assert list(legacy.objects(subject, predicate)) == list(written.objects(subject, predicate))
@@ -0,0 +1,62 @@
+"""
+@File    : test_synthetic_data.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rdflib import Graph
+
+from benchmarks.synthetic_data import generate_dataset, generate_elements, sample_category_profile
+
+DATA_DIR = Path(__file__).parent.parent / "datav2"
+
+
+def test_profile_sampled_from_real_data():
+    profile = sample_category_profile(DATA_DIR / "data_hanoi_atm.ttl")
+    assert profile['count'] > 1000
+    assert len(profile['coords']) == profile['count']
+    lat, lon = profile['coords'][0]
+    assert 20.5 < lat < 21.5 and 105.0 < lon < 106.5
+
+
+def test_elements_scale_and_cluster():
+    profile = sample_category_profile(DATA_DIR / "data_hanoi_atm.ttl")
+    elements = generate_elements('atm', profile, 2.0, random.Random(1), 1)
+    assert len(elements) == 2 * profile['count']
+    assert len({e['id'] for e in elements}) == len(elements)
+    assert all(20.5 < e['lat'] < 21.5 for e in elements)
+
+
+def test_generated_files_parse(tmp_path):
+    counts = generate_dataset(tmp_path, scale=0.05, seed=7, categories=['atm', 'cafe'])
+    graph = Graph()
+    graph.parse(tmp_path / "data_hanoi_atm.ttl", format="turtle")
+    assert counts['atm'] > 0
+    assert len(set(graph.subjects())) >= counts['atm']
+    again = generate_dataset(tmp_path / "again", scale=0.05, seed=7, categories=['atm'])
+    assert again == {'atm': counts['atm']}
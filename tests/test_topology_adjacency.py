@@ -0,0 +1,204 @@
+"""
+@File    : test_topology_adjacency.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "processors"))
+
+from generate_topology import (category_points, compute_links, generate_topology,
+                               haversine_distance, pair_distance_table, plan_link_pairs,
+                               unit_links)
+from topology_adjacency import TopologyAdjacency
+
+SCHEMA = "http://schema.org/"
+
+
+def random_points(category, n, seed):
+    rng = random.Random(seed)
+    return category_points({
+        f"urn:ngsi-ld:PointOfInterest:Hanoi:{category}:{i}":
+            (21.0 + rng.random() * 0.02, 105.8 + rng.random() * 0.02)
+        for i in range(n)
+    })
+
+
+def test_compute_links_matches_pairwise_haversine():
+    source = random_points("cafe", 120, 1)
+    target = random_points("restaurant", 150, 2)
+    src, tgt, dist = compute_links(source, target, 300, block_size=16)
+
+    expected = {
+        (i, j) for i in range(120) for j in range(150)
+        if haversine_distance(source["lat"][i], source["lon"][i],
+                              target["lat"][j], target["lon"][j]) <= 300
+    }
+    assert set(zip(src.tolist(), tgt.tolist())) == expected
+    i, j = src[0], tgt[0]
+    assert np.isclose(dist[0], haversine_distance(source["lat"][i], source["lon"][i],
+                                                  target["lat"][j], target["lon"][j]))
+
+
+def test_mirrored_units_share_one_distance_table():
+    points = {"bank": random_points("bank", 80, 3), "atm": random_points("atm", 90, 4)}
+    units = [(0, "bank", "atm", 100, "amenityFeature", None),
+             (1, "atm", "bank", 150, "isNextTo", None),
+             (2, "atm", "atm", 120, "isNextTo", None)]
+    groups = plan_link_pairs(units)
+    assert [(g["pair"], g["max_dist"], len(g["units"])) for g in groups] == [
+        (("atm", "bank"), 150, 2), (("atm", "atm"), 120, 1)]
+
+    for group in groups:
+        table = pair_distance_table(points, group)
+        for unit in group["units"]:
+            _, source_name, target_name, max_dist, _, _ = unit
+            src, tgt, dist, tiers, candidates = unit_links(table, group["pair"], unit)
+            expected = compute_links(points[source_name], points[target_name], max_dist)
+            if source_name == target_name:
+                keep = expected[0] != expected[1]
+                expected = tuple(column[keep] for column in expected)
+            assert np.array_equal(src, expected[0]) and np.array_equal(tgt, expected[1])
+            assert np.allclose(dist, expected[2])
+            assert candidates == len(src)
+            assert np.array_equal(tiers, np.where(dist <= 50, 0, np.where(dist <= 200, 1, 2)))
+
+
+def test_max_links_keeps_k_nearest_targets_per_source():
+    points = {"bus_stop": random_points("bus_stop", 60, 5),
+              "school": random_points("school", 70, 6)}
+    unit = (0, "bus_stop", "school", 800, "schema:amenityFeature", 3)
+    group = plan_link_pairs([unit])[0]
+    table = pair_distance_table(points, group)
+    src, tgt, dist, _, candidates = unit_links(table, group["pair"], unit)
+
+    full_src, full_tgt, full_dist = compute_links(points["bus_stop"], points["school"], 800)
+    assert candidates == len(full_src) > len(src)
+    assert list(zip(src.tolist(), tgt.tolist())) == sorted(zip(src.tolist(), tgt.tolist()))
+    for s in np.unique(full_src):
+        mine = full_src == s
+        nearest = sorted(zip(full_dist[mine].tolist(), full_tgt[mine].tolist()))[:3]
+        assert set(tgt[src == s].tolist()) == {t for _, t in nearest}
+
+
+def sample_adjacency():
+    cafe = "urn:ngsi-ld:PointOfInterest:Hanoi:cafe:{}".format
+    shop = "urn:ngsi-ld:PointOfInterest:Hanoi:supermarket:{}".format
+    return TopologyAdjacency.from_edges(
+        [cafe(1), cafe(1), cafe(1), cafe(2), cafe(1)],
+        [shop(1), shop(2), cafe(2), shop(1), shop(1)],
+        [SCHEMA + "isNextTo", SCHEMA + "containedInPlace", SCHEMA + "isNextTo", SCHEMA + "isNextTo",
+         SCHEMA + "isNextTo"],
+        [120.0, 30.0, 80.0, 150.0, 120.0],
+    )
+
+
+def test_csr_neighbours_and_duplicates(tmp_path):
+    adjacency = sample_adjacency()
+    assert len(adjacency) == 4  # duplicate cafe:1 isNextTo supermarket:1 kept once
+    neighbours = adjacency.neighbours("urn:ngsi-ld:PointOfInterest:Hanoi:cafe:1")
+    assert len(neighbours) == 3
+    contained = SCHEMA + "containedInPlace"
+    assert adjacency.neighbours("urn:ngsi-ld:PointOfInterest:Hanoi:cafe:1", contained) == [
+        ("urn:ngsi-ld:PointOfInterest:Hanoi:supermarket:2", contained, 30.0)]
+    assert adjacency.neighbours("urn:ngsi-ld:PointOfInterest:Hanoi:atm:9") == []
+    assert adjacency.top_hubs(1) == [("urn:ngsi-ld:PointOfInterest:Hanoi:cafe:1", 3)]
+    assert set(adjacency.categories.tolist()) == {"cafe", "supermarket"}
+
+    adjacency.save(tmp_path / "adjacency.npz")
+    loaded = TopologyAdjacency.load(tmp_path / "adjacency.npz")
+    assert loaded.neighbours("urn:ngsi-ld:PointOfInterest:Hanoi:cafe:2") == \
+        adjacency.neighbours("urn:ngsi-ld:PointOfInterest:Hanoi:cafe:2")
+
+
+def write_category(data_dir, category, n, seed):
+    rng = random.Random(seed)
+    lines = ["@prefix geo: <http://www.opengis.net/ont/geosparql#> .",
+             "@prefix fiware: <https://smartdatamodels.org/dataModel.PointOfInterest/> .", ""]
+    for i in range(n):
+        lat, lon = 21.0 + rng.random() * 0.01, 105.8 + rng.random() * 0.01
+        lines.append(f"<urn:ngsi-ld:PointOfInterest:Hanoi:{category}:{i}> "
+                     "a fiware:PointOfInterest ;")
+        lines.append(f'    geo:asWKT "POINT({lon} {lat})"^^geo:wktLiteral .')
+    (data_dir / f"data_hanoi_{category}.ttl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_parallel_generation_matches_serial(tmp_path):
+    from rdflib import Graph
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_category(data_dir, "cafe", 40, 1)
+    write_category(data_dir, "atm", 30, 2)
+    write_category(data_dir, "bank", 25, 3)
+    link_config = [
+        {"source": "cafe", "targets": ["atm", "cafe"], "max_dist": 400, "predicate": "isNextTo"},
+        {"source": "bank", "targets": ["atm"], "max_dist": 600, "predicate": "amenityFeature"},
+    ]
+
+    generate_topology(data_dir, tmp_path / "serial.ttl", link_config, workers=1)
+    generate_topology(data_dir, tmp_path / "parallel.ttl", link_config, workers=2)
+
+    serial = Graph().parse(str(tmp_path / "serial.ttl"), format="turtle")
+    parallel = Graph().parse(str(tmp_path / "parallel.ttl"), format="turtle")
+    assert len(serial) > 0
+    assert set(serial) == set(parallel)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "data", "parallel.ttl", "parallel_adjacency.npz", "serial.ttl", "serial_adjacency.npz"]
+    assert np.array_equal(TopologyAdjacency.load(tmp_path / "serial_adjacency.npz").indices,
+                          TopologyAdjacency.load(tmp_path / "parallel_adjacency.npz").indices)
+
+
+def test_incremental_cache_recomputes_only_changed_categories(tmp_path):
+    from rdflib import Graph
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_category(data_dir, "cafe", 40, 1)
+    write_category(data_dir, "atm", 30, 2)
+    write_category(data_dir, "bank", 25, 3)
+    link_config = [
+        {"source": "cafe", "targets": ["bank", "cafe"], "max_dist": 400, "predicate": "isNextTo"},
+        {"source": "bank", "targets": ["atm"], "max_dist": 600, "predicate": "ext:financialAccess"},
+    ]
+    cache_dir = tmp_path / "cache"
+    generate_topology(data_dir, tmp_path / "first.ttl", link_config, cache_dir=cache_dir)
+    mtimes = {p.name: p.stat().st_mtime_ns for p in cache_dir.glob("*.ttl.part")}
+    assert sorted(mtimes) == ["bank__atm__ext-financialAccess.ttl.part",
+                              "cafe__bank__isNextTo.ttl.part", "cafe__cafe__isNextTo.ttl.part"]
+
+    write_category(data_dir, "atm", 35, 4)
+    generate_topology(data_dir, tmp_path / "second.ttl", link_config, cache_dir=cache_dir)
+    generate_topology(data_dir, tmp_path / "fresh.ttl", link_config)
+
+    changed = {p.name for p in cache_dir.glob("*.ttl.part")
+               if p.stat().st_mtime_ns != mtimes[p.name]}
+    assert changed == {"bank__atm__ext-financialAccess.ttl.part"}
+    second = Graph().parse(str(tmp_path / "second.ttl"), format="turtle")
+    fresh = Graph().parse(str(tmp_path / "fresh.ttl"), format="turtle")
+    assert len(fresh) > 0
+    assert set(second) == set(fresh)
@@ -0,0 +1,89 @@
+"""
+@File    : test_topology_stats.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from pathlib import Path
+
+from rdflib import Graph, Namespace, URIRef
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "validators"))
+
+from topology_stats import compute_topology_stats, iter_triples
+
+SCHEMA = Namespace("http://schema.org/")
+EXT = Namespace("http://opendatafithou.org/def/extension/")
+
+
+def poi(category, n):
+    return URIRef(f"urn:ngsi-ld:PointOfInterest:Hanoi:{category}:{n}")
+
+
+def sample_graph():
+    g = Graph()
+    g.bind("schema", SCHEMA)
+    g.bind("ext", EXT)
+    g.add((poi("cafe", 1), SCHEMA.isNextTo, poi("restaurant", 1)))
+    g.add((poi("cafe", 1), SCHEMA.isNextTo, poi("restaurant", 2)))
+    g.add((poi("cafe", 1), EXT.commercialCluster, poi("supermarket", 1)))
+    g.add((poi("cafe", 2), SCHEMA.isNextTo, poi("restaurant", 1)))
+    g.add((poi("bus_stop", 1), SCHEMA.amenityFeature, poi("school", 1)))
+    return g
+
+
+def test_scanner_matches_rdflib(tmp_path):
+    g = sample_graph()
+    for fmt, name in (("turtle", "topology.ttl"), ("nt", "topology.nt")):
+        path = tmp_path / name
+        g.serialize(destination=str(path), format=fmt, encoding="utf-8")
+        assert set(iter_triples(path)) == {(str(s), str(p), str(o)) for s, p, o in g}
+
+
+def test_metrics(tmp_path):
+    path = tmp_path / "topology.ttl"
+    sample_graph().serialize(destination=str(path), format="turtle")
+    report = compute_topology_stats(path, top_n=3)
+
+    assert report['total_triples'] == 5
+    assert report['predicates'] == {'isNextTo': 3, 'commercialCluster': 1, 'amenityFeature': 1}
+    assert report['unique_sources'] == 3
+    assert report['unique_targets'] == 4
+    assert report['unique_entities'] == 7
+    assert report['category_pairs'][0] == {'source': 'cafe', 'target': 'restaurant', 'count': 3}
+    assert report['top_hubs'][0]['entity'] == str(poi("cafe", 1))
+    assert report['top_hubs'][0]['out'] == 3
+    assert report['degree']['histogram'] == {'1': 5, '2': 1, '3': 1}
+
+
+def test_unsupported_syntax_uses_rdflib(tmp_path):
+    path = tmp_path / "topology.ttl"
+    path.write_text(
+        '@prefix schema: <http://schema.org/> .\n'
+        '<urn:ngsi-ld:PointOfInterest:Hanoi:park:1> schema:geo [ schema:latitude 21.0 ] ;\n'
+        '    schema:name """multi\nline""" .\n',
+        encoding="utf-8",
+    )
+    report = compute_topology_stats(path)
+    assert report['total_triples'] == 3
+    assert report['unique_sources'] == 2
@@ -0,0 +1,77 @@
+"""
+@File    : test_translate_batch.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from rate_limiter import TokenBucket
+from smart_translate_lookup import SmartTranslator
+
+
+def test_token_bucket_limits_rate():
+    """A 20 req/s bucket with burst 1 needs ~0.1s for 3 acquisitions."""
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+    assert not bucket.try_acquire()
+
+
+def test_translate_batch_dedupes_and_batches_labels(tmp_path):
+    """Duplicate names are searched once and labels come from one wbgetentities call."""
+    translator = SmartTranslator(cache_file=str(tmp_path / "cache.db"), requests_per_second=1000)
+    calls = []
+
+    def fake_get(params):
+        calls.append(params)
+        if params['action'] == 'wbsearchentities':
+            if params['search'] == 'Nhà hát Lớn Hà Nội':
+                return {'search': [{'id': 'Q1'}]}
+            return {'search': []}
+        return {'entities': {'Q1': {'labels': {'en': {'value': 'Hanoi Opera House'}}}}}
+
+    translator._wikidata_get = fake_get
+    results = translator.translate_batch([
+        'Nhà hát Lớn Hà Nội', 'Nhà hát Lớn Hà Nội ', 'Bệnh viện Bạch Mai', 'Chợ Hôm', ''
+    ])
+
+    assert results['Nhà hát Lớn Hà Nội'] == ('Hanoi Opera House', 'wikidata')
+    assert results['Bệnh viện Bạch Mai'] == ('Bach Mai Hospital', 'special')
+    assert results['Chợ Hôm'] == ('Hom Market', 'pattern')
+
+    searches = [c for c in calls if c['action'] == 'wbsearchentities']
+    label_calls = [c for c in calls if c['action'] == 'wbgetentities']
+    assert len(searches) == 2
+    assert len(label_calls) == 1
+
+    # Second run is served entirely from the cache
+    calls.clear()
+    again = translator.translate_batch(['Chợ Hôm'])
+    assert again['Chợ Hôm'] == ('Hom Market', 'cache')
+    assert not calls
+    translator.close()
@@ -0,0 +1,97 @@
+"""
+@File    : test_translation_cache.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from translation_cache import TranslationCache
+
+
+def test_batched_commit_and_reload(tmp_path):
+    """Entries are only committed per batch and survive a reopen."""
+    db_path = str(tmp_path / "cache.db")
+    cache = TranslationCache(db_path, batch_size=2)
+    cache.put("Bệnh viện Bạch Mai", "Bach Mai Hospital", "special")
+    assert cache._pending
+
+    cache.put("Chợ Đồng Xuân", "Dong Xuan Market", "special")
+    assert not cache._pending
+    cache.put("Công viên Thống Nhất", "Thong Nhat Park", "pattern")
+    cache.close()
+
+    reopened = TranslationCache(db_path)
+    assert len(reopened) == 3
+    assert reopened["Chợ Đồng Xuân"] == "Dong Xuan Market"
+    assert "Công viên Thống Nhất" in reopened
+    reopened.close()
+
+
+def test_sees_entries_from_other_connection(tmp_path):
+    """A second process' commits are visible on a cache miss."""
+    db_path = str(tmp_path / "cache.db")
+    first = TranslationCache(db_path)
+    second = TranslationCache(db_path)
+
+    second.put("Siêu thị WinMart", "WinMart Supermarket")
+    second.flush()
+
+    assert first.get("Siêu thị WinMart") == "WinMart Supermarket"
+    first.close()
+    second.close()
+
+
+def test_legacy_json_import(tmp_path):
+    """The old indented JSON cache is imported once into an empty database."""
+    legacy = tmp_path / "translation_cache.json"
+    legacy.write_text(json.dumps({"Hồ Hoàn Kiếm": "Hoan Kiem Lake"}, indent=2), encoding="utf-8")
+
+    cache = TranslationCache(str(tmp_path / "translation_cache.db"), legacy_json=str(legacy))
+    assert cache.get("Hồ Hoàn Kiếm") == "Hoan Kiem Lake"
+    cache.close()
+
+
+def test_closed_cache_raises_until_reopened(tmp_path):
+    """Closing is idempotent; a closed cache fails clearly and can be reopened."""
+    cache = TranslationCache(str(tmp_path / "cache.db"))
+    cache.put("Hồ Tây", "West Lake")
+    cache.close()
+    cache.close()
+
+    assert cache.closed
+    assert len(cache) == 1
+    with pytest.raises(RuntimeError, match="closed"):
+        cache.get("Chợ Đồng Xuân")
+    with pytest.raises(RuntimeError, match="closed"):
+        cache.put("Chợ Đồng Xuân", "Dong Xuan Market")
+
+    cache.open()
+    assert cache.get("Hồ Tây") == "West Lake"
+    cache.put("Chợ Đồng Xuân", "Dong Xuan Market")
+    cache.close()
+    assert TranslationCache(str(tmp_path / "cache.db")).get("Chợ Đồng Xuân") == "Dong Xuan Market"
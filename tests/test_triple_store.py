@@ -0,0 +1,99 @@
+"""
+@File    : test_triple_store.py
+@Project : OpenDataFitHou
+@Date    : 2025-11-30 19:00:00
+@Author  : MFitHou Team
+
+Part of OpenDataFitHou - Ứng dụng dữ liệu mở liên kết phục vụ chuyển đổi số
+
+Copyright (C) 2025 FITHOU
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import random
+import sys
+from itertools import product
+from pathlib import Path
+
+from rdflib import Graph, Literal, Namespace, URIRef
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "utils"))
+
+from triple_store import OBJ, SUBJ, TripleStore
+
+SCHEMA = Namespace("http://schema.org/")
+EXT = Namespace("http://opendatafithou.org/def/extension/")
+PREDICATES = [SCHEMA.isNextTo, SCHEMA.containedInPlace, EXT.healthcareNetwork]
+
+
+def poi(category, n):
+    return URIRef(f"urn:ngsi-ld:PointOfInterest:Hanoi:{category}:{n}")
+
+
+def random_graph(seed=0, size=400):
+    rng = random.Random(seed)
+    g = Graph()
+    for _ in range(size):
+        s = poi(rng.choice(["cafe", "bank"]), rng.randrange(30))
+        o = poi(rng.choice(["cafe", "school"]), rng.randrange(30))
+        g.add((s, rng.choice(PREDICATES), o))
+    g.add((poi("cafe", 1), SCHEMA.name, Literal("Cafe 1", lang="vi")))
+    return g
+
+
+def test_patterns_match_rdflib():
+    g = random_graph()
+    store = TripleStore.from_graph(g)
+    assert len(store) == len(g)
+
+    rng = random.Random(1)
+    triples = list(g)
+    for _ in range(30):
+        s, p, o = rng.choice(triples)
+        for mask in product([True, False], repeat=3):
+            pattern = tuple(term if keep else None for term, keep in zip((s, p, o), mask))
+            expected = set(g.triples(pattern))
+            assert set(store.triples(pattern)) == expected
+            assert store.count(pattern) == len(expected)
+
+
+def test_unknown_terms_and_limit():
+    store = TripleStore.from_graph(random_graph())
+    assert store.count((poi("atm", 1), None, None)) == 0
+    assert len(store.match((None, SCHEMA.isNextTo, None), limit=5)) == 5
+
+
+def test_group_counts():
+    g = random_graph(seed=3)
+    store = TripleStore.from_graph(g)
+    by_predicate = store.count_by_predicate()
+    assert by_predicate == {p: len(list(g.triples((None, p, None)))) for p in set(g.predicates())}
+    assert list(by_predicate.values()) == sorted(by_predicate.values(), reverse=True)
+
+    hubs = store.group_count(SUBJ, (None, SCHEMA.isNextTo, None))
+    s = next(iter(hubs))
+    assert hubs[s] == len(list(g.triples((s, SCHEMA.isNextTo, None))))
+    assert store.distinct_count(OBJ) == len(set(g.objects()))
+
+
+def test_from_file(tmp_path):
+    g = random_graph(seed=4)
+    path = tmp_path / "topology.ttl"
+    g.serialize(destination=str(path), format="turtle")
+    store = TripleStore.from_file(path)
+    assert set(store.triples()) == set(g)
+    g.serialize(destination=str(tmp_path / "topology.nt"), format="nt")
+    assert len(TripleStore.from_file(tmp_path / "topology.nt", format="nt")) == len(g)